@@ -5,7 +5,8 @@ Python学习平台 - 主应用
 import os
 import random
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session, flash, send_from_directory
+from flask import Flask, render_template, request, jsonify, redirect, url_for, session, flash, stream_with_context
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.utils import secure_filename
 from functools import wraps
 from utils.safe_executor import executor
@@ -23,27 +24,137 @@ from sqlalchemy import desc, func, distinct
 from models.progress import Progress
 from models.notes import Note
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import undefer
 from utils.judge import judge_engine
+from utils.migrations import check_schema, upgrade as upgrade_schema, LATEST_VERSION
+from utils.db_profile import apply_sqlite_profile, engine_options, get_profile_name
+from utils.history_writer import history_writer
+from utils.current_user import load_current_user, get_user_identity, current_user_id
+from utils.server_session import init_session_backend
+from utils.note_search import search_notes
+from utils.content_registry import ContentRegistry
+from utils.http_cache import VersionedJsonCache, directory_version
+from utils.fragment_cache import fragment_cache
+from utils.static_assets import asset_manifest, static_versions
+from utils.compression import response_compression
+from utils.json_provider import init_json_provider, replace_unserializable
+from utils.request_metrics import request_metrics
+from utils.profiler import ProfilerError, request_profiler
+from utils.avatar_store import AVATAR_SIZES, VARIANT_MAX_AGE, AvatarError, avatar_store, avatar_url, is_content_key
+from utils.regex_runner import (MAX_RESULT_LIMIT, RESULT_LIMIT, RegexTimeout, check_pattern, compile_pattern,
+                                parse_flags, regex_runner)
+from utils.regex_session import MAX_SESSION_TEXT, SessionConflict, regex_sessions, update_session, validate_edits
+from utils.search_index import TitleSuggester, build_content_index, build_problem_index
+from utils.site_search import ALL_TYPES, SiteSearch
+from utils.pagination import PaginationError, keyset_page, load_fields, parse_fields, parse_limit
 from models.problem import Problem, Submission
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'python_learning_platform_2024')
 
+# JSON 序列化：有 orjson 时使用 orjson，set / tuple / datetime 由 provider 直接处理，见 utils/json_provider.py
+app.config['JSON_ENCODER'] = os.environ.get('JSON_ENCODER', 'auto')
+init_json_provider(app)
+
 # SQLite 数据库配置
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///database.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# 连接池与 SQLite PRAGMA 配置（DB_PROFILE=production 启用 WAL 等），见 utils/db_profile.py
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 
 # 头像上传配置
 app.config['UPLOAD_FOLDER'] = 'static/avatars'
 app.config['MAX_CONTENT_LENGTH'] = 2 * 1024 * 1024  # 2MB 最大文件大小
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+# 头像按内容寻址保存并在后台缩放为 32/128/256，见 utils/avatar_store.py
+# 部署在 nginx 后时设置 AVATAR_ACCEL_PREFIX=/_avatars/，头像文件经 X-Accel-Redirect 由 nginx 发送
+app.config['AVATAR_ACCEL_PREFIX'] = os.environ.get('AVATAR_ACCEL_PREFIX')
+avatar_store.init_app(app)
+
+# url_for('static') 附加内容哈希 ?v=，带哈希的地址可永久缓存，见 utils/static_assets.py
+static_versions.init_app(app)
+# 生产环境使用 utils/build_assets.py 生成的压缩、带指纹的 JS/CSS（模板中的 asset_url）
+app.config['USE_ASSET_MANIFEST'] = os.environ.get('USE_ASSET_MANIFEST') == '1'
+asset_manifest.init_app(app)
+
+# 按需采样剖析（kill -USR2 <worker pid> 或 /debug/profile/sample）与单请求 cProfile（X-Profile 头，包在最内层），
+# 只在设置了 PROFILER_TOKEN 时启用，见 utils/profiler.py
+app.config['PROFILER_TOKEN'] = os.environ.get('PROFILER_TOKEN')
+app.config['PROFILER_DIR'] = os.environ.get('PROFILER_DIR', os.path.join(app.instance_path, 'profiles'))
+app.config['PROFILER_SIGNAL'] = os.environ.get('PROFILER_SIGNAL', 'SIGUSR2')
+app.config['PROFILER_SIGNAL_SECONDS'] = float(os.environ.get('PROFILER_SIGNAL_SECONDS', 10))
+app.config['PROFILER_MAX_SECONDS'] = float(os.environ.get('PROFILER_MAX_SECONDS', 20))
+request_profiler.init_app(app)
+
+# 响应压缩（gzip / brotli），nginx 已压缩代理响应时设置 COMPRESS_RESPONSES=0，见 utils/compression.py
+app.config['COMPRESS_RESPONSES'] = os.environ.get('COMPRESS_RESPONSES', '1') == '1'
+app.config['COMPRESSION_MIN_SIZE'] = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+app.config['COMPRESSION_GZIP_LEVEL'] = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+app.config['COMPRESSION_BROTLI_QUALITY'] = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 4))
+app.config['COMPRESSION_STREAMING'] = os.environ.get('COMPRESSION_STREAMING', '1') == '1'
+response_compression.init_app(app)
+
+# 请求耗时 / 响应大小 / SQL 次数统计（包在压缩中间件外层），多个 worker 经 METRICS_DIR 汇总，见 utils/request_metrics.py
+app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', '1') == '1'
+app.config['METRICS_DIR'] = os.environ.get('METRICS_DIR', os.path.join(app.instance_path, 'metrics'))
+app.config['METRICS_FLUSH_INTERVAL'] = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+request_metrics.init_app(app)
+
+# 经 nginx 代理时 REMOTE_ADDR 都是 127.0.0.1；TRUSTED_PROXIES=1 时按 nginx 追加的 X-Forwarded-For 还原客户端地址
+# （/metrics 的回环检查依赖它）。不经代理直接对外监听时必须为 0，否则客户端可以伪造该请求头
+app.config['TRUSTED_PROXIES'] = int(os.environ.get('TRUSTED_PROXIES', 0))
+if app.config['TRUSTED_PROXIES']:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXIES'], x_proto=app.config['TRUSTED_PROXIES'])
+
+# 静态内容 JSON 接口（示例、OJ 题目）的浏览器缓存时间，过期后凭 ETag 重新验证，见 utils/http_cache.py
+app.config['STATIC_JSON_MAX_AGE'] = int(os.environ.get('STATIC_JSON_MAX_AGE', 300))
+
+# 模块详情页正文的片段缓存，FRAGMENT_CACHE_DIR 指定后多个 worker 共享，见 utils/fragment_cache.py
+app.config['FRAGMENT_CACHE_SIZE'] = int(os.environ.get('FRAGMENT_CACHE_SIZE', 64))
+app.config['FRAGMENT_CACHE_DIR'] = os.environ.get('FRAGMENT_CACHE_DIR')
+fragment_cache.init_app(app)
+
+# 正则测试在子进程中执行，超时即终止，防止灾难性回溯卡死 worker，见 utils/regex_runner.py
+app.config['REGEX_TIMEOUT'] = float(os.environ.get('REGEX_TIMEOUT', 1.0))
+app.config['REGEX_WORKERS'] = int(os.environ.get('REGEX_WORKERS', 2))
+regex_runner.init_app(app)
+# 正则工具实时匹配的会话缓冲区，多个 worker 通过该目录共享，见 utils/regex_session.py
+app.config['REGEX_SESSION_DIR'] = os.environ.get('REGEX_SESSION_DIR', os.path.join(app.instance_path, 'regex_sessions'))
+app.config['REGEX_SESSION_MAX_PER_USER'] = int(os.environ.get('REGEX_SESSION_MAX_PER_USER', 4))
+app.config['REGEX_SESSION_MAX_BYTES'] = int(os.environ.get('REGEX_SESSION_MAX_BYTES', 256 * 1024 * 1024))
+regex_sessions.init_app(app)
+
+# 会话存储：cookie（默认，签名 cookie）或 sqlite（服务端会话，可撤销），见 utils/server_session.py
+app.config['SESSION_BACKEND'] = os.environ.get('SESSION_BACKEND', 'cookie')
+app.config['SESSION_DB_PATH'] = os.environ.get('SESSION_DB_PATH')
+init_session_backend(app)
 
 # ======================== 数据库 ========================
 
 db.init_app(app)
+history_writer.init_app(app)
 
-# 创建所有表
 with app.app_context():
-    db.create_all()
+    # PRAGMA 监听器必须在第一个连接建立之前注册
+    apply_sqlite_profile(db.engine, get_profile_name())
+
+    # 表结构由 utils/migrations.py 统一维护（部署时单独运行一次），启动时只检查版本
+    try:
+        schema_ok, schema_version = check_schema()
+    except Exception as e:
+        schema_ok, schema_version = False, f'未知 ({e})'
+    if not schema_ok:
+        print(f"⚠️ 数据库结构版本 {schema_version} 落后于 {LATEST_VERSION}，请先运行 python utils/migrations.py")
+
+# 学习内容注册表与站内搜索索引：内容是静态数据，启动时构建一次
+content_registry = ContentRegistry(ALL_MODULES, MODULE_NAVIGATION)
+content_index = build_content_index(content_registry)
+problem_index = build_problem_index(judge_engine.data_dir)
+site_search = SiteSearch(content_index, problem_index)
+# OJ 题目来自 Data/problem_*.json，文件变化时重新序列化
+problem_cache = VersionedJsonCache(lambda: directory_version(judge_engine.data_dir, 'problem_', '.json'))
+title_suggester = TitleSuggester().build(list(content_index.docs.items()) + list(problem_index.docs.items()))
+
 # ======================== Jinja2 过滤器 ========================
 
 @app.template_filter('format_account_id')
@@ -104,8 +215,13 @@ def login():
     if not user or not check_password_hash(user.password_hash, password):
         return jsonify({'error': '账号或密码错误'}), 401
 
+    # 服务端会话登录时更换令牌
+    if hasattr(session, 'regenerate'):
+        session.regenerate()
     session['user_id'] = user.id
     session['username'] = user.username
+    # 身份快照：服务端会话下接口据此鉴权，无需回查 users 表
+    session['identity'] = {'id': user.id, 'username': user.username}
 
     return jsonify({'message': '登录成功', 'user_id': user.id, 'username': user.username})
 
@@ -121,7 +237,9 @@ def get_current_user():
     if not user_id:
         return jsonify({'error': '未登录'}), 401
 
-    user = User.query.get(user_id)
+    user = load_current_user()
+    if not user:
+        return jsonify({'error': '用户不存在'}), 401
     return jsonify({'user_id': user.id, 'username': user.username})
 
 # ======================== 登录验证装饰器 ========================
@@ -150,7 +268,7 @@ def profile():
     if not user_id:
         return redirect(url_for('login_page'))
     
-    user = User.query.get(user_id)
+    user = load_current_user()
     if not user:
         return redirect(url_for('login_page'))
     
@@ -250,10 +368,8 @@ def profile():
         stats['consecutive_days'] = 0
     
     # 获取用户头像URL（如果存在）
-    avatar_url = None
-    user_profile = UserProfile.query.filter_by(user_id=user_id).first()
-    if user_profile and user_profile.avatar:
-        avatar_url = url_for('get_avatar', filename=user_profile.avatar)
+    user_profile = user.profile
+    profile_avatar_url = avatar_url(user_profile.avatar if user_profile else None, 256)
     
     # 生成活跃度图表数据（基于多个数据源）
     # 按日期汇总：学习时长、笔记数、完成模块数、解决题目数
@@ -425,7 +541,7 @@ def profile():
     return render_template('profile.html', 
                          stats=stats,
                          total_modules=total_modules,
-                         avatar_url=avatar_url,
+                         avatar_url=profile_avatar_url,
                          activity_data=activity_list)
 
 # ======================== 主页和导航 ========================
@@ -463,11 +579,19 @@ def about():
 @login_required
 def module_detail(module_id):
     """模块详情页面"""
-    if module_id in ALL_MODULES:
-        module_data = ALL_MODULES[module_id]
-        module_info = next((m for m in MODULE_NAVIGATION if m['id'] == module_id), None)
-        return render_template('module_detail.html', 
-                             module=module_data, 
+    module_data = content_registry.get_module(module_id)
+    if module_data:
+        module_info = content_registry.get_module_info(module_id)
+        # 正文只依赖模块内容，缓存渲染结果；导航栏等用户相关部分由 module_detail.html 每次渲染
+        module_body = fragment_cache.render(
+            'partials/module_body.html', (module_id, content_registry.version),
+            module=module_data,
+            module_info=module_info,
+            module_id=module_id,
+            navigation_modules=MODULE_NAVIGATION)
+        return render_template('module_detail.html',
+                             module_body=module_body,
+                             module=module_data,
                              module_info=module_info,
                              module_id=module_id)
     else:
@@ -477,17 +601,14 @@ def module_detail(module_id):
 @login_required
 def topic_detail(module_id, topic_id):
     """主题详情页面"""
-    if module_id in ALL_MODULES:
-        module_data = ALL_MODULES[module_id]
-        if 'topics' in module_data and topic_id in module_data['topics']:
-            topic_data = module_data['topics'][topic_id]
-            module_info = next((m for m in MODULE_NAVIGATION if m['id'] == module_id), None)
-            return render_template('topic_detail.html',
-                                 topic=topic_data,
-                                 topic_id=topic_id,
-                                 module=module_data,
-                                 module_info=module_info,
-                                 module_id=module_id)
+    if content_registry.get_topic(module_id, topic_id):
+        module_data = content_registry.get_module(module_id)
+        return render_template('topic_detail.html',
+                             topic=module_data['topics'][topic_id],
+                             topic_id=topic_id,
+                             module=module_data,
+                             module_info=content_registry.get_module_info(module_id),
+                             module_id=module_id)
     return "主题不存在", 404
 
 # ======================== 代码执行API ========================
@@ -517,34 +638,18 @@ def execute_code():
         result = executor.execute_code(code, inputs)
         
         # 添加执行时间戳
-        result['timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        try:
-            execution_record = CodeExecution(
-                user_id=user_id,
-                code=code,
-                record_type=0  # 通用历史记录
-            )
-            db.session.add(execution_record)
-
-            # 保持该用户最多10条记录
-            user_count = CodeExecution.query.filter_by(user_id=user_id).count()
-            if user_count > 10:
-                # 删除该用户最旧的记录
-                oldest_records = CodeExecution.query.filter_by(
-                    user_id=user_id
-                ).order_by(
-                    CodeExecution.executed_at
-                ).limit(user_count - 10).all()
-                for record in oldest_records:
-                    db.session.delete(record)
+        result['timestamp'] = datetime.now()
 
-            db.session.commit()
-            result['record_id'] = execution_record.id
-        except Exception as db_error:
-            db.session.rollback()
-            print(f"⚠️ 保存执行历史失败: {str(db_error)}")
+        # 历史记录交给后台线程写入环形缓冲区（每个用户最多10条），不占用请求耗时
+        if user_id:
+            history_writer.submit(user_id, code, record_type=0)  # 0=通用历史记录
 
-        return jsonify(result)
+        try:
+            return jsonify(result)
+        except (TypeError, ValueError, RecursionError):
+            # 用户变量中有无法编码的值（如自引用的列表），只替换出错的变量后重新编码
+            result['variables'] = replace_unserializable(result.get('variables') or {}, app.json.dumps)
+            return jsonify(result)
         
     except Exception as e:
         return jsonify({
@@ -560,22 +665,33 @@ def get_execution_history():
     try:
         user_id = session.get('user_id')
         record_type = request.args.get('type', 0, type=int)
+        # fields=id,executed_at 只返回摘要，代码通过 /api/executions/<id> 按需获取
+        fields = parse_fields(request.args.get('fields'), CodeExecution.COLUMN_FIELDS,
+                              CodeExecution.DEFAULT_FIELDS)
+        limit = parse_limit(request.args.get('limit', type=int), 10, 10)
+
+        # 先写出队列中尚未提交的记录，保证能看到刚执行的代码
+        history_writer.flush()
 
         # 构建查询
-        query = CodeExecution.query.filter_by(user_id=user_id)
+        query = CodeExecution.query.filter_by(user_id=user_id).options(
+            load_fields(CodeExecution, fields, CodeExecution.executed_at))
         if record_type is not None:
             query = query.filter_by(record_type=record_type)
 
-        # 获取最近的10条记录,按时间倒序
-        executions = query.order_by(
-            desc(CodeExecution.executed_at)
-        ).limit(10).all()
+        # 获取最近的记录（最多10条）,按时间倒序
+        executions, next_cursor = keyset_page(query, CodeExecution.executed_at, CodeExecution.id,
+                                              request.args.get('cursor'), limit)
 
         return jsonify({
             'success': True,
             'count': len(executions),
-            'records': [execution.to_dict() for execution in executions]
+            'records': [execution.to_dict(fields) for execution in executions],
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
         })
+    except PaginationError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -587,7 +703,7 @@ def get_execution_history():
 def get_execution_detail(record_id):
     """获取特定执行记录的详情"""
     try:
-        execution = CodeExecution.query.get(record_id)
+        execution = CodeExecution.query.filter_by(id=record_id, user_id=session.get('user_id')).first()
         if not execution:
             return jsonify({
                 'success': False,
@@ -610,6 +726,7 @@ def clear_execution_history():
     """清空执行历史记录"""
     try:
         user_id = session.get('user_id')
+        history_writer.flush()
         CodeExecution.query.filter_by(user_id=user_id).delete()
         db.session.commit()
         return jsonify({
@@ -637,24 +754,7 @@ def oj_home():
 def api_get_problems():
     """获取所有题目列表"""
     try:
-        problems = []
-        data_dir = './Data'
-
-        for filename in os.listdir(data_dir):
-            if filename.startswith('problem_') and filename.endswith('.json'):
-                problem_id = filename.replace('problem_', '').replace('.json', '')
-                problem_data = judge_engine.load_problem(problem_id)
-                if problem_data:
-                    problems.append({
-                        'id': problem_data.get('id', problem_id),
-                        'title': problem_data.get('title', ''),
-                        'description': problem_data.get('description', '')[:100] + '...'
-                    })
-
-        return jsonify({
-            'success': True,
-            'problems': sorted(problems, key=lambda x: int(x['id']))
-        })
+        return problem_cache.get('list', _load_problem_list).response()
     except Exception as e:
         return jsonify({
             'success': False,
@@ -662,21 +762,42 @@ def api_get_problems():
         })
 
 
+def _load_problem_list():
+    problems = []
+    data_dir = judge_engine.data_dir
+
+    for filename in os.listdir(data_dir):
+        if filename.startswith('problem_') and filename.endswith('.json'):
+            problem_id = filename.replace('problem_', '').replace('.json', '')
+            problem_data = judge_engine.load_problem(problem_id)
+            if problem_data:
+                problems.append({
+                    'id': problem_data.get('id', problem_id),
+                    'title': problem_data.get('title', ''),
+                    'description': problem_data.get('description', '')[:100] + '...'
+                })
+
+    return {
+        'success': True,
+        'problems': sorted(problems, key=lambda x: int(x['id']))
+    }
+
+
 @app.route('/api/oj/problem/<problem_id>', methods=['GET'])
 def api_get_problem_detail(problem_id):
     """获取题目详情"""
     try:
-        problem = judge_engine.load_problem(problem_id)
-        if not problem:
+        def load():
+            problem = judge_engine.load_problem(problem_id)
+            return {'success': True, 'problem': problem} if problem else None
+
+        cached = problem_cache.get(('problem', problem_id), load)
+        if not cached:
             return jsonify({
                 'success': False,
                 'error': '题目不存在'
             }), 404
-
-        return jsonify({
-            'success': True,
-            'problem': problem
-        })
+        return cached.response()
     except Exception as e:
         return jsonify({
             'success': False,
@@ -741,16 +862,48 @@ def api_get_submissions():
     try:
         user_id = session.get('user_id')
         problem_id = request.args.get('problem_id', type=int)
+        # 游标分页（cursor=上一页的 next_cursor）与字段投影（fields=id,status,...，不含 code 时不读取代码）
+        fields = parse_fields(request.args.get('fields'), Submission.COLUMN_FIELDS, Submission.DEFAULT_FIELDS)
+        limit = parse_limit(request.args.get('limit', type=int), 20, 100)
 
-        query = Submission.query.filter_by(user_id=user_id)
+        query = Submission.query.filter_by(user_id=user_id).options(
+            load_fields(Submission, fields, Submission.submitted_at))
         if problem_id:
             query = query.filter_by(problem_id=problem_id)
 
-        submissions = query.order_by(Submission.submitted_at.desc()).limit(20).all()
+        submissions, next_cursor = keyset_page(query, Submission.submitted_at, Submission.id,
+                                               request.args.get('cursor'), limit)
+
+        return jsonify({
+            'success': True,
+            'submissions': [s.to_dict(fields) for s in submissions],
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        })
+    except PaginationError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+
+@app.route('/api/oj/submissions/<int:submission_id>', methods=['GET'])
+@login_required
+def api_get_submission(submission_id):
+    """获取单条提交记录详情（含代码）"""
+    try:
+        submission = Submission.query.filter_by(id=submission_id, user_id=session.get('user_id')).first()
+        if not submission:
+            return jsonify({
+                'success': False,
+                'error': '提交记录不存在'
+            }), 404
 
         return jsonify({
             'success': True,
-            'submissions': [s.to_dict() for s in submissions]
+            'submission': submission.to_dict()
         })
     except Exception as e:
         return jsonify({
@@ -807,9 +960,24 @@ def oj_problem_detail(problem_id):
     return render_template('oj_problem.html', problem=problem)
 # ======================== 模块特定API ========================
 
+def _regex_stream(pattern, flag_value, function_name, test_string, warnings):
+    """NDJSON：首行为提示信息，之后每行一批匹配，末行为 {"done": true, ...}；超时或出错时末行为 {"error": ...}"""
+    yield app.json.dumps({'warnings': warnings}) + '\n'
+    try:
+        for chunk in regex_runner.stream(pattern, flag_value, function_name, test_string):
+            yield app.json.dumps(chunk) + '\n'
+    except RegexTimeout:
+        yield app.json.dumps({'error': f'匹配超时（超过 {regex_runner.timeout:g} 秒），已终止'}) + '\n'
+    except RuntimeError as e:
+        yield app.json.dumps({'error': f'执行错误: {str(e)}'}) + '\n'
+
+
 @app.route('/api/regex/test', methods=['POST'])
 def test_regex():
-    """正则表达式测试API"""
+    """正则表达式测试API
+    findall / finditer / split 最多返回 limit 项（默认 1000），并给出 total 与 truncated；
+    format=compact 时 finditer 的结果为 {starts, ends, groups} 平行数组；
+    stream=true 时 findall / finditer 以 NDJSON 分批返回全部匹配"""
     try:
         data = request.get_json()
         pattern = data.get('pattern', '')
@@ -825,114 +993,187 @@ def test_regex():
         if len(pattern) > 1000:
             return jsonify({'error': '正则表达式模式过长'})
         
-        # 解析flags
-        flag_value = 0
-        if flags:
-            for flag in flags.split('|'):
-                flag = flag.strip()
-                if hasattr(re, flag):
-                    flag_value |= getattr(re, flag)
-        
-        # 执行正则表达式
-        result = {}
+        flag_value = parse_flags(flags)
         try:
-            compiled_pattern = re.compile(pattern, flag_value)
+            compile_pattern(pattern, flag_value)
         except re.error as e:
             return jsonify({'error': f'正则表达式语法错误: {str(e)}'})
-        
-        if function_name == 're.match':
-            match = compiled_pattern.match(test_string)
-            result['result'] = match.group() if match else None
-            result['groups'] = match.groups() if match else []
-            result['span'] = match.span() if match else None
-        elif function_name == 're.search':
-            match = compiled_pattern.search(test_string)
-            result['result'] = match.group() if match else None
-            result['groups'] = match.groups() if match else []
-            result['span'] = match.span() if match else None
-        elif function_name == 're.findall':
-            result['result'] = compiled_pattern.findall(test_string)
-        elif function_name == 're.finditer':
-            matches = list(compiled_pattern.finditer(test_string))
-            result['result'] = [{'match': m.group(), 'span': m.span(), 'groups': m.groups()} for m in matches]
-        elif function_name == 're.split':
-            result['result'] = compiled_pattern.split(test_string)
-        elif function_name == 're.sub':
-            result['result'] = compiled_pattern.sub(replacement, test_string)
-        
+        warnings = list(check_pattern(pattern, flag_value))
+
+        try:
+            limit = min(max(int(data.get('limit', RESULT_LIMIT)), 1), MAX_RESULT_LIMIT)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'limit 必须是整数'})
+
+        if data.get('stream') and function_name in ('re.findall', 're.finditer'):
+            return app.response_class(
+                stream_with_context(_regex_stream(pattern, flag_value, function_name, test_string, warnings)),
+                mimetype='application/x-ndjson')
+
+        # 在子进程中执行，超时即终止
+        try:
+            result = regex_runner.run(pattern, flag_value, function_name, test_string, replacement,
+                                      limit=limit, compact=data.get('format') == 'compact')
+        except RegexTimeout:
+            error = f'匹配超时（超过 {regex_runner.timeout:g} 秒），已终止'
+            if warnings:
+                error += '：' + warnings[0]
+            return jsonify({'error': error, 'warnings': warnings})
+        if warnings:
+            result['warnings'] = warnings
         return jsonify(result)
         
     except Exception as e:
         return jsonify({'error': f'执行错误: {str(e)}'})
 
+@app.route('/api/regex/session', methods=['POST'])
+@login_required
+def regex_session():
+    """正则工具的实时匹配：首次提交全文（text）创建会话，之后只提交相对于上一版本的修改（edits）。
+    返回 finditer 的紧凑结果 {starts, ends, groups}；会话不存在或版本不一致时返回 409，客户端需重新提交全文"""
+    data = request.get_json(silent=True) or {}
+    pattern = data.get('pattern', '')
+    if not pattern:
+        return jsonify({'error': '模式不能为空'})
+    if len(pattern) > 1000:
+        return jsonify({'error': '正则表达式模式过长'})
+    flag_value = parse_flags(data.get('flags', ''))
+    try:
+        compile_pattern(pattern, flag_value)
+    except re.error as e:
+        return jsonify({'error': f'正则表达式语法错误: {str(e)}'})
+
+    # 会话文件按用户计数淘汰（见 utils/regex_session.py）
+    user_id = current_user_id()
+    if not user_id:
+        return jsonify({'error': '请先登录'}), 401
+    if isinstance(data.get('text'), str):
+        if len(data['text']) > MAX_SESSION_TEXT:
+            return jsonify({'error': '测试字符串过长'}), 400
+        session_state = regex_sessions.create(user_id, data['text'])
+        edits = []
+    else:
+        try:
+            session_state = regex_sessions.get(data.get('session_id'), user_id, data.get('version'))
+        except SessionConflict:
+            return jsonify({'error': '会话已失效，请重新提交全文', 'resync': True}), 409
+        edits = data.get('edits', [])
+        try:
+            validate_edits(edits, len(session_state['text']))
+        except ValueError as e:
+            return jsonify({'error': str(e), 'resync': True}), 409
+
+    response = {'session_id': session_state['id']}
+    try:
+        response['incremental'] = update_session(regex_runner, session_state, edits, pattern, flag_value)
+    except RegexTimeout:
+        response['error'] = f'匹配超时（超过 {regex_runner.timeout:g} 秒），已终止'
+    except RuntimeError as e:
+        response['error'] = f'执行错误: {str(e)}'
+    finally:
+        regex_sessions.save(session_state)
+
+    response['version'] = session_state['version']
+    if 'error' not in response:
+        response['result'] = {'starts': session_state['starts'], 'ends': session_state['ends']}
+        if session_state['groups'] is not None:
+            response['result']['groups'] = session_state['groups']
+        response['total'] = len(session_state['starts'])
+        response['truncated'] = session_state['truncated']
+    return jsonify(response)
+
+@app.route('/api/regex/check', methods=['POST'])
+def check_regex():
+    """正则表达式静态检查：语法错误与嵌套量词提示，不执行匹配（正则工具在输入时调用）"""
+    data = request.get_json(silent=True) or {}
+    pattern = data.get('pattern', '')
+    if not pattern or len(pattern) > 1000:
+        return jsonify({'valid': False, 'error': None, 'warnings': []})
+    flag_value = parse_flags(data.get('flags', ''))
+    try:
+        compile_pattern(pattern, flag_value)
+    except re.error as e:
+        return jsonify({'valid': False, 'error': f'正则表达式语法错误: {str(e)}', 'warnings': []})
+    return jsonify({'valid': True, 'error': None, 'warnings': list(check_pattern(pattern, flag_value))})
+
 @app.route('/api/examples/<module_id>')
 def get_module_examples(module_id):
-    """获取模块示例代码API"""
-    if module_id in ALL_MODULES:
-        module_data = ALL_MODULES[module_id]
-        return jsonify({
-            'success': True,
-            'examples': module_data.get('examples', [])
-        })
-    else:
+    """获取模块示例代码API：模块下所有示例的扁平记录（含示例 ID、所属知识点）"""
+    if not content_registry.get_module_info(module_id):
         return jsonify({
             'success': False,
             'error': '模块不存在'
         })
+    return content_registry.payload('examples', module_id, lambda: {
+        'success': True,
+        'examples': content_registry.module_examples(module_id)
+    }).response()
 
 @app.route('/api/module/<module_id>/examples')
 def get_examples(module_id):
-    """获取特定模块的示例"""
-    if module_id not in ALL_MODULES:
+    """获取特定模块的示例（按知识点分组，或模块原始的示例列表/字典）"""
+    if not content_registry.get_module_info(module_id):
         return jsonify({'error': '模块不存在'})
-    
-    module_data = ALL_MODULES[module_id]
-    
-    # 根据不同模块类型返回示例
-    if module_id == 'variables':
-        examples = {}
-        for topic_id, topic_data in module_data['topics'].items():
-            examples[topic_id] = topic_data['examples']
-        return jsonify(examples)
-    
-    elif module_id == 'strings':
-        return jsonify(module_data.get('examples', []))
-    
-    elif module_id == 'tuples':
-        return jsonify(module_data.get('examples', {}))
-    
-    elif module_id == 'lists':
-        examples = {}
-        for topic_id, topic_data in module_data['topics'].items():
-            examples[topic_id] = topic_data['examples']
-        return jsonify(examples)
-    
-    elif module_id == 'flow_control':
-        examples = {}
-        for topic_id, topic_data in module_data.items():
-            if isinstance(topic_data, dict) and 'examples' in topic_data:
-                examples[topic_id] = topic_data['examples']
-        return jsonify(examples)
-    
-    elif module_id == 'functions':
-        return jsonify(module_data.get('examples', []))
-    
-    elif module_id == 'exceptions':
-        return jsonify({
-            'exception_examples': module_data.get('exception_examples', {}),
-            'assertion_examples': module_data.get('assertion_examples', {})
-        })
-    
-    elif module_id == 'files':
-        return jsonify(module_data.get('examples', []))
-    
-    elif module_id == 'regex':
-        return jsonify(module_data.get('examples', []))
-    
-    else:
-        return jsonify({'error': '未知模块类型'})
+    return content_registry.payload('legacy_examples', module_id,
+                                    lambda: content_registry.legacy_examples(module_id)).response()
 
 # ======================== 进度条功能 ========================
+
+def _parse_progress_payload(data):
+    """解析单条进度数据，返回 (browse, study_time, quiz)，非法值按缺省处理"""
+    try:
+        browse = float(data.get('browse_coverage', 0) or 0)
+    except (TypeError, ValueError):
+        browse = 0.0
+
+    try:
+        study_time = float(data.get('study_time', 0) or 0)
+    except (TypeError, ValueError):
+        study_time = 0.0
+
+    quiz = data.get('quiz_completion', None)
+    if quiz is not None:
+        try:
+            quiz = float(quiz)
+        except (TypeError, ValueError):
+            quiz = None
+
+    return browse, study_time, quiz
+
+
+def _apply_progress(user_id, module_id, browse, study_time, quiz):
+    """将一次进度增量合并到 Progress 表（不提交事务），返回 (action, progress)"""
+    p = Progress.query.filter_by(user_id=user_id, module_id=module_id).first()
+    if p:
+        # 合并策略：browse 取最大（更高覆盖率），study_time 累加，quiz 取最大
+        p.browse_coverage = max(p.browse_coverage or 0.0, min(max(browse, 0.0), 1.0))
+        p.study_time = (p.study_time or 0.0) + max(study_time, 0.0)
+        if quiz is not None:
+            p.quiz_completion = max(p.quiz_completion or 0.0, min(max(quiz, 0.0), 1.0))
+
+        # 重新计算 progress_value（权重与之前一致，可后续抽出为配置）
+        study_norm = min((p.study_time or 0.0) / 10.0, 1.0)
+        p.progress_value = round((p.browse_coverage * 0.6) + ((p.quiz_completion or 0.0) * 0.0) + (study_norm * 0.4), 4)
+        p.last_updated = datetime.now()
+        return 'updated', p
+
+    # 新建记录
+    init_quiz = float(quiz) if quiz is not None else 0.0
+    study_norm = min(max(study_time, 0.0) / 120.0, 1.0)
+    progress_value = round((min(max(browse, 0.0), 1.0) * 0.6) + (init_quiz * 0.0) + (study_norm * 0.4), 4)
+    new = Progress(
+        user_id=user_id,
+        module_id=module_id,
+        browse_coverage=min(max(browse, 0.0), 1.0),
+        study_time=max(study_time, 0.0),
+        quiz_completion=init_quiz,
+        progress_value=progress_value,
+        last_updated=datetime.now()
+    )
+    db.session.add(new)
+    return 'created', new
+
+
 @app.route('/api/progress', methods=['POST'])
 def api_progress():
     """接收前端上报的进度数据并插入或更新 Progress 表。
@@ -950,107 +1191,165 @@ def api_progress():
         if not module_id:
             return jsonify({'success': False, 'error': '缺少 module_id'}), 400
 
-        if module_id not in ALL_MODULES:
+        if not content_registry.get_module_info(module_id):
             return jsonify({'success': False, 'error': '模块不存在'}), 400
 
-        try:
-            browse = float(data.get('browse_coverage', 0) or 0)
-        except (TypeError, ValueError):
-            browse = 0.0
-
-        try:
-            study_time = float(data.get('study_time', 0) or 0)
-        except (TypeError, ValueError):
-            study_time = 0.0
-
-        quiz = data.get('quiz_completion', None)
-        if quiz is not None:
-            try:
-                quiz = float(quiz)
-            except (TypeError, ValueError):
-                quiz = None
+        browse, study_time, quiz = _parse_progress_payload(data)
 
         # 使用session中的用户ID
         user_id = session.get('user_id')
         if not user_id:
             return jsonify({'success': False, 'error': '用户未登录'}), 401
 
-        user = User.query.get(user_id)
-        if not user:
+        if not current_user_id():
             return jsonify({'success': False, 'error': '用户不存在'}), 400
 
-        # 查找已有记录
-        p = Progress.query.filter_by(user_id=user.id, module_id=module_id).first()
-        if p:
-            # 合并策略：browse 取最大（更高覆盖率），study_time 累加，quiz 取最大
-            p.browse_coverage = max(p.browse_coverage or 0.0, min(max(browse, 0.0), 1.0))
-            p.study_time = (p.study_time or 0.0) + max(study_time, 0.0)
-            if quiz is not None:
-                p.quiz_completion = max(p.quiz_completion or 0.0, min(max(quiz, 0.0), 1.0))
-
-            # 重新计算 progress_value（权重与之前一致，可后续抽出为配置）
-            study_norm = min((p.study_time or 0.0) / 10.0, 1.0)
-            p.progress_value = round((p.browse_coverage * 0.6) + ((p.quiz_completion or 0.0) * 0.0) + (study_norm * 0.4), 4)
-            p.last_updated = datetime.now()
-            try:
-                db.session.commit()
-            except IntegrityError:
-                db.session.rollback()
+        action, p = _apply_progress(user_id, module_id, browse, study_time, quiz)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            if action == 'updated':
                 return jsonify({'success': False, 'error': '数据库冲突，稍后重试'}), 500
+            existing = Progress.query.filter_by(user_id=user_id, module_id=module_id).first()
+            if existing:
+                return jsonify({'success': True, 'action': 'exists', 'progress_value': existing.progress_value})
+            return jsonify({'success': False, 'error': '插入失败'}), 500
 
-            return jsonify({'success': True, 'action': 'updated', 'progress_value': p.progress_value})
-        else:
-            # 新建记录
-            init_quiz = float(quiz) if quiz is not None else 0.0
-            study_norm = min(max(study_time, 0.0) / 120.0, 1.0)
-            progress_value = round((min(max(browse, 0.0), 1.0) * 0.6) + (init_quiz * 0.0) + (study_norm * 0.4), 4)
-            new = Progress(
-                user_id=user.id,
-                module_id=module_id,
-                browse_coverage=min(max(browse, 0.0), 1.0),
-                study_time=max(study_time, 0.0),
-                quiz_completion=init_quiz,
-                progress_value=progress_value,
-                last_updated=datetime.now()
-            )
-            db.session.add(new)
-            try:
-                db.session.commit()
-            except IntegrityError:
-                db.session.rollback()
-                existing = Progress.query.filter_by(user_id=user.id, module_id=module_id).first()
-                if existing:
-                    return jsonify({'success': True, 'action': 'exists', 'progress_value': existing.progress_value})
-                return jsonify({'success': False, 'error': '插入失败'}), 500
+        return jsonify({'success': True, 'action': action, 'progress_value': p.progress_value})
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
 
-            return jsonify({'success': True, 'action': 'created', 'progress_value': progress_value})
+
+@app.route('/api/progress/batch', methods=['POST'])
+def api_progress_batch():
+    """批量上报多个模块的进度增量，一次事务提交。
+    前端只在覆盖率或学习时长变化时入队，并在页面隐藏/卸载时通过 sendBeacon 发送。
+    请求 JSON 示例:
+    {
+      'items': [
+        {'module_id': 'variables', 'browse_coverage': 0.75, 'study_time': 0.5},
+        {'module_id': 'lists', 'browse_coverage': 0.2, 'study_time': 1.0}
+      ]
+    }
+    其中 study_time 为自上次上报以来新增的分钟数，browse_coverage 为当前覆盖率。
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        items = data.get('items') if isinstance(data, dict) else data
+        if not isinstance(items, list) or not items:
+            return jsonify({'success': False, 'error': '缺少 items'}), 400
+
+        user_id = session.get('user_id')
+        if not user_id:
+            return jsonify({'success': False, 'error': '用户未登录'}), 401
+
+        if not current_user_id():
+            return jsonify({'success': False, 'error': '用户不存在'}), 400
+
+        # 先在内存中按模块合并：覆盖率/习题取最大，时长累加
+        merged = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            module_id = item.get('module_id')
+            if not content_registry.get_module_info(module_id):
+                continue
+            browse, study_time, quiz = _parse_progress_payload(item)
+            if module_id in merged:
+                prev_browse, prev_time, prev_quiz = merged[module_id]
+                browse = max(prev_browse, browse)
+                study_time = prev_time + study_time
+                if prev_quiz is not None:
+                    quiz = prev_quiz if quiz is None else max(prev_quiz, quiz)
+            merged[module_id] = (browse, study_time, quiz)
+
+        if not merged:
+            return jsonify({'success': False, 'error': '没有有效的模块数据'}), 400
+
+        results = {}
+        for module_id, (browse, study_time, quiz) in merged.items():
+            action, p = _apply_progress(user_id, module_id, browse, study_time, quiz)
+            results[module_id] = p
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({'success': False, 'error': '数据库冲突，稍后重试'}), 500
+
+        return jsonify({
+            'success': True,
+            'progress': {module_id: p.progress_value for module_id, p in results.items()}
+        })
 
     except Exception as e:
+        db.session.rollback()
         return jsonify({'success': False, 'error': str(e)})
 
 
 # ======================== 学习笔记功能 ========================
 @app.route('/api/notes', methods=['GET'])
 def api_get_notes():
-    """获取当前用户的笔记列表，支持 q 查询（标题或内容模糊匹配）"""
+    """获取当前用户的笔记列表。
+    带 q 参数时走全文检索（utils/note_search.py），按相关度排序并分页，返回:
+    {'notes': [...], 'total': 42, 'page': 1, 'per_page': 20, 'has_more': True}
+    每条笔记附带 snippet、highlights（片段内高亮区间）和 title_highlights。
+    带 limit/cursor/fields 参数时按 (updated_at, note_id) 游标分页，返回:
+    {'notes': [...], 'next_cursor': '...', 'has_more': True}
+    fields 默认为摘要字段（note_id,title,preview,updated_at），正文通过 /api/notes/<id> 获取。
+    都不带时返回全部笔记的数组（兼容旧版前端）。
+    """
     try:
         q = request.args.get('q', '').strip()
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 20, type=int)
+        paginated = any(request.args.get(k) for k in ('limit', 'cursor', 'fields'))
         # 使用session中的用户ID
         user_id = session.get('user_id')
         if not user_id:
             return jsonify({'error': '用户未登录'}), 401
 
-        user = User.query.get(user_id)
-        if not user:
+        if not current_user_id():
             return jsonify({'error': '用户不存在'}), 400
 
-        query = Note.query.filter_by(user_id=user.id)
         if q:
-            like = f"%{q}%"
-            query = query.filter((Note.title.ilike(like)) | (Note.content.ilike(like)))
+            return jsonify(search_notes(user_id, q, page, per_page))
+
+        if paginated:
+            fields = parse_fields(request.args.get('fields'), Note.COLUMN_FIELDS, Note.SUMMARY_FIELDS)
+            limit = parse_limit(request.args.get('limit', type=int), 50, 100)
+            query = Note.query.filter_by(user_id=user_id).options(load_fields(Note, fields, Note.updated_at))
+            notes, next_cursor = keyset_page(query, Note.updated_at, Note.note_id,
+                                             request.args.get('cursor'), limit)
+            return jsonify({
+                'notes': [n.to_dict(fields) for n in notes],
+                'next_cursor': next_cursor,
+                'has_more': next_cursor is not None
+            })
 
-        notes = query.order_by(Note.updated_at.desc()).all()
+        notes = (Note.query.filter_by(user_id=user_id).options(undefer(Note.content))
+                 .order_by(Note.updated_at.desc()).all())
         return jsonify([n.to_dict() for n in notes])
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/notes/<int:note_id>', methods=['GET'])
+def api_get_note(note_id):
+    """获取单条笔记（含正文）"""
+    try:
+        user_id = session.get('user_id')
+        if not user_id:
+            return jsonify({'error': '用户未登录'}), 401
+
+        note = (Note.query.filter_by(note_id=note_id, user_id=user_id)
+                .options(undefer(Note.content)).first())
+        if not note:
+            return jsonify({'error': '笔记不存在或无权限'}), 404
+        return jsonify({'success': True, 'note': note.to_dict()})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1069,11 +1368,10 @@ def api_create_note():
         if not user_id:
             return jsonify({'error': '用户未登录'}), 401
 
-        user = User.query.get(user_id)
-        if not user:
+        if not current_user_id():
             return jsonify({'error': '用户不存在'}), 400
 
-        n = Note(user_id=user.id, title=title, content=content)
+        n = Note(user_id=user_id, title=title, content=content)
         db.session.add(n)
         db.session.commit()
         return jsonify({'success': True, 'note': n.to_dict()}), 201
@@ -1093,11 +1391,10 @@ def api_update_note(note_id):
         if not user_id:
             return jsonify({'error': '用户未登录'}), 401
 
-        user = User.query.get(user_id)
-        if not user:
+        if not current_user_id():
             return jsonify({'error': '用户不存在'}), 400
 
-        note = Note.query.filter_by(note_id=note_id, user_id=user.id).first()
+        note = Note.query.filter_by(note_id=note_id, user_id=user_id).first()
         if not note:
             return jsonify({'error': '笔记不存在或无权限'}), 404
 
@@ -1120,11 +1417,10 @@ def api_delete_note(note_id):
         if not user_id:
             return jsonify({'error': '用户未登录'}), 401
 
-        user = User.query.get(user_id)
-        if not user:
+        if not current_user_id():
             return jsonify({'error': '用户不存在'}), 400
 
-        note = Note.query.filter_by(note_id=note_id, user_id=user.id).first()
+        note = Note.query.filter_by(note_id=note_id, user_id=user_id).first()
         if not note:
             return jsonify({'error': '笔记不存在或无权限'}), 404
 
@@ -1146,7 +1442,7 @@ def api_upload_avatar():
     if not user_id:
         return jsonify({'success': False, 'error': '未登录'}), 401
     
-    user = User.query.get(user_id)
+    user = load_current_user()
     if not user:
         return jsonify({'success': False, 'error': '用户不存在'}), 400
     
@@ -1162,48 +1458,57 @@ def api_upload_avatar():
     if '.' not in file.filename or file.filename.rsplit('.', 1)[1].lower() not in ALLOWED_EXTENSIONS:
         return jsonify({'success': False, 'error': '不支持的文件类型'}), 400
     
-    # 创建目录
-    upload_dir = app.config['UPLOAD_FOLDER']
-    os.makedirs(upload_dir, exist_ok=True)
-    
-    # 生成文件名：用户ID_时间戳.扩展名
     ext = file.filename.rsplit('.', 1)[1].lower()
-    filename = f"{user_id}_{int(datetime.now().timestamp())}.{ext}"
-    filepath = os.path.join(upload_dir, filename)
+    try:
+        key = avatar_store.save(file.read(), ext)
+    except AvatarError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     
     # 获取或创建用户配置
-    user_profile = UserProfile.query.filter_by(user_id=user_id).first()
+    user_profile = user.profile
     if not user_profile:
         user_profile = UserProfile(user_id=user_id)
         db.session.add(user_profile)
     
-    # 删除旧头像（如果存在）
-    if user_profile.avatar:
-        old_filepath = os.path.join(upload_dir, user_profile.avatar)
-        if os.path.exists(old_filepath):
+    old_avatar = user_profile.avatar
+    user_profile.avatar = key
+    user_profile.updated_at = datetime.now()
+    db.session.commit()
+
+    # 删除旧头像：内容寻址的文件可能被其他用户共用，在存储的锁内确认无人引用后再删
+    if old_avatar and old_avatar != key:
+        if is_content_key(old_avatar):
+            avatar_store.delete(old_avatar,
+                                in_use=lambda: UserProfile.query.filter_by(avatar=old_avatar).first() is not None)
+        else:
+            old_filepath = os.path.join(app.root_path, app.config['UPLOAD_FOLDER'], secure_filename(old_avatar))
             try:
                 os.remove(old_filepath)
-            except:
+            except OSError:
                 pass
     
-    # 保存新头像
-    file.save(filepath)
-    
-    # 更新数据库
-    user_profile.avatar = filename
-    user_profile.updated_at = datetime.now()
-    db.session.commit()
-    
     return jsonify({
         'success': True,
-        'avatar_url': url_for('get_avatar', filename=filename)
+        'avatar_url': avatar_url(key, 256)
     })
 
 @app.route('/avatars/<filename>')
 def get_avatar(filename):
-    """提供头像文件"""
-    upload_dir = os.path.join(app.root_path, app.config['UPLOAD_FOLDER'])
-    return send_from_directory(upload_dir, secure_filename(filename))
+    """提供头像文件（旧版按用户ID_时间戳命名的头像）"""
+    return avatar_store.send(secure_filename(filename))
+
+@app.route('/avatars/<key>/<int:size>')
+def get_avatar_variant(key, size):
+    """提供指定尺寸的头像；文件名由内容决定，变体可永久缓存，转换完成前回退到原图（不长期缓存）"""
+    if not is_content_key(key) or size not in AVATAR_SIZES:
+        return jsonify({'error': '头像不存在'}), 404
+    filename, final = avatar_store.resolve(key, size)
+    if not filename:
+        return jsonify({'error': '头像不存在'}), 404
+    if final:
+        return avatar_store.send(filename, max_age=VARIANT_MAX_AGE, immutable=True)
+    avatar_store.convert(key)  # 上次转换失败时重新排队
+    return avatar_store.send(filename, max_age=0)
 
 
 
@@ -1234,56 +1539,111 @@ def code_playground():
 @login_required
 def search():
     """搜索页面"""
-    query = request.args.get('q', '')
-    results = []
-    
-    if query:
-        query_lower = query.lower()
-        
-        # 搜索模块
-        for module_info in MODULE_NAVIGATION:
-            if (query_lower in module_info['title'].lower() or 
-                query_lower in module_info['description'].lower()):
-                results.append({
-                    'type': 'module',
-                    'title': module_info['title'],
-                    'description': module_info['description'],
-                    'url': url_for('module_detail', module_id=module_info['id']),
-                    'icon': module_info['icon']
-                })
-        
-        # 搜索示例代码
-        for module_id, module_data in ALL_MODULES.items():
-            module_info = next((m for m in MODULE_NAVIGATION if m['id'] == module_id), None)
-            
-            # 搜索examples列表
-            if 'examples' in module_data:
-                examples = module_data['examples']
-                if isinstance(examples, list):
-                    for example in examples:
-                        if (query_lower in example.get('title', '').lower() or
-                            query_lower in example.get('description', '').lower() or
-                            query_lower in example.get('code', '').lower()):
-                            results.append({
-                                'type': 'example',
-                                'title': f"{example.get('title', '示例')} - {module_info['title'] if module_info else module_id}",
-                                'description': example.get('description', ''),
-                                'url': url_for('module_detail', module_id=module_id),
-                                'icon': '💡'
-                            })
-                elif isinstance(examples, dict):
-                    for example_key, example_data in examples.items():
-                        if (query_lower in example_data.get('title', '').lower() or
-                            query_lower in example_data.get('code', '').lower()):
-                            results.append({
-                                'type': 'example',
-                                'title': f"{example_data.get('title', example_key)} - {module_info['title'] if module_info else module_id}",
-                                'description': example_data.get('description', ''),
-                                'url': url_for('module_detail', module_id=module_id),
-                                'icon': '💡'
-                            })
-    
-    return render_template('search_results.html', query=query, results=results)
+    query = request.args.get('q', '').strip()
+    # 结果由页面通过 /api/search 异步加载
+    return render_template('search_results.html', query=query)
+
+
+def _search_result_url(doc):
+    if doc['type'] == 'problem':
+        return url_for('oj_problem_detail', problem_id=doc['problem_id'])
+    if doc['type'] == 'note':
+        return None  # 笔记在弹窗中打开
+    return url_for('module_detail', module_id=doc['module_id'], _anchor=doc['anchor'])
+
+
+@app.route('/api/search/suggest', methods=['GET'])
+def api_search_suggest():
+    """搜索框联想：模块、知识点、示例和题目标题的前缀匹配，最多返回 limit（默认 10）条"""
+    query = request.args.get('q', '').strip()
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 20)
+    suggestions = [{
+        'text': name,
+        'title': doc['title'],
+        'type': doc['type'],
+        'url': _search_result_url(doc)
+    } for name, _, doc in title_suggester.suggest(query, limit)]
+    return jsonify({'success': True, 'query': query, 'suggestions': suggestions})
+
+
+@app.route('/api/search', methods=['GET'])
+def api_search():
+    """统一搜索：模块内容、OJ 题目和当前用户的笔记（utils/site_search.py）
+    参数: q 关键词；type 类型过滤（module,topic,example,problem,note，逗号分隔）；limit 返回条数
+    """
+    query = request.args.get('q', '').strip()
+    types = {t.strip() for t in request.args.get('type', '').split(',') if t.strip()}
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+
+    unknown = types - ALL_TYPES
+    if unknown:
+        return jsonify({'success': False, 'error': f"不支持的类型: {', '.join(sorted(unknown))}"}), 400
+    if not query:
+        return jsonify({'success': True, 'query': query, 'total': 0, 'results': []})
+
+    try:
+        results, total = site_search.search(query, user_id=current_user_id(), types=types, limit=limit)
+        for result in results:
+            result['url'] = _search_result_url(result)
+        return jsonify({
+            'success': True,
+            'query': query,
+            'total': total,
+            'results': results
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# ======================== 性能指标 ========================
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus 抓取接口（未设置 METRICS_TOKEN 时只允许本机访问，真正的访问限制在 nginx，见 utils/request_metrics.py）"""
+    if not request_metrics.enabled:
+        return jsonify({'success': False, 'error': '未启用性能指标'}), 404
+    if not request_metrics.authorized(request.remote_addr, request.headers.get('Authorization')):
+        return jsonify({'success': False, 'error': '无权访问'}), 403
+    response = app.response_class(request_metrics.render(), mimetype='text/plain')
+    response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    response.cache_control.no_store = True
+    return response
+
+def _profiler_guard():
+    """未设置 PROFILER_TOKEN 时接口不存在"""
+    if not request_profiler.enabled:
+        return jsonify({'success': False, 'error': '页面不存在'}), 404
+    if not request_profiler.authorized(request.headers.get('Authorization')):
+        return jsonify({'success': False, 'error': '无权访问'}), 403
+    return None
+
+@app.route('/debug/profile/workers')
+def profile_workers():
+    """各 worker 的 CPU / 内存占用，用于选择采样目标"""
+    denied = _profiler_guard()
+    if denied:
+        return denied
+    return jsonify({'success': True, 'workers': request_profiler.list_workers()})
+
+@app.route('/debug/profile/sample')
+def profile_sample():
+    """采样 seconds 秒，返回折叠栈（可直接生成火焰图）；pid 为其他 worker 时经信号触发"""
+    denied = _profiler_guard()
+    if denied:
+        return denied
+    try:
+        pid = request.args.get('pid', type=int)
+        if pid is None:
+            raise ProfilerError('缺少 pid 参数，先用 /debug/profile/workers 找到目标 worker')
+        seconds = request.args.get('seconds', 5.0, type=float)
+        interval = request.args.get('interval', 5.0, type=float) / 1000
+        text, samples = request_profiler.sample(pid, seconds, interval)
+    except ProfilerError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    response = app.response_class(text, mimetype='text/plain')
+    if samples is not None:
+        response.headers['X-Profile-Samples'] = str(samples)
+    response.cache_control.no_store = True
+    return response
 
 # ======================== 错误处理 ========================
 
@@ -1316,13 +1676,12 @@ def inject_navigation():
         if 'user_id' in session:
             user_id = session.get('user_id')
             username = session.get('username', 'Guest')
-            current_user = User.query.get(user_id)
+            # 用户名/头像走跨请求 TTL 缓存，命中时不查询数据库
+            current_user = get_user_identity(user_id)
             if current_user:
                 username = current_user.username
                 # 获取用户头像URL（用于导航栏显示）
-                user_profile = UserProfile.query.filter_by(user_id=user_id).first()
-                if user_profile and user_profile.avatar:
-                    nav_avatar_url = url_for('get_avatar', filename=user_profile.avatar)
+                nav_avatar_url = avatar_url(current_user.avatar, 32)
     except Exception:
         pass
 
@@ -1347,4 +1706,8 @@ for module in MODULE_NAVIGATION:
     print(f"   {module['icon']} {module['title']} - {module['difficulty']}")
 
 if __name__ == '__main__':
+    # 本地开发直接启动时自动升级数据库结构
+    with app.app_context():
+        for version, description in upgrade_schema():
+            print(f"✅ 已执行迁移 {version}: {description}")
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
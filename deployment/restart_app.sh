@@ -1,5 +1,9 @@
 #!/bin/bash
 set -e
+echo "Running database migrations..."
+python utils/migrations.py
+echo "Building static assets..."
+python utils/build_assets.py
 echo "Restarting Gunicorn Service..."
 sudo systemctl restart python-hub
 echo "Reloading Nginx..."
@@ -5,24 +5,36 @@ from datetime import datetime
 class CodeExecution(db.Model):
     """代码执行历史记录"""
     __tablename__ = 'code_executions'
+    # 历史记录查询：按用户+类型过滤，按执行时间倒序
+    # 每个用户每种类型最多 10 个槽位（环形缓冲区），写入逻辑见 utils/history_writer.py
+    __table_args__ = (
+        db.Index('ix_code_executions_user_type_time', 'user_id', 'record_type', 'executed_at'),
+        db.Index('uix_code_executions_user_type_slot', 'user_id', 'record_type', 'slot', unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    code = db.Column(db.Text, nullable=False)
+    code = db.deferred(db.Column(db.Text, nullable=False))  # 大字段，列表按需加载
     record_type = db.Column(db.Integer, default=0)  # 0=通用历史记录
     executed_at = db.Column(db.DateTime, default=datetime.now)
+    slot = db.Column(db.Integer)  # 环形缓冲区槽位 0~9
 
     user = db.relationship('User', backref=db.backref('code_executions', lazy=True))
 
-    def to_dict(self):
-        """转换为字典"""
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'code': self.code,
-            'record_type': self.record_type,
-            'executed_at': self.executed_at.strftime('%Y-%m-%d %H:%M:%S')
+    DEFAULT_FIELDS = ('id', 'user_id', 'code', 'record_type', 'executed_at')
+    SUMMARY_FIELDS = ('id', 'record_type', 'executed_at')
+    COLUMN_FIELDS = DEFAULT_FIELDS
+
+    def to_dict(self, fields=None):
+        """转换为字典，fields 指定时只输出（也只访问）这些字段"""
+        getters = {
+            'id': lambda: self.id,
+            'user_id': lambda: self.user_id,
+            'code': lambda: self.code,
+            'record_type': lambda: self.record_type,
+            'executed_at': lambda: self.executed_at,
         }
+        return {name: getters[name]() for name in fields or self.DEFAULT_FIELDS}
 
     def __repr__(self):
         return f'<CodeExecution {self.id} user={self.user_id} type={self.record_type}>'
@@ -4,22 +4,43 @@ from . import db
 
 class Note(db.Model):
     __tablename__ = 'notes'
+    # 笔记列表：按用户过滤，按更新时间倒序
+    __table_args__ = (
+        db.Index('ix_notes_user_updated', 'user_id', 'updated_at'),
+    )
 
     note_id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     title = db.Column(db.String(100), nullable=True)
-    content = db.Column(db.Text, nullable=False)
+    # 正文是大字段，默认延迟加载：列表只取摘要（preview），打开笔记时再读取
+    content = db.deferred(db.Column(db.Text, nullable=False))
     created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, nullable=False)
 
     user = db.relationship('User', backref='notes')
 
-    def to_dict(self):
-        return {
-            'note_id': self.note_id,
-            'user_id': self.user_id,
-            'title': self.title,
-            'content': self.content,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+    # 列表接口 fields= 可选的字段；COLUMN_FIELDS 为对应的映射列（用于 load_only）
+    DEFAULT_FIELDS = ('note_id', 'user_id', 'title', 'content', 'created_at', 'updated_at')
+    SUMMARY_FIELDS = ('note_id', 'title', 'preview', 'updated_at')
+    COLUMN_FIELDS = DEFAULT_FIELDS + ('preview',)
+
+    def to_dict(self, fields=None):
+        """fields 指定时只输出（也只访问）这些字段，不会触发未加载大字段的查询"""
+        getters = {
+            'note_id': lambda: self.note_id,
+            'user_id': lambda: self.user_id,
+            'title': lambda: self.title,
+            'content': lambda: self.content,
+            'preview': lambda: self.preview,
+            'created_at': lambda: self.created_at,
+            'updated_at': lambda: self.updated_at,
         }
+        return {name: getters[name]() for name in fields or self.DEFAULT_FIELDS}
+
+
+PREVIEW_LENGTH = 80
+
+# 正文前 PREVIEW_LENGTH 个字符，在数据库中截取，列表不必传输整篇正文
+Note.preview = db.column_property(
+    db.func.substr(Note.__table__.c.content, 1, PREVIEW_LENGTH), deferred=True
+)
@@ -24,11 +24,16 @@ class Problem(db.Model):
 
 class Submission(db.Model):
     __tablename__ = 'submissions'
+    # 提交记录查询：按用户(+题目)按时间倒序（含游标分页），两个索引都不需要再排序
+    __table_args__ = (
+        db.Index('ix_submissions_user_problem_time', 'user_id', 'problem_id', 'submitted_at'),
+        db.Index('ix_submissions_user_time', 'user_id', 'submitted_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     problem_id = db.Column(db.Integer, db.ForeignKey('problems.id'), nullable=False)
-    code = db.Column(db.Text, nullable=False)
+    code = db.deferred(db.Column(db.Text, nullable=False))  # 大字段，列表按需加载
     status = db.Column(db.String(20))  # AC, WA, TLE, RE, CE
     passed_cases = db.Column(db.Integer, default=0)
     total_cases = db.Column(db.Integer, default=0)
@@ -36,16 +41,24 @@ class Submission(db.Model):
     execution_time = db.Column(db.Float)
     submitted_at = db.Column(db.DateTime, default=datetime.now)
 
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'problem_id': self.problem_id,
-            'code': self.code,
-            'status': self.status,
-            'passed_cases': self.passed_cases,
-            'total_cases': self.total_cases,
-            'error_message': self.error_message,
-            'execution_time': self.execution_time,
-            'submitted_at': self.submitted_at.strftime('%Y-%m-%d %H:%M:%S')
+    DEFAULT_FIELDS = ('id', 'user_id', 'problem_id', 'code', 'status', 'passed_cases',
+                      'total_cases', 'error_message', 'execution_time', 'submitted_at')
+    SUMMARY_FIELDS = ('id', 'problem_id', 'status', 'passed_cases', 'total_cases',
+                      'execution_time', 'submitted_at')
+    COLUMN_FIELDS = DEFAULT_FIELDS
+
+    def to_dict(self, fields=None):
+        """fields 指定时只输出（也只访问）这些字段"""
+        getters = {
+            'id': lambda: self.id,
+            'user_id': lambda: self.user_id,
+            'problem_id': lambda: self.problem_id,
+            'code': lambda: self.code,
+            'status': lambda: self.status,
+            'passed_cases': lambda: self.passed_cases,
+            'total_cases': lambda: self.total_cases,
+            'error_message': lambda: self.error_message,
+            'execution_time': lambda: self.execution_time,
+            'submitted_at': lambda: self.submitted_at,
         }
+        return {name: getters[name]() for name in fields or self.DEFAULT_FIELDS}
@@ -70,9 +70,59 @@ function initializeApp() {
     // 初始化登出功能
     initializeLogout();
 
+    // 初始化搜索联想
+    initializeSearchSuggestions();
+
     console.log('✅ Python学习平台初始化完成');
 }
 
+/**
+ * 搜索框联想：每次输入请求 /api/search/suggest，结果填入 datalist；
+ * 选中联想项时直接跳转到对应页面
+ */
+function initializeSearchSuggestions() {
+    const input = document.getElementById('navSearchInput');
+    const datalist = document.getElementById('searchSuggestions');
+    if (!input || !datalist) return;
+
+    let controller = null;
+    let suggestions = [];
+
+    input.addEventListener('input', function (e) {
+        const value = input.value.trim();
+
+        // 从 datalist 中选中（非键盘输入）且有对应页面时直接跳转
+        if (!e.inputType || e.inputType === 'insertReplacementText') {
+            const picked = suggestions.find(s => s.text === value && s.url);
+            if (picked) {
+                window.location.href = picked.url;
+                return;
+            }
+        }
+
+        if (controller) controller.abort();
+        if (!value) {
+            datalist.innerHTML = '';
+            suggestions = [];
+            return;
+        }
+        controller = new AbortController();
+        fetch('/api/search/suggest?q=' + encodeURIComponent(value), { signal: controller.signal })
+            .then(response => response.json())
+            .then(data => {
+                suggestions = data.suggestions || [];
+                datalist.innerHTML = '';
+                suggestions.forEach(s => {
+                    const option = document.createElement('option');
+                    option.value = s.text;
+                    option.label = s.title;
+                    datalist.appendChild(option);
+                });
+            })
+            .catch(() => { });
+    });
+}
+
 // 初始化 Markdown 渲染器
 function initializeMarkdownRenderer() {
     if (typeof window.markdownit === 'undefined') {
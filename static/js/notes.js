@@ -19,17 +19,60 @@
 
     function setLoading(v) { loading = !!v; if (saveNoteBtn) saveNoteBtn.disabled = loading; }
 
-    async function fetchNotes(q) {
-        const url = '/api/notes' + (q ? '?q=' + encodeURIComponent(q) : '');
-        const res = await fetch(url);
+    // 服务端时间格式为 'YYYY-MM-DD HH:MM:SS'（本地时间），换成 ISO 形式以便所有浏览器都能解析
+    function parseServerTime(s) { return new Date(String(s).replace(' ', 'T')); }
+
+    const NOTES_PAGE_SIZE = 50;
+
+    // 无关键词时按游标分页返回笔记摘要 {notes, next_cursor, has_more}；
+    // 有关键词时返回分页的检索结果 {notes, total, page, has_more}
+    async function fetchNotes(q, page, cursor) {
+        const params = new URLSearchParams();
+        if (q) {
+            params.set('q', q);
+            if (page) params.set('page', page);
+        } else {
+            params.set('limit', NOTES_PAGE_SIZE);
+            if (cursor) params.set('cursor', cursor);
+        }
+        const res = await fetch('/api/notes?' + params.toString());
         if (!res.ok) throw new Error('获取笔记失败');
         return res.json();
     }
 
-    function renderNotes(list) {
+    // 列表只有摘要，打开时再获取正文
+    async function fetchNote(id) {
+        const res = await fetch('/api/notes/' + id);
+        if (!res.ok) throw new Error('获取笔记失败');
+        const data = await res.json();
+        return data.note;
+    }
+
+    // 按 [[start, end], ...] 区间高亮文本；区间由服务端按 Unicode 码点计算，
+    // 而 String.slice 按 UTF-16 单元计数，emoji 等字符之后会错位，所以先拆成码点数组
+    function highlightText(el, value, ranges) {
+        const chars = Array.from(value);
+        const text = (start, end) => chars.slice(start, end).join('');
+        let pos = 0;
+        (ranges || []).forEach(([start, end]) => {
+            if (start > pos) el.appendChild(document.createTextNode(text(pos, start)));
+            const mark = document.createElement('mark');
+            mark.textContent = text(start, end);
+            el.appendChild(mark);
+            pos = end;
+        });
+        if (pos < chars.length) el.appendChild(document.createTextNode(text(pos)));
+    }
+
+    let searchState = null; // 当前检索的关键词与页码（或游标），用于“加载更多”
+
+    function renderNotes(data, append) {
         if (!notesList) return;
-        notesList.innerHTML = '';
-        if (!list || !list.length) {
+        const list = Array.isArray(data) ? data : (data && data.notes) || [];
+        const oldMore = qs('.notes-load-more', notesList);
+        if (oldMore) oldMore.remove();
+        if (!append) notesList.innerHTML = '';
+        if (!append && !list.length) {
             notesList.innerHTML = '<div class="text-muted p-3">暂无笔记</div>';
             return;
         }
@@ -41,11 +84,21 @@
             left.style.flex = '1';
             const title = document.createElement('div');
             title.className = 'fw-semibold';
-            title.textContent = n.title || (n.content || '').slice(0, 60).replace(/\n/g, ' ');
+            if (n.title && n.title_highlights) {
+                highlightText(title, n.title, n.title_highlights);
+            } else {
+                title.textContent = n.title || (n.preview || n.content || '').slice(0, 60).replace(/\n/g, ' ');
+            }
+            left.appendChild(title);
+            if (n.snippet !== undefined) {
+                const snippet = document.createElement('div');
+                snippet.className = 'small text-muted mt-1';
+                highlightText(snippet, n.snippet, n.highlights);
+                left.appendChild(snippet);
+            }
             const meta = document.createElement('div');
             meta.className = 'note-meta small mt-1';
-            meta.textContent = new Date(n.updated_at || n.created_at).toLocaleString();
-            left.appendChild(title);
+            meta.textContent = parseServerTime(n.updated_at || n.created_at).toLocaleString();
             left.appendChild(meta);
 
             const right = document.createElement('div');
@@ -67,17 +120,37 @@
             div.appendChild(left);
             div.appendChild(right);
 
-            div.addEventListener('click', () => { loadNoteIntoEditor(n); });
+            div.addEventListener('click', () => { openNote(n.note_id); });
 
             notesList.appendChild(div);
         });
+
+        if (!Array.isArray(data) && data && data.has_more) {
+            const more = document.createElement('button');
+            more.className = 'btn btn-sm btn-link w-100 notes-load-more';
+            more.textContent = data.total !== undefined ? `加载更多（共 ${data.total} 条）` : '加载更多';
+            more.addEventListener('click', loadMoreNotes);
+            notesList.appendChild(more);
+        }
+    }
+
+    async function loadMoreNotes() {
+        if (!searchState) return;
+        try {
+            const data = await fetchNotes(searchState.q, searchState.page + 1, searchState.cursor);
+            searchState.page = data.page;
+            searchState.cursor = data.next_cursor;
+            renderNotes(data, true);
+        } catch (e) {
+            console.error(e);
+        }
     }
 
     function loadNoteIntoEditor(n) {
         currentNoteId = n.note_id;
         noteTitleInput.value = n.title || '';
         setNoteContentValue(n.content || '');
-        noteMeta.textContent = `最后更新: ${new Date(n.updated_at || n.created_at).toLocaleString()}`;
+        noteMeta.textContent = `最后更新: ${parseServerTime(n.updated_at || n.created_at).toLocaleString()}`;
 
         deleteNoteBtn.classList.remove('d-none');
     }
@@ -93,9 +166,7 @@
     async function openNote(id) {
         try {
             setLoading(true);
-            const res = await fetch('/api/notes');
-            const list = await res.json();
-            const note = list.find(x => x.note_id === id);
+            const note = await fetchNote(id);
             if (note) loadNoteIntoEditor(note);
         } catch (e) {
             console.error(e);
@@ -149,8 +220,9 @@
     async function refreshNotes() {
         try {
             const q = notesSearch.value.trim();
-            const list = await fetchNotes(q);
-            renderNotes(list);
+            const data = await fetchNotes(q);
+            searchState = { q: q, page: data.page || 1, cursor: data.next_cursor };
+            renderNotes(data);
         } catch (e) {
             console.error(e);
             notesList.innerHTML = '<div class="text-muted p-3">加载失败</div>';
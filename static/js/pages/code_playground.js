@@ -0,0 +1,415 @@
+    let executionHistory = [];
+    let codeMirrorEditor;
+
+    document.addEventListener('DOMContentLoaded', function () {
+        const runButton = document.getElementById('run-code');
+        const codeEditorElement = document.getElementById('code-editor');
+        const outputArea = document.getElementById('output-area');
+        const executionInfo = document.getElementById('execution-info');
+        const variablesInfo = document.getElementById('variables-info');
+
+        // 初始化 CodeMirror 编辑器
+        codeMirrorEditor = CodeMirror(codeEditorElement, {
+            mode: 'python',
+            theme: 'monokai',
+            lineNumbers: true,
+            indentUnit: 4,
+            tabSize: 4,
+            indentWithTabs: false,
+            lineWrapping: true,
+            autoCloseBrackets: true,
+            matchBrackets: true,
+            placeholder: "# 在这里编写您的Python代码\nprint('Hello, Python!')",
+            extraKeys: {
+                "Ctrl-Enter": function (cm) {
+                    document.getElementById('run-code').click();
+                }
+            }
+        });
+
+        runButton.addEventListener('click', function () {
+            const code = codeMirrorEditor.getValue().trim();
+
+            if (!code) {
+                showError('请先输入代码');
+                return;
+            }
+
+            executeCode(code);
+        });
+
+        // Format code button
+        document.getElementById('format-code').addEventListener('click', function () {
+            formatCode();
+        });
+
+        // History button
+        document.getElementById('history-btn').addEventListener('click', function () {
+            showHistoryModal();
+        });
+
+        // Clear history
+        const clearBtn = document.getElementById('clear-history-btn');
+        if (clearBtn) {
+            clearBtn.addEventListener('click', function () {
+                clearExecutionHistory();
+            });
+        }
+
+        // Keyboard shortcut: Ctrl+Enter to run code (已在 CodeMirror 配置中处理)
+
+        function executeCode(code) {
+            const runButton = document.getElementById('run-code');
+            const originalText = runButton.innerHTML;
+
+            runButton.innerHTML = '<span class="loading-spinner"></span> 执行中...';
+            runButton.disabled = true;
+
+            outputArea.querySelector('pre').textContent = '执行中...';
+            executionInfo.innerHTML = '<i class="fas fa-clock text-warning"></i> 执行中...';
+
+            const startTime = Date.now();
+
+            fetch('/api/execute', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({ code: code })
+            })
+                .then(response => response.json())
+                .then(data => {
+                    const executionTime = ((Date.now() - startTime) / 1000).toFixed(3);
+
+                    if (data.success) {
+                        showSuccess(data.output || '(无输出)', data, executionTime);
+
+                        // Add to history
+                        executionHistory.push({
+                            code: code,
+                            output: data.output,
+                            timestamp: new Date().toLocaleString(),
+                            success: true
+                        });
+                    } else {
+                        showError(data.error, executionTime);
+
+                        // Add to history
+                        executionHistory.push({
+                            code: code,
+                            error: data.error,
+                            timestamp: new Date().toLocaleString(),
+                            success: false
+                        });
+                    }
+                })
+                .catch(error => {
+                    const executionTime = ((Date.now() - startTime) / 1000).toFixed(3);
+                    showError(`网络错误: ${error.message}`, executionTime);
+                })
+                .finally(() => {
+                    runButton.innerHTML = originalText;
+                    runButton.disabled = false;
+                });
+        }
+
+        function showSuccess(output, data, executionTime) {
+            outputArea.querySelector('pre').textContent = output;
+            outputArea.querySelector('pre').className = 'mb-0 success-output';
+
+            executionInfo.innerHTML = `
+            <i class="fas fa-check text-success"></i> 
+            执行成功 (耗时: ${data.execution_time || executionTime}s)
+        `;
+
+            // Show variables
+            if (data.variables && Object.keys(data.variables).length > 0) {
+                let varsHtml = '';
+                for (const [name, value] of Object.entries(data.variables)) {
+                    varsHtml += `<div><strong>${name}:</strong> ${JSON.stringify(value)}</div>`;
+                }
+                variablesInfo.innerHTML = varsHtml;
+            } else {
+                variablesInfo.textContent = '暂无变量';
+            }
+        }
+
+        function showError(error, executionTime) {
+            outputArea.querySelector('pre').textContent = error;
+            outputArea.querySelector('pre').className = 'mb-0 error-output';
+
+            const timeInfo = executionTime ? ` (耗时: ${executionTime}s)` : '';
+            executionInfo.innerHTML = `
+            <i class="fas fa-times text-danger"></i> 
+            执行失败${timeInfo}
+        `;
+
+            variablesInfo.textContent = '暂无变量';
+        }
+    });
+
+    // Example code loading
+    function loadExample(type) {
+
+        const examples = {
+            'hello_world': `# Hello World 示例
+print("Hello, World!")
+print("欢迎来到 Python 学习平台！")
+
+# 简单的数学运算
+result = 2 + 3
+print(f"2 + 3 = {result}")`,
+
+            'variables': `# 变量和数据类型示例
+# 基本数据类型
+name = "张三"
+age = 25
+height = 175.5
+is_student = True
+
+print(f"姓名: {name}")
+print(f"年龄: {age}")
+print(f"身高: {height}cm")
+print(f"是学生: {is_student}")
+
+# 类型转换
+age_str = str(age)
+print(f"年龄(字符串): {age_str}")
+print(f"类型: {type(age_str)}")`,
+
+            'loops': `# 循环示例
+# for 循环
+print("=== for 循环 ===")
+fruits = ["苹果", "香蕉", "橙子"]
+for fruit in fruits:
+    print(f"我喜欢 {fruit}")
+
+# while 循环
+print("\\n=== while 循环 ===")
+count = 1
+while count <= 5:
+    print(f"计数: {count}")
+    count += 1
+
+# 列表生成式
+print("\\n=== 列表生成式 ===")
+squares = [x**2 for x in range(1, 6)]
+print(f"平方数: {squares}")`
+        };
+
+        if (examples[type]) {
+            codeMirrorEditor.setValue(examples[type]);
+            codeMirrorEditor.focus();
+        }
+    }
+
+    function clearCode() {
+        codeMirrorEditor.setValue('');
+        codeMirrorEditor.focus();
+    }
+
+    function clearOutput() {
+        document.getElementById('output-area').querySelector('pre').textContent = '点击"运行代码"查看结果...';
+        document.getElementById('output-area').querySelector('pre').className = 'mb-0';
+        document.getElementById('execution-info').textContent = '准备就绪';
+        document.getElementById('variables-info').textContent = '暂无变量';
+    }
+
+    function formatCode() {
+        const code = codeMirrorEditor.getValue();
+
+        // Simple code formatting (basic indentation fix)
+        const lines = code.split('\n');
+        let indentLevel = 0;
+        const formattedLines = [];
+
+        lines.forEach(line => {
+            const trimmed = line.trim();
+            if (!trimmed) {
+                formattedLines.push('');
+                return;
+            }
+
+            // Decrease indent for 'else', 'elif', 'except', 'finally'
+            if (trimmed.startsWith('else') || trimmed.startsWith('elif') ||
+                trimmed.startsWith('except') || trimmed.startsWith('finally')) {
+                indentLevel = Math.max(0, indentLevel - 1);
+            }
+
+            // Add current line with proper indentation
+            formattedLines.push('    '.repeat(indentLevel) + trimmed);
+
+            // Increase indent after ':' (function, class, if, for, etc.)
+            if (trimmed.endsWith(':')) {
+                indentLevel++;
+            }
+
+            // Reset indent for top-level statements
+            if (!trimmed.startsWith(' ') && !trimmed.endsWith(':') &&
+                !trimmed.startsWith('else') && !trimmed.startsWith('elif') &&
+                !trimmed.startsWith('except') && !trimmed.startsWith('finally')) {
+                indentLevel = 0;
+            }
+        });
+
+        codeMirrorEditor.setValue(formattedLines.join('\n'));
+    }
+
+    // History modal functions
+    function showHistoryModal() {
+        const modal = new bootstrap.Modal(document.getElementById('historyModal'));
+        modal.show();
+        loadHistory();
+    }
+
+    function loadHistory() {
+        const loadingEl = document.getElementById('history-loading');
+        const emptyEl = document.getElementById('history-empty');
+        const listEl = document.getElementById('history-list');
+
+        // 显示加载状态
+        loadingEl.style.display = 'block';
+        emptyEl.style.display = 'none';
+        listEl.style.display = 'none';
+
+        fetch('/api/executions/history')
+            .then(response => response.json())
+            .then(data => {
+                loadingEl.style.display = 'none';
+
+                if (!data.success || !data.records || data.records.length === 0) {
+                    emptyEl.style.display = 'block';
+                    return;
+                }
+
+                // 显示历史记录列表
+                listEl.innerHTML = '';
+                data.records.forEach(record => {
+                    const recordItem = createHistoryItem(record);
+                    listEl.appendChild(recordItem);
+                });
+                listEl.style.display = 'block';
+            })
+            .catch(error => {
+                loadingEl.style.display = 'none';
+                listEl.innerHTML = `<div class="alert alert-danger">加载失败: ${error.message}</div>`;
+                listEl.style.display = 'block';
+            });
+    }
+
+    function clearExecutionHistory() {
+        const btn = document.getElementById('clear-history-btn');
+        const loadingEl = document.getElementById('history-loading');
+        const listEl = document.getElementById('history-list');
+        const emptyEl = document.getElementById('history-empty');
+
+        if (btn) {
+            btn.disabled = true;
+            btn.innerHTML = '<span class="loading-spinner"></span> 清空中...';
+        }
+
+        fetch('/api/executions/clear', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' }
+        })
+            .then(r => r.json())
+            .then(data => {
+                // 刷新列表为“空”
+                if (loadingEl) loadingEl.style.display = 'none';
+                if (listEl) {
+                    listEl.innerHTML = '';
+                    listEl.style.display = 'none';
+                }
+                if (emptyEl) emptyEl.style.display = 'block';
+            })
+            .catch(err => {
+                // 显示错误提示
+                if (listEl) {
+                    listEl.innerHTML = `<div class="alert alert-danger">清空失败: ${escapeHtml(err.message || '未知错误')}</div>`;
+                    listEl.style.display = 'block';
+                }
+            })
+            .finally(() => {
+                if (btn) {
+                    btn.disabled = false;
+                    btn.innerHTML = '<i class="fas fa-trash"></i> 清空历史';
+                }
+            });
+    }
+
+    function createHistoryItem(record) {
+        const itemDiv = document.createElement('div');
+        itemDiv.className = 'card mb-2 history-item';
+        itemDiv.style.cursor = 'pointer';
+        itemDiv.style.transition = 'all 0.2s';
+
+        // 鼠标悬停效果
+        itemDiv.addEventListener('mouseenter', function () {
+            this.style.backgroundColor = '#eaedf7';
+            this.style.borderColor = '#0dcaf0';
+            // 展开完整代码
+            const codeContainer = this.querySelector('.history-code');
+            if (codeContainer && !codeContainer.dataset.expanded) {
+                codeContainer.dataset.expanded = 'true';
+                codeContainer.innerHTML = `<pre class="bg-dark text-light p-2 rounded mb-0" style="font-size: 12px; max-height: 300px; overflow: auto; white-space: pre-wrap;">${escapeHtml(record.code)}</pre>`;
+            }
+        });
+        itemDiv.addEventListener('mouseleave', function () {
+            this.style.backgroundColor = '';
+            this.style.borderColor = '';
+            // 恢复为预览
+            const codeContainer = this.querySelector('.history-code');
+            if (codeContainer) {
+                const preview = codePreview;
+                const codeLines = preview.split('\n').length;
+                const codeHeight = Math.min(codeLines, 5);
+                codeContainer.innerHTML = `<pre class="bg-dark text-light p-2 rounded mb-0" style="font-size: 12px; max-height: ${codeHeight * 1.5}em; overflow: hidden; white-space: pre-wrap;">${escapeHtml(preview)}</pre>`;
+                codeContainer.dataset.expanded = '';
+            }
+        });
+
+        // 点击加载代码
+        itemDiv.addEventListener('click', function () {
+            loadCodeFromHistory(record.code);
+            const modal = bootstrap.Modal.getInstance(document.getElementById('historyModal'));
+            modal.hide();
+        });
+
+        // 代码预览（只显示前100个字符）
+        const codePreview = record.code.length > 100
+            ? record.code.substring(0, 100) + '...'
+            : record.code;
+        const codeLines = codePreview.split('\n').length;
+        const codeHeight = Math.min(codeLines, 5);
+
+        itemDiv.innerHTML = `
+            <div class="card-body p-3">
+                <div class="d-flex justify-content-between align-items-start mb-2">
+                    <small class="text-muted">
+                        <i class="fas fa-clock"></i> ${record.executed_at}
+                    </small>
+                    <span class="badge bg-secondary" style="background-color: #6b859e !important;">ID: ${record.id}</span>
+                </div>
+                <div class="history-code">
+                    <pre class="bg-dark text-light p-2 rounded mb-0" style="font-size: 12px; max-height: ${codeHeight * 1.5}em; overflow: hidden; white-space: pre-wrap;">${escapeHtml(codePreview)}</pre>
+                </div>
+            </div>
+        `;
+
+        return itemDiv;
+    }
+
+    function loadCodeFromHistory(code) {
+        if (codeMirrorEditor) {
+            codeMirrorEditor.setValue(code);
+            codeMirrorEditor.focus();
+            // 滚动到编辑器顶部
+            codeMirrorEditor.setCursor(0, 0);
+        }
+    }
+
+    function escapeHtml(text) {
+        const div = document.createElement('div');
+        div.textContent = text;
+        return div.innerHTML;
+    }
@@ -0,0 +1,20 @@
+    document.addEventListener('DOMContentLoaded', function () {
+        // Add some animation to the error icon
+        const errorIcon = document.querySelector('.error-icon i');
+        if (errorIcon) {
+            setTimeout(() => {
+                errorIcon.style.animation = 'bounce 0.5s ease-in-out';
+            }, 500);
+        }
+    });
+
+    // Add bounce animation
+    const style = document.createElement('style');
+    style.textContent = `
+    @keyframes bounce {
+        0%, 20%, 60%, 100% { transform: translateY(0); }
+        40% { transform: translateY(-10px); }
+        80% { transform: translateY(-5px); }
+    }
+`;
+    document.head.appendChild(style);
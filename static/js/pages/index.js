@@ -0,0 +1,57 @@
+    // Add smooth scrolling and animations
+    document.addEventListener('DOMContentLoaded', function () {
+        // Animate module cards on scroll
+        const observerOptions = {
+            threshold: 0.1,
+            rootMargin: '0px 0px -50px 0px'
+        };
+
+        const observer = new IntersectionObserver((entries) => {
+            entries.forEach(entry => {
+                if (entry.isIntersecting) {
+                    entry.target.style.opacity = '1';
+                    entry.target.style.transform = 'translateY(0)';
+                }
+            });
+        }, observerOptions);
+
+        // Observe hero & module cards
+        const animatedCards = document.querySelectorAll('.module-card, .hero-info-card');
+        animatedCards.forEach(card => {
+            card.style.opacity = '0';
+            card.style.transform = 'translateY(20px)';
+            card.style.transition = 'opacity 0.6s ease, transform 0.6s ease';
+            observer.observe(card);
+        });
+
+        // 点击翻转 hero 卡片
+        document.querySelectorAll('.hero-info-card').forEach(card => {
+            card.setAttribute('role', 'button');
+            card.setAttribute('tabindex', '0');
+            card.addEventListener('click', () => {
+                card.classList.toggle('is-flipped');
+            });
+            card.addEventListener('keypress', (e) => {
+                if (e.key === 'Enter' || e.key === ' ') {
+                    e.preventDefault();
+                    card.classList.toggle('is-flipped');
+                }
+            });
+        });
+
+        // Initialize module progress bars: read data-progress and set width + aria-valuenow
+        document.querySelectorAll('.progress-bar[data-progress]').forEach(pb => {
+            try {
+                const v = parseInt(pb.getAttribute('data-progress') || '0', 10);
+                const pct = Math.max(0, Math.min(100, isNaN(v) ? 0 : v));
+                pb.style.width = pct + '%';
+                pb.setAttribute('aria-valuenow', String(pct));
+                // 更新可视文本（保持与 aria 一致）
+                const txt = pb.querySelector('.progress-text');
+                if (txt) txt.textContent = pct + '%';
+            } catch (err) {
+                // 不要阻塞页面
+                console.warn('设置进度条失败', err);
+            }
+        });
+    });
@@ -0,0 +1,94 @@
+    document.addEventListener('DOMContentLoaded', function() {
+        const loginForm = document.getElementById('loginForm');
+        const errorMessage = document.getElementById('errorMessage');
+        const errorText = document.getElementById('errorText');
+        const successMessage = document.getElementById('successMessage');
+        const successText = document.getElementById('successText');
+        const submitBtn = document.getElementById('submitBtn');
+        const showPasswordCheckbox = document.getElementById('showPassword');
+        const passwordInput = document.getElementById('password');
+
+        // 显示/隐藏密码
+        showPasswordCheckbox.addEventListener('change', function() {
+            passwordInput.type = this.checked ? 'text' : 'password';
+        });
+
+        // 账号输入限制为数字
+        const accountInput = document.getElementById('account');
+        accountInput.addEventListener('input', function() {
+            this.value = this.value.replace(/[^0-9]/g, '');
+        });
+
+        loginForm.addEventListener('submit', async function(e) {
+            e.preventDefault();
+
+            // 隐藏之前的消息
+            errorMessage.classList.add('d-none');
+            successMessage.classList.add('d-none');
+
+            // 获取表单数据
+            const account = accountInput.value.trim();
+            const password = passwordInput.value;
+
+            // 前端验证
+            if (!account || !password) {
+                showError('请填写所有必填字段');
+                return;
+            }
+
+            // 验证账号格式（8位数字）
+            if (account.length !== 8 || !/^\d{8}$/.test(account)) {
+                showError('账号必须是8位数字');
+                return;
+            }
+
+            // 禁用提交按钮，显示加载状态
+            submitBtn.disabled = true;
+            const originalText = submitBtn.innerHTML;
+            submitBtn.innerHTML = '<span class="spinner-border spinner-border-sm me-2"></span>登录中...';
+
+            try {
+                // 发送登录请求
+                const response = await fetch('/login', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                    },
+                    body: JSON.stringify({
+                        id: account,
+                        password: password
+                    })
+                });
+
+                const data = await response.json();
+
+                if (response.ok) {
+                    // 登录成功
+                    successText.textContent = `欢迎回来，${data.username}！`;
+                    successMessage.classList.remove('d-none');
+                    
+                    // 2秒后跳转到首页
+                    setTimeout(() => {
+                        window.location.href = '/';
+                    }, 1000);
+                } else {
+                    // 登录失败
+                    showError(data.error || '登录失败，请稍后重试');
+                }
+            } catch (error) {
+                console.error('登录错误:', error);
+                showError('网络错误，请检查您的网络连接');
+            } finally {
+                // 恢复提交按钮
+                submitBtn.disabled = false;
+                submitBtn.innerHTML = originalText;
+            }
+        });
+
+        function showError(message) {
+            errorText.textContent = message;
+            errorMessage.classList.remove('d-none');
+            // 滚动到错误消息
+            errorMessage.scrollIntoView({ behavior: 'smooth', block: 'nearest' });
+        }
+    });
@@ -0,0 +1,536 @@
+    // 全局变量：CodeMirror 编辑器实例
+    let userCodeMirrorEditor;
+
+    document.addEventListener('DOMContentLoaded', function () {
+        // Smooth scroll for topic navigation
+        document.querySelectorAll('.topic-nav-link').forEach(link => {
+            link.addEventListener('click', function (e) {
+                e.preventDefault();
+                const targetId = this.getAttribute('href').substring(1);
+                const targetElement = document.getElementById(targetId);
+                if (targetElement) {
+                    targetElement.scrollIntoView({
+                        behavior: 'smooth',
+                        block: 'start'
+                    });
+
+                    // Update active state
+                    document.querySelectorAll('.topic-nav-link').forEach(l => l.classList.remove('active'));
+                    this.classList.add('active');
+                }
+            });
+        });
+
+        // Code execution for example codes
+        document.querySelectorAll('.run-code-btn').forEach(button => {
+            button.addEventListener('click', function () {
+                const code = this.getAttribute('data-code');
+                const outputContainer = this.closest('.example-item').querySelector('.code-output');
+                const outputContent = outputContainer.querySelector('.output-content');
+
+                executeCode(code, outputContent, outputContainer, this);
+            });
+        });
+
+        // 初始化 CodeMirror 编辑器
+        const userCodeEditorElement = document.getElementById('user-code');
+
+        // 等待 CodeMirror 加载完成后初始化
+        function initializeCodeMirror() {
+            userCodeMirrorEditor = CodeMirror(userCodeEditorElement, {
+                mode: 'python',
+                theme: 'monokai',
+                lineNumbers: true,
+                indentUnit: 4,
+                tabSize: 4,
+                indentWithTabs: false,
+                lineWrapping: true,
+                autoCloseBrackets: true,
+                matchBrackets: true,
+                placeholder: "# 在此输入您的Python代码\nprint('Hello, Python!')",
+                extraKeys: {
+                    "Ctrl-Enter": function (cm) {
+                        document.getElementById('run-user-code').click();
+                    }
+                }
+            });
+
+            // CodeMirror 初始化完成后绑定事件
+            bindEditorEvents();
+        }
+
+        if (typeof CodeMirror !== 'undefined') {
+            initializeCodeMirror();
+        } else {
+            // 如果 CodeMirror 未加载，等待加载
+            const checkCodeMirror = setInterval(() => {
+                if (typeof CodeMirror !== 'undefined') {
+                    clearInterval(checkCodeMirror);
+                    initializeCodeMirror();
+                }
+            }, 100);
+        }
+
+        // 绑定编辑器事件
+        function bindEditorEvents() {
+            // User code execution
+            document.getElementById('run-user-code').addEventListener('click', function () {
+                const code = userCodeMirrorEditor ? userCodeMirrorEditor.getValue() : '';
+                const outputArea = document.getElementById('user-output').querySelector('pre');
+                const infoArea = document.getElementById('execution-info');
+
+                if (!code.trim()) {
+                    outputArea.textContent = '请先输入代码...';
+                    return;
+                }
+
+                executeCode(code, outputArea, null, this, infoArea);
+            });
+
+            // Format code
+            document.getElementById('format-code').addEventListener('click', function () {
+                if (userCodeMirrorEditor) {
+                    formatCode();
+                }
+            });
+
+            // Clear code
+            document.getElementById('clear-code').addEventListener('click', function () {
+                if (userCodeMirrorEditor) {
+                    userCodeMirrorEditor.setValue('');
+                    userCodeMirrorEditor.focus();
+                }
+                document.getElementById('user-output').querySelector('pre').textContent = '点击"运行代码"查看结果...';
+                document.getElementById('execution-info').textContent = '';
+            });
+
+            // History button
+            document.getElementById('history-btn').addEventListener('click', function () {
+                showHistoryModal();
+            });
+
+            // Clear history button in modal header
+            const clearBtn = document.getElementById('clear-history-btn');
+            if (clearBtn) {
+                clearBtn.addEventListener('click', function () {
+                    clearExecutionHistory();
+                });
+            }
+        }
+
+        // 格式化代码函数
+        function formatCode() {
+            if (!userCodeMirrorEditor) return;
+
+            const code = userCodeMirrorEditor.getValue();
+
+            // Simple code formatting (basic indentation fix)
+            const lines = code.split('\n');
+            let indentLevel = 0;
+            const formattedLines = [];
+
+            lines.forEach(line => {
+                const trimmed = line.trim();
+                if (!trimmed) {
+                    formattedLines.push('');
+                    return;
+                }
+
+                // Decrease indent for 'else', 'elif', 'except', 'finally'
+                if (trimmed.startsWith('else') || trimmed.startsWith('elif') ||
+                    trimmed.startsWith('except') || trimmed.startsWith('finally')) {
+                    indentLevel = Math.max(0, indentLevel - 1);
+                }
+
+                // Add current line with proper indentation
+                formattedLines.push('    '.repeat(indentLevel) + trimmed);
+
+                // Increase indent after ':' (function, class, if, for, etc.)
+                if (trimmed.endsWith(':')) {
+                    indentLevel++;
+                }
+
+                // Reset indent for top-level statements
+                if (!trimmed.startsWith(' ') && !trimmed.endsWith(':') &&
+                    !trimmed.startsWith('else') && !trimmed.startsWith('elif') &&
+                    !trimmed.startsWith('except') && !trimmed.startsWith('finally')) {
+                    indentLevel = 0;
+                }
+            });
+
+            userCodeMirrorEditor.setValue(formattedLines.join('\n'));
+        }
+    });
+
+    function executeCode(code, outputElement, outputContainer, button, infoElement) {
+        const originalText = button.innerHTML;
+        button.innerHTML = '<span class="loading-spinner"></span> 执行中...';
+        button.disabled = true;
+
+        if (outputContainer) {
+            outputContainer.style.display = 'block';
+        }
+
+        outputElement.textContent = '执行中...';
+
+        fetch('/api/execute', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ code: code })
+        })
+            .then(response => response.json())
+            .then(data => {
+                if (data.success) {
+                    outputElement.textContent = data.output || '(无输出)';
+                    if (infoElement) {
+                        infoElement.innerHTML = `<i class="fas fa-check text-success"></i> 执行成功 (耗时: ${data.execution_time}s)`;
+                        if (Object.keys(data.variables || {}).length > 0) {
+                            infoElement.innerHTML += ` | 变量: ${Object.keys(data.variables).join(', ')}`;
+                        }
+                    }
+                } else {
+                    outputElement.textContent = `错误: ${data.error}`;
+                    if (infoElement) {
+                        infoElement.innerHTML = `<i class="fas fa-times text-danger"></i> 执行失败`;
+                    }
+                }
+            })
+            .catch(error => {
+                outputElement.textContent = `网络错误: ${error.message}`;
+                if (infoElement) {
+                    infoElement.innerHTML = `<i class="fas fa-times text-danger"></i> 网络错误`;
+                }
+            })
+            .finally(() => {
+                button.innerHTML = originalText;
+                button.disabled = false;
+            });
+    }
+
+    // ===== 页面浏览与学习时长上报 =====
+    // 增量先在本地合并（localStorage 队列，可跨页面保留未发送的模块），
+    // 只有覆盖率或时长确实变化时才入队，定期通过 /api/progress/batch 批量发送，
+    // 页面隐藏或卸载时用 navigator.sendBeacon 兜底发送。
+    (function () {
+        // 仅在 module detail 页面启用
+        try {
+            const moduleId = JSON.parse(document.getElementById('module-id').textContent);
+            if (!moduleId) return;
+
+            const BATCH_URL = '/api/progress/batch';
+            const QUEUE_KEY = 'progressQueue';
+            const TICK_INTERVAL_MS = 10000;   // 本地采样间隔
+            const FLUSH_INTERVAL_MS = 120000; // 常规批量发送间隔
+
+            let visible = document.visibilityState !== 'hidden';
+            let lastVisibilityChange = Date.now();
+            let lastFlush = Date.now();
+            let lastCoverage = 0;      // 最近一次入队的覆盖率
+            let pendingMs = 0;         // 尚未入队的停留时间（毫秒）
+
+            function loadQueue() {
+                try {
+                    return JSON.parse(localStorage.getItem(QUEUE_KEY)) || {};
+                } catch (e) {
+                    return {};
+                }
+            }
+
+            function saveQueue(queue) {
+                try {
+                    if (Object.keys(queue).length) {
+                        localStorage.setItem(QUEUE_KEY, JSON.stringify(queue));
+                    } else {
+                        localStorage.removeItem(QUEUE_KEY);
+                    }
+                } catch (e) {
+                    // localStorage 不可用时忽略
+                }
+            }
+
+            // 计算浏览覆盖率（滚动深度）
+            function calcCoverage() {
+                const doc = document.documentElement;
+                const scrollTop = (window.scrollY || window.pageYOffset || doc.scrollTop || 0);
+                const scrollHeight = Math.max(doc.scrollHeight || 0, document.body.scrollHeight || 0);
+                const clientHeight = doc.clientHeight || window.innerHeight || 0;
+                const maxScroll = Math.max(0, scrollHeight - clientHeight);
+                if (maxScroll <= 0) return 1.0;
+                return Math.min(1.0, Math.max(0.0, scrollTop / maxScroll));
+            }
+
+            // 将可见时间累加到 pendingMs
+            function accumulate() {
+                const now = Date.now();
+                if (visible) {
+                    pendingMs += Math.max(0, now - lastVisibilityChange);
+                }
+                lastVisibilityChange = now;
+            }
+
+            // 把本地增量合并进队列；没有变化时返回 false
+            function enqueue(coverage) {
+                accumulate();
+                const studyMinutes = Math.round((pendingMs / 1000 / 60) * 100) / 100; // 保留2位小数
+                coverage = Math.round(coverage * 1000) / 1000; // 保留3位
+                const coverageChanged = coverage > lastCoverage;
+                if (studyMinutes <= 0 && !coverageChanged) return false;
+
+                const queue = loadQueue();
+                const item = queue[moduleId] || { module_id: moduleId, browse_coverage: 0, study_time: 0 };
+                item.browse_coverage = Math.max(item.browse_coverage, coverage);
+                item.study_time = Math.round((item.study_time + studyMinutes) * 100) / 100;
+                queue[moduleId] = item;
+                saveQueue(queue);
+
+                // 已入队的分钟数从本地扣除，剩余不足 0.01 分钟的部分留到下次
+                pendingMs = Math.max(0, pendingMs - studyMinutes * 60 * 1000);
+                lastCoverage = Math.max(lastCoverage, coverage);
+                return true;
+            }
+
+            // 发送队列：useBeacon 用于页面隐藏/卸载时
+            function flush(useBeacon) {
+                const queue = loadQueue();
+                const items = Object.values(queue);
+                if (!items.length) return;
+                const payload = JSON.stringify({ items: items });
+                lastFlush = Date.now();
+
+                if (useBeacon && navigator.sendBeacon) {
+                    if (navigator.sendBeacon(BATCH_URL, new Blob([payload], { type: 'application/json' }))) {
+                        saveQueue({});
+                    }
+                    return;
+                }
+
+                // 先清空队列，失败时再合并回去，避免并发重复发送
+                saveQueue({});
+                fetch(BATCH_URL, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: payload,
+                    keepalive: true
+                }).then(resp => {
+                    if (!resp.ok && resp.status >= 500) throw new Error(`HTTP ${resp.status}`);
+                }).catch(e => {
+                    const current = loadQueue();
+                    items.forEach(item => {
+                        const existing = current[item.module_id];
+                        if (existing) {
+                            existing.browse_coverage = Math.max(existing.browse_coverage, item.browse_coverage);
+                            existing.study_time = Math.round((existing.study_time + item.study_time) * 100) / 100;
+                        } else {
+                            current[item.module_id] = item;
+                        }
+                    });
+                    saveQueue(current);
+                    // 不阻塞 UX
+                    console.warn('上报学习进度失败', e);
+                });
+            }
+
+            // 周期性采样：只在可见时入队，达到发送间隔才真正发请求
+            setInterval(() => {
+                if (!visible) return;
+                enqueue(calcCoverage());
+                if (Date.now() - lastFlush >= FLUSH_INTERVAL_MS) {
+                    flush(false);
+                }
+            }, TICK_INTERVAL_MS);
+
+            // 当用户滚动至页面底部时立即入队 browse_coverage = 1 并发送
+            let bottomReported = false;
+            window.addEventListener('scroll', () => {
+                if (!bottomReported && calcCoverage() >= 0.99) {
+                    bottomReported = true;
+                    if (enqueue(1.0)) flush(false);
+                }
+            }, { passive: true });
+
+            // 页面隐藏时入队并用 sendBeacon 发送；重新可见时继续计时
+            document.addEventListener('visibilitychange', () => {
+                if (document.visibilityState === 'hidden') {
+                    enqueue(calcCoverage());
+                    visible = false;
+                    flush(true);
+                } else {
+                    lastVisibilityChange = Date.now();
+                    visible = true;
+                }
+            });
+
+            // 页面卸载（包括进入 bfcache）前再做一次发送
+            window.addEventListener('pagehide', () => {
+                try {
+                    enqueue(calcCoverage());
+                    visible = false;
+                    flush(true);
+                } catch (e) {
+                    // 忽略错误
+                }
+            });
+
+            // 上次页面遗留的未发送增量
+            flush(false);
+
+        } catch (err) {
+            console.warn('初始化进度上报脚本失败', err);
+        }
+    })();
+
+    // History modal functions
+    function showHistoryModal() {
+        const modal = new bootstrap.Modal(document.getElementById('historyModal'));
+        modal.show();
+        loadHistory();
+    }
+
+    function loadHistory() {
+        const loadingEl = document.getElementById('history-loading');
+        const emptyEl = document.getElementById('history-empty');
+        const listEl = document.getElementById('history-list');
+
+        // 显示加载状态
+        loadingEl.style.display = 'block';
+        emptyEl.style.display = 'none';
+        listEl.style.display = 'none';
+
+        fetch('/api/executions/history')
+            .then(response => response.json())
+            .then(data => {
+                loadingEl.style.display = 'none';
+
+                if (!data.success || !data.records || data.records.length === 0) {
+                    emptyEl.style.display = 'block';
+                    return;
+                }
+
+                // 显示历史记录列表
+                listEl.innerHTML = '';
+                data.records.forEach(record => {
+                    const recordItem = createHistoryItem(record);
+                    listEl.appendChild(recordItem);
+                });
+                listEl.style.display = 'block';
+            })
+            .catch(error => {
+                loadingEl.style.display = 'none';
+                listEl.innerHTML = `<div class="alert alert-danger">加载失败: ${error.message}</div>`;
+                listEl.style.display = 'block';
+            });
+    }
+
+    function clearExecutionHistory() {
+        const btn = document.getElementById('clear-history-btn');
+        const loadingEl = document.getElementById('history-loading');
+        const listEl = document.getElementById('history-list');
+        const emptyEl = document.getElementById('history-empty');
+
+        if (btn) {
+            btn.disabled = true;
+            btn.innerHTML = '<span class="loading-spinner"></span> 清空中...';
+        }
+
+        fetch('/api/executions/clear', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' }
+        })
+            .then(r => r.json())
+            .then(() => {
+                if (loadingEl) loadingEl.style.display = 'none';
+                if (listEl) { listEl.innerHTML = ''; listEl.style.display = 'none'; }
+                if (emptyEl) emptyEl.style.display = 'block';
+            })
+            .catch(err => {
+                if (listEl) {
+                    listEl.innerHTML = `<div class=\"alert alert-danger\">清空失败: ${escapeHtml(err.message || '未知错误')}</div>`;
+                    listEl.style.display = 'block';
+                }
+            })
+            .finally(() => {
+                if (btn) {
+                    btn.disabled = false;
+                    btn.innerHTML = '<i class="fas fa-trash"></i> 清空历史';
+                }
+            });
+    }
+
+    function createHistoryItem(record) {
+        const itemDiv = document.createElement('div');
+        itemDiv.className = 'card mb-2 history-item';
+        itemDiv.style.cursor = 'pointer';
+        itemDiv.style.transition = 'all 0.2s';
+
+        // 鼠标悬停效果
+        itemDiv.addEventListener('mouseenter', function () {
+            this.style.backgroundColor = '#eaedf7';
+            this.style.borderColor = '#0dcaf0';
+            // 展开完整代码
+            const codeContainer = this.querySelector('.history-code');
+            if (codeContainer && !codeContainer.dataset.expanded) {
+                codeContainer.dataset.expanded = 'true';
+                codeContainer.innerHTML = `<pre class="bg-dark text-light p-2 rounded mb-0" style="font-size: 12px; max-height: 300px; overflow: auto; white-space: pre-wrap;">${escapeHtml(record.code)}</pre>`;
+            }
+        });
+        itemDiv.addEventListener('mouseleave', function () {
+            this.style.backgroundColor = '';
+            this.style.borderColor = '';
+            // 恢复为预览
+            const codeContainer = this.querySelector('.history-code');
+            if (codeContainer) {
+                const preview = codePreview;
+                const codeLines = preview.split('\n').length;
+                const codeHeight = Math.min(codeLines, 5);
+                codeContainer.innerHTML = `<pre class=\"bg-dark text-light p-2 rounded mb-0\" style=\"font-size: 12px; max-height: ${codeHeight * 1.5}em; overflow: hidden; white-space: pre-wrap;\">${escapeHtml(preview)}</pre>`;
+                codeContainer.dataset.expanded = '';
+            }
+        });
+
+        // 点击加载代码
+        itemDiv.addEventListener('click', function () {
+            loadCodeFromHistory(record.code);
+            const modal = bootstrap.Modal.getInstance(document.getElementById('historyModal'));
+            modal.hide();
+        });
+
+        // 代码预览（只显示前100个字符）
+        const codePreview = record.code.length > 100
+            ? record.code.substring(0, 100) + '...'
+            : record.code;
+        const codeLines = codePreview.split('\n').length;
+        const codeHeight = Math.min(codeLines, 5);
+
+        itemDiv.innerHTML = `
+            <div class="card-body p-3">
+                <div class="d-flex justify-content-between align-items-start mb-2">
+                    <small class="text-muted">
+                        <i class="fas fa-clock"></i> ${record.executed_at}
+                    </small>
+                    <span class="badge bg-secondary" style="background-color: #6b859e !important;">ID: ${record.id}</span>
+                </div>
+                <div class="history-code">
+                    <pre class="bg-dark text-light p-2 rounded mb-0" style="font-size: 12px; max-height: ${codeHeight * 1.5}em; overflow: hidden; white-space: pre-wrap;">${escapeHtml(codePreview)}</pre>
+                </div>
+            </div>
+        `;
+
+        return itemDiv;
+    }
+
+    function loadCodeFromHistory(code) {
+        if (userCodeMirrorEditor) {
+            userCodeMirrorEditor.setValue(code);
+            userCodeMirrorEditor.focus();
+            // 滚动到编辑器顶部
+            userCodeMirrorEditor.setCursor(0, 0);
+        }
+    }
+
+    function escapeHtml(text) {
+        const div = document.createElement('div');
+        div.textContent = text;
+        return div.innerHTML;
+    }
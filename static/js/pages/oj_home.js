@@ -0,0 +1,682 @@
+    let problemList = [];
+    let currentProblemId = null;
+    let codeMirrorEditor = null;
+    let lastSubmissionsCache = [];
+    let currentStatusFilter = 'ALL';
+    let currentUserId = null;
+    // 是否启用庆祝动画（可持久化到 sessionStorage）
+    let celebrateEnabled = true;
+    const draftSaveDebounceMs = 400;
+    let draftSaveTimer = null;
+
+    function getDraftKey(problemId) {
+        const uidPart = currentUserId ? String(currentUserId) : 'guest';
+        return `oj_draft_${uidPart}_${problemId}`;
+    }
+
+    function saveDraft(problemId, code) {
+        if (!problemId) return;
+        try { sessionStorage.setItem(getDraftKey(problemId), code || ''); } catch (e) { }
+    }
+
+    function loadDraft(problemId) {
+        if (!problemId) return '';
+        try { return sessionStorage.getItem(getDraftKey(problemId)) || ''; } catch (e) { return ''; }
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        initEditor();
+        bindEvents();
+        initCelebrationToggle();
+        ensureCelebrationOverlay();
+        // 读取用户上下文（用于草稿隔离）
+        const uc = document.getElementById('user-context');
+        if (uc && uc.dataset && uc.dataset.userId) {
+            currentUserId = uc.dataset.userId;
+        }
+        loadProblems();
+    });
+
+    function initEditor() {
+        const editorHost = document.getElementById('oj-editor');
+        codeMirrorEditor = CodeMirror(editorHost, {
+            mode: 'python',
+            theme: 'monokai',
+            lineNumbers: true,
+            indentUnit: 4,
+            tabSize: 4,
+            indentWithTabs: false,
+            lineWrapping: true,
+            autoCloseBrackets: true,
+            matchBrackets: true,
+            placeholder: "# 在这里编写解题代码\nprint('Hello OJ')",
+            extraKeys: {
+                "Ctrl-Enter": function () { submitCurrentCode(); }
+            }
+        });
+        // 编辑时自动保存草稿（按题目）
+        codeMirrorEditor.on('change', function () {
+            if (!currentProblemId) return;
+            if (draftSaveTimer) clearTimeout(draftSaveTimer);
+            draftSaveTimer = setTimeout(function () {
+                saveDraft(currentProblemId, codeMirrorEditor.getValue());
+            }, draftSaveDebounceMs);
+        });
+    }
+
+    // 确保 overlay 在 document.body 下（避免被局部 stacking context 限制）
+    function ensureCelebrationOverlay() {
+        try {
+            const overlay = document.getElementById('celebration-overlay');
+            if (!overlay) return;
+            // 如果 overlay 已经在 body 下则不移动
+            if (overlay.parentElement !== document.body) {
+                document.body.appendChild(overlay);
+            }
+            // 强制样式为覆盖全屏的 fixed 布局
+            overlay.style.position = 'fixed';
+            overlay.style.left = '0';
+            overlay.style.top = '0';
+            overlay.style.width = '100%';
+            overlay.style.height = '100%';
+            overlay.style.zIndex = '2147483647';
+            overlay.style.pointerEvents = 'none';
+            overlay.style.display = 'none';
+            const canvas = overlay.querySelector('canvas');
+            if (canvas) {
+                canvas.style.display = 'block';
+            }
+        } catch (e) { console.warn('ensureCelebrationOverlay failed', e); }
+    }
+
+    function bindEvents() {
+        document.getElementById('refresh-problems').addEventListener('click', loadProblems);
+        document.getElementById('problem-select').addEventListener('change', function () {
+            const id = this.value;
+            if (!id) return;
+            const prevId = currentProblemId;
+            // 切换前保存上一题草稿
+            if (prevId && codeMirrorEditor) {
+                saveDraft(prevId, codeMirrorEditor.getValue());
+            }
+            currentProblemId = id;
+            // 切换后恢复该题草稿
+            if (codeMirrorEditor) {
+                const draft = loadDraft(id);
+                codeMirrorEditor.setValue(draft || '');
+            }
+            // 切换题目时清空运行/判题结果与错误详情
+            (function resetResultArea() {
+                const outputPre = document.getElementById('oj-output')?.querySelector('pre');
+                const infoEl = document.getElementById('submit-info');
+                const toggleBtn = document.getElementById('toggle-error-detail');
+                const failedPanel = document.getElementById('oj-failed-detail');
+                if (outputPre) outputPre.textContent = '提交后在此显示判题结果...';
+                if (infoEl) infoEl.textContent = '';
+                if (toggleBtn) toggleBtn.style.display = 'none';
+                if (failedPanel) failedPanel.style.display = 'none';
+            })();
+            loadProblemDetail(id);
+            loadSubmissions(id);
+        });
+        document.getElementById('format-code').addEventListener('click', formatCode);
+        document.getElementById('submit-code').addEventListener('click', submitCurrentCode);
+        const openBtn = document.getElementById('open-submissions');
+        if (openBtn) {
+            openBtn.addEventListener('click', function () {
+                const modal = new bootstrap.Modal(document.getElementById('submissionModal'));
+                modal.show();
+                loadSubmissions(currentProblemId);
+            });
+        }
+
+        const filterSel = document.getElementById('submission-status-filter');
+        if (filterSel) {
+            filterSel.addEventListener('change', function () {
+                currentStatusFilter = this.value || 'ALL';
+                renderSubmissionsFromCache();
+            });
+        }
+
+        const clearResultBtn = document.getElementById('clear-result-btn');
+        if (clearResultBtn) {
+            clearResultBtn.addEventListener('click', function () {
+                const output = document.getElementById('oj-output').querySelector('pre');
+                const info = document.getElementById('submit-info');
+                const toggleBtn = document.getElementById('toggle-error-detail');
+                const panel = document.getElementById('oj-failed-detail');
+                if (output) output.textContent = '提交后在此显示判题结果...';
+                if (info) info.textContent = '';
+                if (toggleBtn) toggleBtn.style.display = 'none';
+                if (panel) panel.style.display = 'none';
+            });
+        }
+
+        // 庆祝开关
+        const celebrateToggle = document.getElementById('celebrate-toggle');
+        if (celebrateToggle) {
+            celebrateToggle.addEventListener('change', function () {
+                celebrateEnabled = !!this.checked;
+                try { sessionStorage.setItem('oj_celebrate_enabled', celebrateEnabled ? '1' : '0'); } catch (e) { }
+            });
+        }
+    }
+
+    function loadProblems() {
+        toggleProblemState('loading');
+        fetch('/api/oj/problems')
+            .then(r => r.json())
+            .then(data => {
+                if (!data.success) throw new Error(data.error || '获取题目失败');
+                problemList = data.problems || [];
+                renderProblemSelect(problemList);
+                toggleProblemState(problemList.length ? 'loaded' : 'empty');
+            })
+            .catch(err => {
+                showProblemError(err.message || '加载失败');
+            });
+    }
+
+    function renderProblemSelect(list) {
+        const sel = document.getElementById('problem-select');
+        sel.innerHTML = '';
+        if (!list || list.length === 0) return;
+        list.forEach(p => {
+            const opt = document.createElement('option');
+            opt.value = p.id;
+            opt.textContent = `${p.id}. ${p.title}`;
+            sel.appendChild(opt);
+        });
+        // 选中第一题并加载
+        sel.value = list[0].id;
+        currentProblemId = list[0].id;
+        // 初次进入尝试恢复草稿
+        if (codeMirrorEditor) {
+            const draft = loadDraft(currentProblemId);
+            if (draft) codeMirrorEditor.setValue(draft);
+        }
+        loadProblemDetail(currentProblemId);
+        loadSubmissions(currentProblemId);
+    }
+
+    function loadProblemDetail(problemId) {
+        const detail = document.getElementById('problem-detail');
+        detail.innerHTML = '<div class="text-muted">加载中...</div>';
+        fetch(`/api/oj/problem/${problemId}`)
+            .then(r => r.json())
+            .then(data => {
+                if (!data.success) throw new Error(data.error || '获取题目详情失败');
+                const p = data.problem;
+
+                // 构建示例的markdown内容
+                let exampleHtml = '';
+                if (p.example) {
+                    const input = escapeHtml(p.example.input || '');
+                    const output = escapeHtml(p.example.output || '');
+                    // 使用HTML直接构建，确保加粗显示
+                    exampleHtml = `
+                        <h6 class="mt-3 mb-2"><strong>示例:</strong></h6>
+                        <pre class="oj-code-block"><code><strong>输入：</strong>${input}\n<strong>输出：</strong>${output}</code></pre>
+                    `;
+                }
+
+                // 构建函数名的markdown内容
+                let functionNameHtml = '';
+                if (p.function_name) {
+                    const functionName = escapeHtml(p.function_name);
+                    // 使用HTML直接构建
+                    functionNameHtml = `
+                        <h6 class="mt-3 mb-2"><strong>函数名:</strong></h6>
+                        <pre class="oj-code-block"><code>${functionName}</code></pre>
+                    `;
+                }
+
+                detail.innerHTML = `
+                    <h5 class="mb-2">${escapeHtml(p.title || '')}</h5>
+                    <div class="mb-2"><span class="badge bg-primary me-2">ID: ${escapeHtml(p.id)}</span></div>
+                    <hr/>
+                    <div style="white-space: pre-wrap;">${escapeHtml(p.description || '')}</div>
+                    <div class="mt-3"></div>
+                    ${exampleHtml}
+                    ${functionNameHtml}
+                `;
+
+                // 如果使用了markdown-it，需要触发代码高亮
+                if (window.Prism && (exampleHtml || functionNameHtml)) {
+                    Prism.highlightAllUnder(detail);
+                }
+            })
+            .catch(err => {
+                detail.innerHTML = `<div class="alert alert-danger">${escapeHtml(err.message || '加载失败')}</div>`;
+            });
+    }
+
+    function submitCurrentCode() {
+        const submitBtn = document.getElementById('submit-code');
+        const info = document.getElementById('submit-info');
+        const output = document.getElementById('oj-output').querySelector('pre');
+        const code = (codeMirrorEditor && codeMirrorEditor.getValue()) || '';
+        if (!currentProblemId) {
+            info.textContent = '请先选择题目';
+            return;
+        }
+        if (!code.trim()) {
+            info.textContent = '请先输入代码';
+            return;
+        }
+
+        const start = Date.now();
+        submitBtn.disabled = true;
+        submitBtn.innerHTML = '<span class="loading-spinner"></span> 提交中...';
+        info.textContent = '';
+        output.textContent = '判题中...';
+
+        fetch('/api/oj/submit', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ problem_id: currentProblemId, code })
+        })
+            .then(r => r.json())
+            .then(data => {
+                const elapsed = ((Date.now() - start) / 1000).toFixed(3);
+                if (!data.success) {
+                    info.innerHTML = `<i class="fas fa-times text-danger"></i> 提交失败 (${elapsed}s)`;
+                    output.textContent = data.error || '提交失败';
+                    return;
+                }
+                const res = data.result || {};
+                const status = res.status || 'UNKNOWN';
+                const passed = res.passed ?? 0;
+                const total = res.total ?? 0;
+                const execTime = res.execution_time ?? '-';
+                // 提取错误信息（如 ImportError 等）
+                let errMsg = '';
+                if (res.error) errMsg = String(res.error);
+                else if (res.failed_case && (res.failed_case.error || res.failed_case.message)) {
+                    errMsg = String(res.failed_case.error || res.failed_case.message);
+                }
+                info.innerHTML = `<i class=\"fas fa-check text-success\"></i> 提交成功 (${elapsed}s)`;
+                output.textContent = `状态: ${status}\n通过用例: ${passed}/${total}\n执行时间: ${execTime} ms${errMsg ? `\n错误: ${errMsg}` : ''}`;
+                renderFailedCase(res.failed_case);
+                // 如为 AC 并且用户开启庆祝，则播放庆祝动画
+                if ((status || '').toUpperCase() === 'AC' && celebrateEnabled) {
+                    playCelebration();
+                } else {
+                    // 若非 AC，则确保停止可能在运行的庆祝
+                    stopCelebration();
+                }
+                loadSubmissions(currentProblemId);
+            })
+            .catch(err => {
+                info.innerHTML = `<i class="fas fa-times text-danger"></i> 网络错误`;
+                output.textContent = err.message || '网络错误';
+            })
+            .finally(() => {
+                submitBtn.disabled = false;
+                submitBtn.innerHTML = '<i class="fas fa-paper-plane"></i> 提交判题';
+            });
+    }
+
+    function loadSubmissions(problemId) {
+        const loading = document.getElementById('submission-loading');
+        const empty = document.getElementById('submission-empty');
+        const errorBox = document.getElementById('submission-error');
+        const listHost = document.getElementById('submission-list');
+        if (loading && empty && errorBox && listHost) {
+            loading.style.display = 'block';
+            empty.style.display = 'none';
+            errorBox.style.display = 'none';
+            listHost.style.display = 'none';
+            listHost.innerHTML = '';
+        }
+        const qs = problemId ? `?problem_id=${encodeURIComponent(problemId)}` : '';
+        fetch(`/api/oj/submissions${qs}`)
+            .then(r => r.json())
+            .then(data => {
+                if (loading) loading.style.display = 'none';
+                if (!data.success) throw new Error(data.error || '加载失败');
+                lastSubmissionsCache = data.submissions || [];
+                if (lastSubmissionsCache.length === 0) {
+                    if (empty) empty.style.display = 'block';
+                    return;
+                }
+                renderSubmissionsFromCache();
+            })
+            .catch(err => {
+                if (loading) loading.style.display = 'none';
+                if (errorBox) {
+                    errorBox.innerHTML = `<div class="alert alert-danger">${escapeHtml(err.message || '加载失败')}</div>`;
+                    errorBox.style.display = 'block';
+                }
+            });
+    }
+
+    function renderSubmissionsFromCache() {
+        const listHost = document.getElementById('submission-list');
+        const empty = document.getElementById('submission-empty');
+        if (!listHost) return;
+        listHost.innerHTML = '';
+        let filtered = lastSubmissionsCache || [];
+        if (currentStatusFilter && currentStatusFilter !== 'ALL') {
+            filtered = filtered.filter(s => (s.status || '').toUpperCase() === currentStatusFilter);
+        }
+        if (filtered.length === 0) {
+            if (empty) empty.style.display = 'block';
+            return;
+        }
+        if (empty) empty.style.display = 'none';
+        const frag = document.createDocumentFragment();
+        filtered.forEach(s => frag.appendChild(renderSubmissionItem(s)));
+        listHost.appendChild(frag);
+        listHost.style.display = 'block';
+    }
+
+    function renderSubmissionItem(s) {
+        const div = document.createElement('div');
+        div.className = 'card mb-2 submission-item';
+        const statusClass = mapStatusToClass(s.status);
+        div.style.borderLeftColor = statusClass.color;
+        const fullCode = s.code || '';
+        // 优化错误信息判断：只有当 error_message 存在且格式化后为有效错误信息时才显示
+        let err = '';
+        // 检查 error_message 是否存在且不为 null/undefined/空字符串/"null"字符串
+        if (s.error_message && s.error_message !== null && s.error_message !== undefined &&
+            String(s.error_message).trim() !== '' && String(s.error_message).toLowerCase() !== 'null') {
+            const formattedErr = formatErrorMessage(s.error_message);
+            // 再次检查格式化后的结果是否为有效错误信息
+            if (formattedErr && formattedErr.trim() && formattedErr.toLowerCase() !== 'null') {
+                err = formattedErr;
+            }
+        }
+        div.innerHTML = `
+            <div class="card-body p-3">
+                <div class="d-flex justify-content-between align-items-center mb-2">
+                    <div class="d-flex align-items-center gap-2">
+                        <span class="badge ${statusClass.badge} status-badge">${escapeHtml(s.status || '—')}</span>
+                        <small class="text-muted">${escapeHtml(s.submitted_at || '')}</small>
+                    </div>
+                    <span class="badge bg-secondary" style="background-color: #93aec1 !important;">#${s.id}</span>
+                </div>
+                <div class="small text-muted">用例: ${s.passed_cases ?? 0}/${s.total_cases ?? 0} | 时间: ${s.execution_time ?? '-'} ms</div>
+                ${err ? `<div class=\"mt-2\"><span class=\"badge bg-danger me-2\">错误</span><span class=\"text-danger\">${escapeHtml(err)}</span></div>` : ''}
+                <pre class="bg-dark text-light p-2 rounded mt-2 mb-0" style="font-size: 12px; max-height: 14em; overflow: auto; white-space: pre-wrap;">${escapeHtml(fullCode)}</pre>
+            </div>
+        `;
+        return div;
+    }
+
+    function formatErrorMessage(msg) {
+        // 如果消息本身就是 null 或无效值，返回空字符串
+        if (!msg || msg === null || msg === undefined || String(msg).trim() === '' ||
+            String(msg).toLowerCase() === 'null') {
+            return '';
+        }
+        try {
+            const obj = JSON.parse(msg);
+            if (obj && typeof obj === 'object') {
+                // 检查解析后的对象中的错误字段
+                if (obj.error && obj.error !== null && String(obj.error).toLowerCase() !== 'null') {
+                    return String(obj.error);
+                }
+                if (obj.message && obj.message !== null && String(obj.message).toLowerCase() !== 'null') {
+                    return String(obj.message);
+                }
+                if (obj.detail && obj.detail !== null && String(obj.detail).toLowerCase() !== 'null') {
+                    return String(obj.detail);
+                }
+                if (obj.type && obj.type !== null && String(obj.type).toLowerCase() !== 'null') {
+                    return String(obj.type);
+                }
+            }
+            // 如果解析后没有有效字段，检查原始消息
+            const msgStr = String(msg);
+            if (msgStr.toLowerCase() === 'null' || msgStr.trim() === '') {
+                return '';
+            }
+            return msgStr;
+        } catch (_) {
+            // JSON 解析失败，直接返回原始消息（如果有效）
+            const msgStr = String(msg);
+            if (msgStr.toLowerCase() === 'null' || msgStr.trim() === '') {
+                return '';
+            }
+            return msgStr;
+        }
+    }
+
+    function mapStatusToClass(status) {
+        const k = (status || '').toUpperCase();
+        switch (k) {
+            case 'AC': return { badge: 'bg-success', color: '#28a745' };
+            case 'WA': return { badge: 'badge-wa', color: '#dc3545' };
+            case 'TLE': return { badge: 'bg-warning text-dark', color: '#ffc107' };
+            case 'RE': return { badge: 'bg-secondary', color: '#6c757d' };
+            case 'CE': return { badge: 'bg-info text-dark', color: '#0dcaf0' };
+            default: return { badge: 'badge-default', color: '#343a40' };
+        }
+    }
+
+    function formatCode() {
+        if (!codeMirrorEditor) return;
+        const code = codeMirrorEditor.getValue();
+        const lines = code.split('\n');
+        let indentLevel = 0;
+        const out = [];
+        lines.forEach(line => {
+            const t = line.trim();
+            if (!t) { out.push(''); return; }
+            if (t.startsWith('else') || t.startsWith('elif') || t.startsWith('except') || t.startsWith('finally')) {
+                indentLevel = Math.max(0, indentLevel - 1);
+            }
+            out.push('    '.repeat(indentLevel) + t);
+            if (t.endsWith(':')) indentLevel++;
+            if (!t.startsWith(' ') && !t.endsWith(':') && !t.startsWith('else') && !t.startsWith('elif') && !t.startsWith('except') && !t.startsWith('finally')) {
+                indentLevel = 0;
+            }
+        });
+        codeMirrorEditor.setValue(out.join('\n'));
+    }
+
+
+    // ===== 失败用例详情渲染与折叠 =====
+    function renderFailedCase(failed) {
+        const toggleBtn = document.getElementById('toggle-error-detail');
+        const panel = document.getElementById('oj-failed-detail');
+        const setText = (id, val) => { const el = document.getElementById(id); if (el) el.textContent = val || ''; };
+        if (failed && (failed.input || failed.expected || failed.actual || failed.error || failed.message)) {
+            setText('fd-input', stringifyMaybeJson(failed.input));
+            setText('fd-expected', stringifyMaybeJson(failed.expected));
+            setText('fd-actual', stringifyMaybeJson(failed.actual));
+            setText('fd-error', failed.error || failed.message || '');
+            if (toggleBtn && panel) {
+                toggleBtn.style.display = '';
+                panel.style.display = 'none';
+                toggleBtn.innerHTML = '<i class="fas fa-chevron-down"></i> 查看错误详情';
+                toggleBtn.onclick = () => {
+                    const showing = panel.style.display !== 'none';
+                    panel.style.display = showing ? 'none' : '';
+                    toggleBtn.innerHTML = showing ? '<i class="fas fa-chevron-down"></i> 查看错误详情' : '<i class="fas fa-chevron-up"></i> 收起错误详情';
+                };
+            }
+        } else {
+            if (toggleBtn) toggleBtn.style.display = 'none';
+            if (panel) panel.style.display = 'none';
+        }
+    }
+    function stringifyMaybeJson(v) {
+        if (v == null) return '';
+        if (typeof v === 'string') return v;
+        try { return JSON.stringify(v); } catch (_) { return String(v); }
+    }
+
+    function toggleProblemState(state) {
+        document.getElementById('problem-loading').style.display = (state === 'loading') ? 'block' : 'none';
+        document.getElementById('problem-empty').style.display = (state === 'empty') ? 'block' : 'none';
+        document.getElementById('problem-loaded').style.display = (state === 'loaded') ? 'block' : 'none';
+        document.getElementById('problem-load-error').style.display = (state === 'error') ? 'block' : 'none';
+    }
+
+    function showProblemError(msg) {
+        const box = document.getElementById('problem-load-error');
+        box.innerHTML = `<div class="alert alert-danger">${escapeHtml(msg)}</div>`;
+        toggleProblemState('error');
+    }
+
+    function escapeHtml(text) {
+        const div = document.createElement('div');
+        div.textContent = (text ?? '').toString();
+        return div.innerHTML;
+    }
+
+    // ====== 庆祝动画功能 (canvas confetti + 边缘彩虹 + 声音) ======
+    function initCelebrationToggle() {
+        try {
+            const stored = sessionStorage.getItem('oj_celebrate_enabled');
+            if (stored !== null) celebrateEnabled = (stored === '1');
+        } catch (e) { }
+        const el = document.getElementById('celebrate-toggle');
+        if (el) el.checked = !!celebrateEnabled;
+    }
+
+    let _celebrationRAF = null;
+    let _confettiState = null;
+    function playCelebration() {
+        const overlay = document.getElementById('celebration-overlay');
+        if (!overlay) return;
+        console.debug('playCelebration called');
+        // 强制确保可见并置顶（调试/兼容性）
+        // 确保挂载到 body 顶层，避免父元素 stacking/transform 干扰
+        try {
+            if (overlay.parentElement !== document.body) {
+                document.body.appendChild(overlay);
+            }
+        } catch (_) {}
+        // 直接用内联样式强制可见（与用户验证一致）
+        try { overlay.style.setProperty('display', 'block', 'important'); } catch(_) { overlay.style.display = 'block'; }
+        overlay.style.position = 'fixed';
+        overlay.style.left = '0';
+        overlay.style.top = '0';
+        overlay.style.width = '100%';
+        overlay.style.height = '100%';
+        overlay.style.zIndex = '2147483647';
+        // 动画期间允许交互，结束后恢复
+        overlay.style.pointerEvents = 'auto';
+        overlay.style.opacity = '';
+        overlay.style.background = 'rgba(0,0,0,0.15)';
+        // 保持背景半透明，突出烟花与文字
+        const canvas = overlay.querySelector('canvas');
+        if (!canvas) return;
+        // 支持高 DPI 屏幕：将真实像素尺寸按 devicePixelRatio 缩放
+        const dpr = window.devicePixelRatio || 1;
+        const cssW = window.innerWidth;
+        const cssH = window.innerHeight;
+        canvas.style.width = cssW + 'px';
+        canvas.style.height = cssH + 'px';
+        canvas.width = Math.floor(cssW * dpr);
+        canvas.height = Math.floor(cssH * dpr);
+        const ctx = canvas.getContext('2d');
+        if (!ctx) {
+            console.error('celebration: canvas 2d context is null');
+            return;
+        }
+        // 可选：你可打开以下日志观察尺寸
+        // console.debug('overlay rect', overlay.getBoundingClientRect());
+        // console.debug('canvas rect', canvas.getBoundingClientRect());
+        // 将坐标系缩放到 CSS 像素单位
+        ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+        // 初始化粒子
+        const particles = [];
+        const colors = ['#ff6b6b','#ffd166','#06d6a0','#4cc9f0','#b197fc','#ff8fab'];
+        const cx = cssW / 2;
+        const cy = cssH / 3;
+        const count = Math.min(300, Math.floor((cssW * cssH) / 2000));
+        for (let i = 0; i < count; i++) {
+            const angle = Math.random() * Math.PI * 2;
+            const speed = 2 + Math.random() * 6;
+            particles.push({
+                x: cx,
+                y: cy,
+                vx: Math.cos(angle) * speed * (0.6 + Math.random()*0.8),
+                vy: Math.sin(angle) * speed * (0.6 + Math.random()*0.8) - Math.random()*2,
+                r: 3 + Math.random()*5,
+                c: colors[Math.floor(Math.random()*colors.length)],
+                rot: Math.random()*360,
+                vr: (Math.random()-0.5)*10
+            });
+        }
+        _confettiState = { ctx, canvas, particles, start: performance.now(), duration: 6000 };
+        playVictorySound();
+        // 连续补充烟花粒子（更持久的燃放效果）
+        let emitterTimer = null;
+        function emitBurst() {
+            const burstCount = Math.floor(Math.min(120, (cssW * cssH) / 30000));
+            for (let i = 0; i < burstCount; i++) {
+                const angle = Math.random() * Math.PI * 2;
+                const speed = 2 + Math.random() * 6;
+                _confettiState.particles.push({
+                    x: Math.random()*cssW,
+                    y: Math.random()*cssH*0.6,
+                    vx: Math.cos(angle) * speed * (0.6 + Math.random()*0.8),
+                    vy: Math.sin(angle) * speed * (0.6 + Math.random()*0.8) - Math.random()*2,
+                    r: 3 + Math.random()*5,
+                    c: colors[Math.floor(Math.random()*colors.length)],
+                    rot: Math.random()*360,
+                    vr: (Math.random()-0.5)*10
+                });
+            }
+        }
+        emitterTimer = setInterval(()=>{ if (_confettiState) emitBurst(); }, 500);
+        function step(t) {
+            if (!_confettiState) return;
+            const s = _confettiState;
+            const elapsed = t - s.start;
+            // 按 CSS 像素清屏
+            ctx.clearRect(0,0,cssW, cssH);
+            // 逐帧绘制粒子
+            for (let p of s.particles) {
+                p.x += p.vx; p.y += p.vy; p.vy += 0.12; p.vr += 0.2; p.rot += p.vr;
+                const alpha = 1 - (elapsed / s.duration);
+                ctx.save();
+                ctx.globalAlpha = Math.max(0, alpha);
+                ctx.translate(p.x, p.y);
+                ctx.rotate(p.rot * Math.PI / 180);
+                ctx.fillStyle = p.c;
+                ctx.fillRect(-p.r/2, -p.r/2, p.r, p.r*1.6);
+                ctx.restore();
+            }
+            // 流光（轻微）
+            if (elapsed < s.duration) {
+                _celebrationRAF = requestAnimationFrame(step);
+            } else {
+                // 清理发射器并渐隐处理
+                try { if (emitterTimer) clearInterval(emitterTimer); } catch(_){}
+                stopCelebration();
+            }
+        }
+        if (_celebrationRAF) cancelAnimationFrame(_celebrationRAF);
+        _celebrationRAF = requestAnimationFrame(step);
+    }
+
+    function stopCelebration() {
+        const overlay = document.getElementById('celebration-overlay');
+        if (overlay) {
+            try { overlay.style.setProperty('display', 'none', 'important'); } catch(_) { overlay.style.display = 'none'; }
+            overlay.style.pointerEvents = 'none';
+            overlay.style.background = 'transparent';
+            overlay.style.opacity = '';
+        }
+        if (_celebrationRAF) cancelAnimationFrame(_celebrationRAF);
+        _celebrationRAF = null;
+        _confettiState = null;
+    }
+
+    function playVictorySound() {
+        try {
+            const audio = new Audio('/static/mp3/bgm.mp3');
+            audio.volume = 0.6;
+            audio.currentTime = 0;
+            audio.play().catch(()=>{});
+            // 6 秒后淡出并停止
+            setTimeout(()=>{ try{ audio.pause(); }catch(_){} }, 6000);
+        } catch (e) { /* 如果浏览器不支持 Audio 安静失败 */ }
+    }
@@ -0,0 +1,379 @@
+    document.addEventListener('DOMContentLoaded', function () {
+        // 使用后端传递的真实数据
+        function generateActivityData() {
+            // 从后端获取的活跃度数据
+            let backendData = [];
+            try {
+                const dataElement = document.getElementById('activity-data');
+                if (dataElement && dataElement.textContent) {
+                    backendData = JSON.parse(dataElement.textContent);
+                }
+            } catch (e) {
+                console.warn('解析活跃度数据失败:', e);
+                backendData = [];
+            }
+
+            const data = [];
+
+            if (backendData && backendData.length > 0) {
+                backendData.forEach(item => {
+                    data.push({
+                        date: new Date(item.date),
+                        level: item.level || 0,
+                        count: item.count || 0,
+                        study_time: item.study_time || 0,
+                        notes_count: item.notes_count || 0,
+                        completed_modules: item.completed_modules || 0,
+                        solved_problems: item.solved_problems || 0
+                    });
+                });
+            }
+
+            return data;
+        }
+
+        // 渲染活跃度图表
+        function renderActivityGraph() {
+            const data = generateActivityData();
+            const graphContainer = document.getElementById('activityGraph');
+            const monthsContainer = document.getElementById('activityMonths');
+            graphContainer.innerHTML = '';
+            monthsContainer.innerHTML = '';
+
+            // 如果没有数据，直接返回
+            if (!data || data.length === 0) {
+                return;
+            }
+
+            // 按周组织数据
+            const weeks = [];
+            let currentWeek = [];
+            let currentDate = new Date(data[0].date);
+
+            data.forEach((item, index) => {
+                const date = new Date(item.date);
+                const dayOfWeek = date.getDay(); // 0 = 周日, 1 = 周一, ...
+
+                // 如果是周日或第一周，开始新的一周
+                if (dayOfWeek === 0 || currentWeek.length === 0) {
+                    if (currentWeek.length > 0) {
+                        // 如果当前周不足7天，用空数据填充
+                        while (currentWeek.length < 7) {
+                            currentWeek.push({ level: 0, date: null, count: 0 });
+                        }
+                        weeks.push(currentWeek);
+                    }
+                    currentWeek = [];
+                }
+
+                currentWeek.push({
+                    level: item.level,
+                    date: item.date,
+                    count: item.count,
+                    study_time: item.study_time,
+                    notes_count: item.notes_count,
+                    completed_modules: item.completed_modules,
+                    solved_problems: item.solved_problems
+                });
+            });
+
+            // 添加最后一周
+            if (currentWeek.length > 0) {
+                while (currentWeek.length < 7) {
+                    currentWeek.push({ level: 0, date: null, count: 0 });
+                }
+                weeks.push(currentWeek);
+            }
+
+            // 渲染月份标签
+            const monthLabels = [];
+            let lastMonth = -1;
+            weeks.forEach((week, weekIndex) => {
+                const firstDay = week.find(day => day.date !== null);
+                if (firstDay) {
+                    const date = new Date(firstDay.date);
+                    const month = date.getMonth();
+                    if (month !== lastMonth) {
+                        monthLabels.push({
+                            month: month,
+                            weekIndex: weekIndex,
+                            label: date.toLocaleDateString('zh-CN', { month: 'short' })
+                        });
+                        lastMonth = month;
+                    }
+                }
+            });
+
+            monthLabels.forEach(item => {
+                const monthLabel = document.createElement('div');
+                monthLabel.className = 'activity-month-label';
+                monthLabel.textContent = item.label;
+                monthsContainer.appendChild(monthLabel);
+            });
+
+            // 渲染周数据
+            weeks.forEach((week, weekIndex) => {
+                const weekContainer = document.createElement('div');
+                weekContainer.className = 'activity-week';
+
+                week.forEach((day, dayIndex) => {
+                    const dayElement = document.createElement('div');
+                    dayElement.className = 'activity-day';
+                    dayElement.setAttribute('data-level', day.level);
+
+                    if (day.date) {
+                        const dateObj = new Date(day.date);
+                        const dateStr = dateObj.toLocaleDateString('zh-CN');
+                        const studyTime = day.study_time || 0;
+                        const notesCount = day.notes_count || 0;
+                        const modulesCount = day.completed_modules || 0;
+                        const problemsCount = day.solved_problems || 0;
+
+                        // 构建详细的活动信息文本
+                        const activityParts = [];
+                        if (studyTime > 0) {
+                            activityParts.push(`学习 ${studyTime} 分钟`);
+                        }
+                        if (notesCount > 0) {
+                            activityParts.push(`${notesCount} 条笔记`);
+                        }
+                        if (modulesCount > 0) {
+                            activityParts.push(`完成 ${modulesCount} 个模块`);
+                        }
+                        if (problemsCount > 0) {
+                            activityParts.push(`解决 ${problemsCount} 道题目`);
+                        }
+
+                        const activityText = activityParts.length > 0
+                            ? `${dateStr}: ${activityParts.join('，')}`
+                            : `${dateStr}: 无活动`;
+
+                        dayElement.setAttribute('title', activityText);
+                        dayElement.setAttribute('data-date', dateStr);
+                        dayElement.setAttribute('data-count', day.count || 0);
+                        dayElement.setAttribute('data-study-time', studyTime);
+                        dayElement.setAttribute('data-notes-count', notesCount);
+                        dayElement.setAttribute('data-modules-count', modulesCount);
+                        dayElement.setAttribute('data-problems-count', problemsCount);
+
+                        // 添加悬停提示
+                        dayElement.addEventListener('mouseenter', function (e) {
+                            const tooltip = document.getElementById('activityTooltip');
+                            const date = this.getAttribute('data-date');
+                            const studyTime = this.getAttribute('data-study-time');
+                            const notesCount = this.getAttribute('data-notes-count');
+                            const modulesCount = this.getAttribute('data-modules-count');
+                            const problemsCount = this.getAttribute('data-problems-count');
+
+                            const tooltipParts = [];
+                            if (studyTime > 0) {
+                                tooltipParts.push(`学习 ${studyTime} 分钟`);
+                            }
+                            if (notesCount > 0) {
+                                tooltipParts.push(`${notesCount} 条笔记`);
+                            }
+                            if (modulesCount > 0) {
+                                tooltipParts.push(`完成 ${modulesCount} 个模块`);
+                            }
+                            if (problemsCount > 0) {
+                                tooltipParts.push(`解决 ${problemsCount} 道题目`);
+                            }
+
+                            if (tooltipParts.length > 0) {
+                                tooltip.textContent = `${date}: ${tooltipParts.join('，')}`;
+                            } else {
+                                tooltip.textContent = `${date}: 无活动`;
+                            }
+                            tooltip.classList.add('show');
+
+                            const rect = this.getBoundingClientRect();
+                            tooltip.style.left = (rect.left + rect.width / 2 - tooltip.offsetWidth / 2) + 'px';
+                            tooltip.style.top = (rect.top - tooltip.offsetHeight - 10) + 'px';
+                        });
+
+                        dayElement.addEventListener('mouseleave', function () {
+                            document.getElementById('activityTooltip').classList.remove('show');
+                        });
+                    }
+
+                    weekContainer.appendChild(dayElement);
+                });
+
+                graphContainer.appendChild(weekContainer);
+            });
+        }
+
+        // 头像上传功能
+        const avatarUploadArea = document.getElementById('avatarUploadArea');
+        const avatarFileInput = document.getElementById('avatarFileInput');
+        const avatarPreview = document.getElementById('avatarPreview');
+        const avatarPreviewContainer = document.getElementById('avatarPreviewContainer');
+        const saveAvatarBtn = document.getElementById('saveAvatarBtn');
+        const profileAvatar = document.getElementById('profileAvatar');
+        let selectedFile = null;
+
+        // 点击上传区域
+        avatarUploadArea.addEventListener('click', function () {
+            avatarFileInput.click();
+        });
+
+        // 拖拽上传
+        avatarUploadArea.addEventListener('dragover', function (e) {
+            e.preventDefault();
+            this.classList.add('dragover');
+        });
+
+        avatarUploadArea.addEventListener('dragleave', function (e) {
+            e.preventDefault();
+            this.classList.remove('dragover');
+        });
+
+        avatarUploadArea.addEventListener('drop', function (e) {
+            e.preventDefault();
+            this.classList.remove('dragover');
+            const files = e.dataTransfer.files;
+            if (files.length > 0) {
+                handleFileSelect(files[0]);
+            }
+        });
+
+        // 文件选择
+        avatarFileInput.addEventListener('change', function (e) {
+            if (this.files.length > 0) {
+                handleFileSelect(this.files[0]);
+            }
+        });
+
+        function handleFileSelect(file) {
+            // 验证文件类型
+            if (!file.type.startsWith('image/')) {
+                alert('请选择图片文件！');
+                return;
+            }
+
+            // 验证文件大小（2MB）
+            if (file.size > 2 * 1024 * 1024) {
+                alert('图片大小不能超过 2MB！');
+                return;
+            }
+
+            selectedFile = file;
+
+            // 预览图片
+            const reader = new FileReader();
+            reader.onload = function (e) {
+                avatarPreview.src = e.target.result;
+                avatarPreview.style.display = 'block';
+                saveAvatarBtn.disabled = false;
+            };
+            reader.readAsDataURL(file);
+        }
+
+        // 保存头像
+        saveAvatarBtn.addEventListener('click', function () {
+            if (!selectedFile) {
+                return;
+            }
+
+            // 显示上传中状态
+            const originalText = saveAvatarBtn.innerHTML;
+            saveAvatarBtn.disabled = true;
+            saveAvatarBtn.innerHTML = '<span class="spinner-border spinner-border-sm me-2"></span>上传中...';
+
+            // 使用 FormData 发送到后端
+            const formData = new FormData();
+            formData.append('avatar', selectedFile);
+
+            fetch('/api/upload-avatar', {
+                method: 'POST',
+                body: formData
+            })
+                .then(response => response.json())
+                .then(data => {
+                    if (data.success) {
+                        // 更新头像显示（添加时间戳避免缓存）
+                        const container = document.getElementById('profileAvatar');
+                        let img = container.querySelector('img');
+                        if (img) {
+                            // 如果已存在 img，更新 src
+                            img.src = data.avatar_url + '?t=' + Date.now();
+                        } else {
+                            // 如果不存在 img，创建新的 img 元素
+                            img = document.createElement('img');
+                            img.src = data.avatar_url + '?t=' + Date.now();
+                            img.alt = '用户头像';
+                            img.style.width = '100%';
+                            img.style.height = '100%';
+                            img.style.objectFit = 'cover';
+                            img.style.borderRadius = '50%';
+                            container.appendChild(img);
+                        }
+
+                        // 恢复按钮状态
+                        saveAvatarBtn.disabled = false;
+                        saveAvatarBtn.innerHTML = originalText;
+
+                        bootstrap.Modal.getInstance(document.getElementById('avatarUploadModal')).hide();
+
+                        // 显示成功消息
+                        const alertDiv = document.createElement('div');
+                        alertDiv.className = 'alert alert-success alert-dismissible fade show';
+                        alertDiv.innerHTML = `
+                        <strong>成功！</strong> ${data.message || '头像上传成功'}
+                        <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
+                    `;
+                        document.querySelector('.main-content .container').insertBefore(
+                            alertDiv,
+                            document.querySelector('.profile-header')
+                        );
+
+                        // 3秒后自动关闭提示
+                        setTimeout(() => {
+                            alertDiv.remove();
+                        }, 3000);
+                    } else {
+                        alert('上传失败: ' + (data.error || '未知错误'));
+                        saveAvatarBtn.disabled = false;
+                        saveAvatarBtn.innerHTML = originalText;
+                    }
+                })
+                .catch(error => {
+                    console.error('上传错误:', error);
+                    alert('上传失败，请稍后重试');
+                    saveAvatarBtn.disabled = false;
+                    saveAvatarBtn.innerHTML = originalText;
+                })
+                .finally(() => {
+                    // 重置状态
+                    if (!saveAvatarBtn.disabled) {
+                        selectedFile = null;
+                        avatarFileInput.value = '';
+                    }
+                });
+        });
+
+        // 模态框打开时，如果有当前头像，显示在预览中
+        document.getElementById('avatarUploadModal').addEventListener('show.bs.modal', function () {
+            const currentAvatarImg = document.querySelector('#profileAvatar img');
+            if (currentAvatarImg && currentAvatarImg.src) {
+                avatarPreview.src = currentAvatarImg.src;
+                avatarPreview.style.display = 'block';
+            } else {
+                avatarPreview.src = '';
+                avatarPreview.style.display = 'none';
+            }
+        });
+
+        // 模态框关闭时重置
+        document.getElementById('avatarUploadModal').addEventListener('hidden.bs.modal', function () {
+            avatarPreview.src = '';
+            avatarPreview.style.display = 'none';
+            saveAvatarBtn.disabled = true;
+            saveAvatarBtn.innerHTML = '保存';
+            selectedFile = null;
+            avatarFileInput.value = '';
+        });
+
+        // 初始化活跃度图表
+        renderActivityGraph();
+    });
@@ -0,0 +1,444 @@
+    document.addEventListener('DOMContentLoaded', function () {
+        const regexFunction = document.getElementById('regex-function');
+        const replacementGroup = document.getElementById('replacement-group');
+        const testButton = document.getElementById('test-regex');
+
+        // Show/hide replacement field based on function type
+        regexFunction.addEventListener('change', function () {
+            if (this.value === 're.sub') {
+                replacementGroup.style.display = 'block';
+            } else {
+                replacementGroup.style.display = 'none';
+            }
+        });
+
+        // Test regex button
+        testButton.addEventListener('click', function () {
+            const pattern = document.getElementById('regex-pattern').value;
+            const testString = document.getElementById('test-string').value;
+            const func = regexFunction.value;
+            const flags = document.getElementById('regex-flags').value;
+            const replacement = document.getElementById('replacement-text').value;
+
+            if (!pattern) {
+                showError('请输入正则表达式模式');
+                return;
+            }
+
+            if (!testString) {
+                showError('请输入测试字符串');
+                return;
+            }
+
+            testRegex(pattern, testString, func, flags, replacement);
+        });
+
+        // 输入时静态检查（语法错误、嵌套量词），停止输入 400ms 后请求
+        let checkTimer = null;
+        const checkInputs = ['regex-pattern', 'regex-flags'].map(id => document.getElementById(id));
+        checkInputs.forEach(input => input.addEventListener('input', function () {
+            clearTimeout(checkTimer);
+            checkTimer = setTimeout(checkRegex, 400);
+        }));
+
+        // 实时匹配：输入停止 150ms 后只把修改部分发给服务端
+        const liveInputs = ['regex-pattern', 'test-string', 'regex-flags'].map(id => document.getElementById(id));
+        liveInputs.forEach(input => input.addEventListener('input', scheduleLiveMatch));
+        document.getElementById('live-match').addEventListener('change', function () {
+            liveState.sessionId = null;
+            if (this.checked) {
+                scheduleLiveMatch();
+            }
+        });
+
+        // Enter key to test
+        document.getElementById('regex-pattern').addEventListener('keypress', function (e) {
+            if (e.key === 'Enter') {
+                testButton.click();
+            }
+        });
+    });
+
+    // 实时匹配会话：服务端保存测试字符串，之后只发送修改（与上次发送的文本比较公共前后缀）
+    const LIVE_PREVIEW_CHARS = 20000;
+    const liveState = { sessionId: null, version: 0, sentText: '', timer: null, inFlight: false, dirty: false };
+
+    function scheduleLiveMatch() {
+        if (!document.getElementById('live-match').checked) {
+            return;
+        }
+        clearTimeout(liveState.timer);
+        liveState.timer = setTimeout(liveMatch, 150);
+    }
+
+    // 服务端按 Unicode 码点计位置，JS 字符串按 UTF-16 计，含辅助平面字符（如 emoji）时需要换算
+    function toCodePoints(text) {
+        return /[\uD800-\uDBFF]/.test(text) ? Array.from(text) : text;
+    }
+
+    function sliceCodePoints(chars, start, end) {
+        return typeof chars === 'string' ? chars.slice(start, end) : chars.slice(start, end).join('');
+    }
+
+    function codePointLength(text) {
+        return toCodePoints(text).length;
+    }
+
+    function diffText(oldText, newText) {
+        let prefix = 0;
+        const maxPrefix = Math.min(oldText.length, newText.length);
+        while (prefix < maxPrefix && oldText.charCodeAt(prefix) === newText.charCodeAt(prefix)) {
+            prefix++;
+        }
+        let suffix = 0;
+        const maxSuffix = maxPrefix - prefix;
+        while (suffix < maxSuffix &&
+            oldText.charCodeAt(oldText.length - 1 - suffix) === newText.charCodeAt(newText.length - 1 - suffix)) {
+            suffix++;
+        }
+        // 不要从代理对中间切开
+        if (prefix > 0 && /[\uD800-\uDBFF]/.test(oldText[prefix - 1])) {
+            prefix--;
+        }
+        if (suffix > 0 && /[\uDC00-\uDFFF]/.test(newText[newText.length - suffix])) {
+            suffix--;
+        }
+        if (prefix === oldText.length && prefix === newText.length) {
+            return [];
+        }
+        const start = codePointLength(oldText.slice(0, prefix));
+        return [{
+            start: start,
+            end: start + codePointLength(oldText.slice(prefix, oldText.length - suffix)),
+            text: newText.slice(prefix, newText.length - suffix)
+        }];
+    }
+
+    function liveMatch() {
+        if (liveState.inFlight) {
+            liveState.dirty = true;
+            return;
+        }
+        const pattern = document.getElementById('regex-pattern').value;
+        const text = document.getElementById('test-string').value;
+        if (!pattern) {
+            return;
+        }
+
+        const requestData = { pattern: pattern, flags: document.getElementById('regex-flags').value };
+        if (liveState.sessionId) {
+            requestData.session_id = liveState.sessionId;
+            requestData.version = liveState.version;
+            requestData.edits = diffText(liveState.sentText, text);
+        } else {
+            requestData.text = text;
+        }
+
+        liveState.inFlight = true;
+        fetch('/api/regex/session', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(requestData)
+        })
+            .then(response => response.json().then(data => ({ status: response.status, data: data })))
+            .then(({ status, data }) => {
+                if (status === 409) {
+                    // 会话过期或版本不一致：重新提交全文
+                    liveState.sessionId = null;
+                    liveState.dirty = true;
+                    return;
+                }
+                if (data.session_id) {
+                    liveState.sessionId = data.session_id;
+                    liveState.version = data.version;
+                    liveState.sentText = text;
+                }
+                if (data.error) {
+                    showError(data.error);
+                } else {
+                    showLivePreview(data, text);
+                }
+            })
+            .catch(error => {
+                liveState.sessionId = null;
+                showError(`网络错误: ${error.message}`);
+            })
+            .finally(() => {
+                liveState.inFlight = false;
+                if (liveState.dirty) {
+                    liveState.dirty = false;
+                    liveMatch();
+                }
+            });
+    }
+
+    function showLivePreview(data, text) {
+        const chars = toCodePoints(text);
+        const limit = Math.min(chars.length, LIVE_PREVIEW_CHARS);
+        let html = `<div class="success-message">
+            <strong>实时匹配: ${data.total}${data.truncated ? '+' : ''} 个匹配项</strong>
+        </div>
+        <div class="live-preview font-monospace mt-2">`;
+        let pos = 0;
+        for (let i = 0; i < data.result.starts.length && data.result.starts[i] < limit; i++) {
+            const start = data.result.starts[i];
+            const end = Math.min(data.result.ends[i], limit);
+            html += escapeHtml(sliceCodePoints(chars, pos, start));
+            html += `<mark>${escapeHtml(sliceCodePoints(chars, start, end))}</mark>`;
+            pos = end;
+        }
+        html += escapeHtml(sliceCodePoints(chars, pos, limit));
+        if (limit < chars.length) {
+            html += `\n<span class="text-muted">…（仅预览前 ${LIVE_PREVIEW_CHARS} 个字符）</span>`;
+        }
+        html += '</div>';
+        document.getElementById('result-area').innerHTML = html;
+    }
+
+    function checkRegex() {
+        const warningBox = document.getElementById('regex-warning');
+        fetch('/api/regex/check', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                pattern: document.getElementById('regex-pattern').value,
+                flags: document.getElementById('regex-flags').value
+            })
+        })
+            .then(response => response.json())
+            .then(data => {
+                const messages = data.error ? [data.error] : (data.warnings || []);
+                warningBox.innerHTML = messages.map(m => `<i class="fas fa-exclamation-triangle"></i> ${escapeHtml(m)}`).join('<br>');
+                warningBox.style.display = messages.length ? 'block' : 'none';
+            })
+            .catch(() => {
+                warningBox.style.display = 'none';
+            });
+    }
+
+    function testRegex(pattern, testString, func, flags, replacement) {
+        const testButton = document.getElementById('test-regex');
+        const originalText = testButton.innerHTML;
+
+        testButton.innerHTML = '<span class="loading-spinner"></span> 测试中...';
+        testButton.disabled = true;
+
+        const requestData = {
+            pattern: pattern,
+            test_string: testString,
+            function: func,
+            flags: flags,
+            format: 'compact'
+        };
+
+        if (func === 're.sub') {
+            requestData.replacement = replacement;
+        }
+
+        fetch('/api/regex/test', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(requestData)
+        })
+            .then(response => response.json())
+            .then(data => {
+                if (data.error) {
+                    showError(data.error);
+                } else {
+                    showResult(data, func, testString);
+                }
+            })
+            .catch(error => {
+                showError(`网络错误: ${error.message}`);
+            })
+            .finally(() => {
+                testButton.innerHTML = originalText;
+                testButton.disabled = false;
+            });
+    }
+
+    function showResult(data, func, originalString) {
+        const resultArea = document.getElementById('result-area');
+        let html = '';
+
+        if (func === 're.findall') {
+            html = `<div class="success-message">
+            <strong>找到 ${formatTotal(data)} 个匹配项:</strong>
+        </div>`;
+
+            if (data.result.length > 0) {
+                html += '<div class="mt-2">';
+                data.result.forEach((match, index) => {
+                    html += `<div class="mb-1"><code class="match-highlight">[${index}] ${escapeHtml(match)}</code></div>`;
+                });
+                html += '</div>';
+            }
+        } else if (func === 're.search' || func === 're.match') {
+            if (data.result) {
+                html = `<div class="success-message">
+                <strong>匹配成功:</strong>
+            </div>
+            <div class="mt-2">
+                <div><strong>匹配内容:</strong> <code class="match-highlight">${escapeHtml(data.result)}</code></div>
+                <div><strong>位置:</strong> ${data.span[0]} - ${data.span[1]}</div>`;
+
+                if (data.groups && data.groups.length > 0) {
+                    html += '<div><strong>捕获组:</strong></div>';
+                    data.groups.forEach((group, index) => {
+                        html += `<div class="ms-3">组 ${index + 1}: <code>${escapeHtml(group || 'None')}</code></div>`;
+                    });
+                }
+                html += '</div>';
+            } else {
+                html = '<div class="error-message">没有找到匹配项</div>';
+            }
+        } else if (func === 're.finditer') {
+            // 紧凑编码：starts / ends 为平行数组，匹配文本按位置从原文截取
+            const matches = data.result;
+            const chars = toCodePoints(originalString);
+            html = `<div class="success-message">
+            <strong>找到 ${formatTotal(data)} 个匹配项:</strong>
+        </div>`;
+
+            if (matches.starts.length > 0) {
+                html += '<div class="mt-2">';
+                matches.starts.forEach((start, index) => {
+                    const end = matches.ends[index];
+                    html += `<div class="mb-2">
+                    <div><strong>[${index}]</strong> <code class="match-highlight">${escapeHtml(sliceCodePoints(chars, start, end))}</code></div>
+                    <div class="small text-muted">位置: ${start} - ${end}</div>`;
+
+                    const groups = matches.groups ? matches.groups[index] : [];
+                    if (groups.length > 0) {
+                        html += '<div class="small">捕获组: ';
+                        groups.forEach((group, gIndex) => {
+                            html += `<code>${escapeHtml(group || 'None')}</code> `;
+                        });
+                        html += '</div>';
+                    }
+                    html += '</div>';
+                });
+                html += '</div>';
+            }
+        } else if (func === 're.split') {
+            html = `<div class="success-message">
+            <strong>分割结果 (${data.result.length} 部分${data.truncated ? '，已达上限，最后一部分未继续分割' : ''}):</strong>
+        </div>
+        <div class="mt-2">`;
+
+            data.result.forEach((part, index) => {
+                html += `<div><strong>[${index}]</strong> <code>${escapeHtml(part)}</code></div>`;
+            });
+            html += '</div>';
+        } else if (func === 're.sub') {
+            html = `<div class="success-message">
+            <strong>替换结果:</strong>
+        </div>
+        <div class="mt-2">
+            <div><strong>原文:</strong> <code>${escapeHtml(originalString)}</code></div>
+            <div><strong>结果:</strong> <code class="match-highlight">${escapeHtml(data.result)}</code></div>
+        </div>`;
+        }
+
+        if (data.warnings && data.warnings.length > 0) {
+            html += data.warnings.map(w => `<div class="mt-2 text-warning"><i class="fas fa-exclamation-triangle"></i> ${escapeHtml(w)}</div>`).join('');
+        }
+
+        resultArea.innerHTML = html;
+    }
+
+    function formatTotal(data) {
+        // 匹配过多时只返回前若干项，总数可能是估算值
+        if (!data.truncated) {
+            return data.total;
+        }
+        return `${data.total_exact ? '' : '约 '}${data.total}（仅显示前 ${data.result.length || data.result.starts.length} 个）`;
+    }
+
+    function showError(message) {
+        const resultArea = document.getElementById('result-area');
+        resultArea.innerHTML = `<div class="error-message">
+        <i class="fas fa-exclamation-triangle"></i> ${escapeHtml(message)}
+    </div>`;
+    }
+
+    function escapeHtml(text) {
+        const div = document.createElement('div');
+        div.textContent = text;
+        return div.innerHTML;
+    }
+
+    function clearAll() {
+        document.getElementById('regex-pattern').value = '';
+        document.getElementById('test-string').value = '';
+        document.getElementById('regex-flags').value = '';
+        document.getElementById('replacement-text').value = 'X';
+        document.getElementById('result-area').innerHTML = `
+        <div class="text-muted text-center">
+            <i class="fas fa-arrow-left"></i> 点击"测试正则表达式"查看结果
+        </div>`;
+    }
+
+    function loadExample(type) {
+        const examples = {
+            'digits': {
+                pattern: '\\d+',
+                text: '今天是2024年1月1日，温度是25度',
+                desc: '匹配一个或多个数字'
+            },
+            'words': {
+                pattern: '\\w+',
+                text: 'Hello World! 你好世界！',
+                desc: '匹配单词字符'
+            },
+            'email': {
+                pattern: '[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\\.[a-zA-Z]{2,}',
+                text: '联系邮箱: test@example.com 和 admin@site.org',
+                desc: '匹配邮箱地址'
+            },
+            'phone': {
+                pattern: '\\d{3}-\\d{4}-\\d{4}',
+                text: '电话号码: 138-0000-1234 和 186-1234-5678',
+                desc: '匹配手机号码格式'
+            },
+            'url': {
+                pattern: 'https?://[a-zA-Z0-9.-]+\\.[a-zA-Z]{2,}(?:/[^\\s]*)?',
+                text: '访问 https://www.example.com 或 http://test.org/page',
+                desc: '匹配URL地址'
+            },
+            'date': {
+                pattern: '\\d{4}年\\d{1,2}月\\d{1,2}日',
+                text: '今天是2024年1月1日，明天是2024年1月2日',
+                desc: '匹配中文日期格式'
+            },
+            'ip': {
+                pattern: '\\b(?:[0-9]{1,3}\\.){3}[0-9]{1,3}\\b',
+                text: '服务器IP: 192.168.1.1 和 10.0.0.1',
+                desc: '匹配IP地址'
+            },
+            'chinese': {
+                pattern: '[\\u4e00-\\u9fff]+',
+                text: 'Hello 你好 World 世界 123',
+                desc: '匹配中文字符'
+            }
+        };
+
+        if (examples[type]) {
+            document.getElementById('regex-pattern').value = examples[type].pattern;
+            document.getElementById('test-string').value = examples[type].text;
+
+            // Show description in result area
+            document.getElementById('result-area').innerHTML = `
+            <div class="alert alert-info">
+                <i class="fas fa-info-circle"></i> 
+                <strong>示例说明:</strong> ${examples[type].desc}
+                <br><small>点击"测试正则表达式"查看匹配结果</small>
+            </div>`;
+        }
+    }
@@ -0,0 +1,108 @@
+    document.addEventListener('DOMContentLoaded', function () {
+        const registerForm = document.getElementById('registerForm');
+        const errorMessage = document.getElementById('errorMessage');
+        const errorText = document.getElementById('errorText');
+        const successMessage = document.getElementById('successMessage');
+        const successAccount = document.getElementById('successAccount');
+        const submitBtn = document.getElementById('submitBtn');
+
+        registerForm.addEventListener('submit', async function (e) {
+            e.preventDefault();
+
+            // 隐藏之前的消息
+            errorMessage.classList.add('d-none');
+            successMessage.classList.add('d-none');
+
+            // 获取表单数据
+            const username = document.getElementById('username').value.trim();
+            const email = document.getElementById('email').value.trim();
+            const password = document.getElementById('password').value;
+            const confirmPassword = document.getElementById('confirmPassword').value;
+
+            // 前端验证
+            if (!username || !email || !password || !confirmPassword) {
+                showError('请填写所有必填字段');
+                return;
+            }
+
+            // 验证邮箱格式
+            const emailRegex = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
+            if (!emailRegex.test(email)) {
+                showError('请输入有效的邮箱地址');
+                return;
+            }
+
+            // 验证密码匹配
+            if (password !== confirmPassword) {
+                showError('两次输入的密码不一致');
+                return;
+            }
+
+            // 验证密码长度
+            if (password.length < 6) {
+                showError('密码长度至少为6位字符');
+                return;
+            }
+
+            // 禁用提交按钮，显示加载状态
+            submitBtn.disabled = true;
+            const originalText = submitBtn.innerHTML;
+            submitBtn.innerHTML = '<span class="spinner-border spinner-border-sm me-2"></span>注册中...';
+
+            try {
+                // 发送注册请求
+                const response = await fetch('/register', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                    },
+                    body: JSON.stringify({
+                        username: username,
+                        email: email,
+                        password: password
+                    })
+                });
+
+                const data = await response.json();
+
+                if (response.ok) {
+                    // 注册成功
+                    // 格式化账号为8位数字（例如：2 -> 00000002）
+                    const formattedAccount = String(data.user_id).padStart(8, '0');
+                    successAccount.textContent = formattedAccount;
+                    successMessage.classList.remove('d-none');
+                    registerForm.reset();
+
+                } else {
+                    // 注册失败
+                    showError(data.error || '注册失败，请稍后重试');
+                }
+            } catch (error) {
+                console.error('注册错误:', error);
+                showError('网络错误，请检查您的网络连接');
+            } finally {
+                // 恢复提交按钮
+                submitBtn.disabled = false;
+                submitBtn.innerHTML = originalText;
+            }
+        });
+
+        function showError(message) {
+            errorText.textContent = message;
+            errorMessage.classList.remove('d-none');
+            // 滚动到错误消息
+            errorMessage.scrollIntoView({ behavior: 'smooth', block: 'nearest' });
+        }
+
+        // 实时验证密码匹配
+        const passwordInput = document.getElementById('password');
+        const confirmPasswordInput = document.getElementById('confirmPassword');
+
+        confirmPasswordInput.addEventListener('input', function () {
+            if (confirmPasswordInput.value && passwordInput.value !== confirmPasswordInput.value) {
+                confirmPasswordInput.setCustomValidity('密码不匹配');
+            } else {
+                confirmPasswordInput.setCustomValidity('');
+            }
+        });
+    });
@@ -0,0 +1,108 @@
+    (function () {
+        const query = JSON.parse(document.getElementById('search-query').textContent);
+        if (!query) return;
+
+        const BADGES = {
+            module: ['primary', '学习模块'],
+            topic: ['info', '知识点'],
+            example: ['success', '示例代码'],
+            problem: ['warning', 'OJ 题目'],
+            note: ['secondary', '我的笔记']
+        };
+        const resultsEl = document.getElementById('search-results');
+        const summaryEl = document.getElementById('search-summary');
+        const suggestionsEl = document.getElementById('search-suggestions');
+        const emptyEl = document.getElementById('search-empty');
+        const terms = query.toLowerCase().split(/\s+/).filter(Boolean);
+
+        function escapeHtml(text) {
+            const div = document.createElement('div');
+            div.textContent = text == null ? '' : String(text);
+            return div.innerHTML;
+        }
+
+        function escapeRegExp(text) {
+            return text.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+        }
+
+        // 所有检索词合成一个正则，长的在前（"python" 与 "py" 同时出现时整体高亮）
+        const termPattern = terms.length
+            ? new RegExp([...new Set(terms)].sort((a, b) => b.length - a.length).map(escapeRegExp).join('|'), 'gi')
+            : null;
+
+        // 在原始文本上一次匹配所有检索词，逐段转义后输出，检索词不会匹配到转义字符或已插入的 <mark>
+        function highlight(text) {
+            const raw = text == null ? '' : String(text);
+            if (!termPattern) return escapeHtml(raw);
+            let html = '';
+            let last = 0;
+            for (const match of raw.matchAll(termPattern)) {
+                html += escapeHtml(raw.slice(last, match.index)) + `<mark>${escapeHtml(match[0])}</mark>`;
+                last = match.index + match[0].length;
+            }
+            return html + escapeHtml(raw.slice(last));
+        }
+
+        function renderResult(r) {
+            const badge = BADGES[r.type] || BADGES.example;
+            const title = r.url
+                ? `<a href="${escapeHtml(r.url)}" class="text-decoration-none">${highlight(r.title)}</a>`
+                : highlight(r.title);
+            const action = r.url
+                ? `<a href="${escapeHtml(r.url)}" class="btn btn-sm btn-outline-primary"><i class="fas fa-external-link-alt"></i> 查看详情</a>`
+                : `<button type="button" class="btn btn-sm btn-outline-primary open-note-btn"><i class="fas fa-sticky-note"></i> 打开笔记</button>`;
+            return `
+                <div class="col-lg-6 mb-4">
+                    <div class="card h-100 search-result-card">
+                        <div class="card-body">
+                            <div class="d-flex align-items-start mb-3">
+                                <span class="result-icon fs-3 me-3">${escapeHtml(r.icon)}</span>
+                                <div class="flex-grow-1">
+                                    <h5 class="card-title mb-1">${title}</h5>
+                                    <span class="badge bg-${badge[0]}">${badge[1]}</span>
+                                </div>
+                            </div>
+                            <p class="card-text text-muted">${highlight(r.description)}</p>
+                            <div class="mt-auto">${action}</div>
+                        </div>
+                    </div>
+                </div>`;
+        }
+
+        function load(type) {
+            const params = new URLSearchParams({ q: query, limit: 50 });
+            if (type) params.set('type', type);
+            summaryEl.innerHTML = '<span class="spinner-border spinner-border-sm"></span> 正在搜索...';
+            fetch('/api/search?' + params.toString())
+                .then(r => r.json())
+                .then(data => {
+                    if (!data.success) throw new Error(data.error || '搜索失败');
+                    const results = data.results || [];
+                    resultsEl.innerHTML = results.map(renderResult).join('');
+                    const shown = results.length < data.total ? `，显示前 <strong>${results.length}</strong> 个` : '';
+                    summaryEl.innerHTML = `<i class="fas fa-info-circle"></i> 找到 <strong>${data.total}</strong> 个相关结果${shown}`;
+                    suggestionsEl.style.display = results.length ? '' : 'none';
+                    emptyEl.style.display = results.length ? 'none' : '';
+                    resultsEl.querySelectorAll('.open-note-btn').forEach(btn => {
+                        btn.addEventListener('click', () => {
+                            const openBtn = document.getElementById('openNotesBtn');
+                            if (openBtn) openBtn.click();
+                        });
+                    });
+                })
+                .catch(err => {
+                    resultsEl.innerHTML = '';
+                    summaryEl.innerHTML = `<i class="fas fa-exclamation-triangle"></i> ${escapeHtml(err.message)}`;
+                });
+        }
+
+        document.querySelectorAll('#search-type-filter button').forEach(btn => {
+            btn.addEventListener('click', () => {
+                document.querySelectorAll('#search-type-filter button').forEach(b => b.classList.remove('active'));
+                btn.classList.add('active');
+                load(btn.dataset.type);
+            });
+        });
+
+        load('');
+    })();
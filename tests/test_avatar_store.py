@@ -0,0 +1,93 @@
+"""
+utils/avatar_store.py：启动时为没有变体的原图重新排队转换，宽限期内的删除延迟执行而不是丢弃
+用法: python -m pytest tests/test_avatar_store.py
+"""
+import io
+import os
+import sys
+import time
+
+# 添加项目路径（动态获取项目根目录）
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import pytest
+from flask import Flask
+from PIL import Image
+
+from utils import avatar_store as avatar_module
+from utils.avatar_store import AVATAR_SIZES, AvatarStore
+
+
+def png_bytes(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (300, 200), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def make_store(tmp_path):
+    app = Flask(__name__, root_path=str(tmp_path))
+    app.config['UPLOAD_FOLDER'] = 'avatars'
+    store = AvatarStore()
+    store.init_app(app)
+    return store
+
+
+def converted(store, key):
+    return all(store.resolve(key, size)[1] for size in AVATAR_SIZES)
+
+
+def test_startup_sweep_converts_leftover_originals(tmp_path):
+    store = make_store(tmp_path)
+    key = store.save(png_bytes('red'), 'png')
+    store.wait(key, timeout=10)
+    # 模拟转换中途退出：只剩原图
+    leftover = 'ab' * 20
+    (tmp_path / 'avatars' / f'{leftover}.png').write_bytes(png_bytes('blue'))
+    restarted = make_store(tmp_path)
+    restarted.wait(leftover, timeout=10)
+    assert converted(restarted, key) and converted(restarted, leftover)
+    assert restarted.source_name(leftover) is None
+
+
+def test_failed_conversion_is_retried_after_interval(tmp_path, monkeypatch):
+    store = make_store(tmp_path)
+    key = 'cd' * 20
+    (tmp_path / 'avatars' / f'{key}.png').write_bytes(b'not an image')
+    store.convert(key)
+    store.wait(key, timeout=10)
+    assert key in store._failed
+    store.convert(key)
+    assert key not in store._pending  # 重试间隔内不再排队
+    monkeypatch.setattr(avatar_module, 'CONVERT_RETRY_INTERVAL', 0)
+    (tmp_path / 'avatars' / f'{key}.png').write_bytes(png_bytes('green'))
+    store.convert(key)
+    store.wait(key, timeout=10)
+    assert converted(store, key)
+
+
+def test_recent_delete_is_deferred(tmp_path, monkeypatch):
+    monkeypatch.setattr(avatar_module, 'DELETE_GRACE', 0.3)
+    store = make_store(tmp_path)
+    key = store.save(png_bytes('red'), 'png')
+    store.wait(key, timeout=10)
+    assert store.delete(key, in_use=lambda: False) is False
+    assert key in store._deferred
+    deadline = time.monotonic() + 5
+    while store._files(key) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert store._files(key) == []
+    assert key not in store._deferred
+
+
+def test_deferred_delete_keeps_files_still_in_use(tmp_path, monkeypatch):
+    monkeypatch.setattr(avatar_module, 'DELETE_GRACE', 0.3)
+    store = make_store(tmp_path)
+    key = store.save(png_bytes('red'), 'png')
+    store.wait(key, timeout=10)
+    references = []
+    assert store.delete(key, in_use=lambda: bool(references)) is False
+    references.append('another user')  # 宽限期内另一个用户引用了同一图片
+    time.sleep(1)
+    assert store._files(key)
+    assert key not in store._deferred
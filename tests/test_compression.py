@@ -0,0 +1,140 @@
+"""
+utils/compression.py 的压缩中间件：Accept-Encoding 选择、弱 ETag、流式逐块 flush 与不压缩的响应
+用法: python -m pytest tests/test_compression.py
+"""
+import gzip
+import os
+import sys
+import zlib
+
+# 添加项目路径（动态获取项目根目录）
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import brotli
+import pytest
+
+from utils.compression import CompressionMiddleware, choose_encoding
+
+BODY = b'{"output": "' + b'hello world ' * 200 + b'"}'
+
+
+def stub_app(status='200 OK', headers=None, chunks=None):
+    """返回固定响应的 WSGI 应用；chunks 为 None 时返回带 Content-Length 的 BODY"""
+    def app(environ, start_response):
+        response_headers = [('Content-Type', 'application/json')] + list(headers or [])
+        if chunks is None:
+            response_headers.append(('Content-Length', str(len(BODY))))
+        start_response(status, response_headers)
+        return iter([BODY] if chunks is None else chunks)
+    return app
+
+
+def call(app, accept_encoding='gzip, br', method='GET'):
+    environ = {'REQUEST_METHOD': method, 'PATH_INFO': '/api/test', 'HTTP_ACCEPT_ENCODING': accept_encoding}
+    captured = []
+    app_iter = app(environ, lambda status, headers, exc_info=None: captured.append((status, dict(headers))))
+    status, headers = captured[0]
+    return status, headers, app_iter
+
+
+def test_choose_encoding_by_q_value():
+    assert choose_encoding('gzip, br') == 'br'
+    assert choose_encoding('gzip;q=1.0, br;q=0.5') == 'gzip'
+    assert choose_encoding('br;q=0, gzip') == 'gzip'
+    assert choose_encoding('gzip;q=0, br;q=0') is None
+    assert choose_encoding('*;q=0.1') == 'br'
+    assert choose_encoding('*, br;q=0') == 'gzip'
+    assert choose_encoding('identity') is None
+    assert choose_encoding('') is None
+    assert choose_encoding(None) is None
+    # 无法解析的项忽略，不影响其他项
+    assert choose_encoding('br;q=abc, gzip;q=0.5') == 'gzip'
+    assert choose_encoding('GZIP') == 'gzip'
+    assert choose_encoding('br, gzip', brotli_available=False) == 'gzip'
+
+
+def test_buffered_response_is_compressed_with_weak_etag():
+    app = CompressionMiddleware(stub_app(headers=[('ETag', '"abc123"'), ('Accept-Ranges', 'bytes')]))
+    status, headers, app_iter = call(app, 'gzip')
+    body = b''.join(app_iter)
+    assert status == '200 OK'
+    assert headers['Content-Encoding'] == 'gzip'
+    assert headers['ETag'] == 'W/"abc123"'
+    assert headers['Vary'] == 'Accept-Encoding'
+    assert headers['Content-Length'] == str(len(body))
+    assert 'Accept-Ranges' not in headers
+    assert gzip.decompress(body) == BODY
+
+
+def test_weak_etag_is_kept_and_vary_is_extended():
+    app = CompressionMiddleware(stub_app(headers=[('ETag', 'W/"abc123"'), ('Vary', 'Cookie')]))
+    status, headers, app_iter = call(app, 'br')
+    assert headers['ETag'] == 'W/"abc123"'
+    assert headers['Vary'] == 'Cookie, Accept-Encoding'
+    assert brotli.decompress(b''.join(app_iter)) == BODY
+
+
+def test_small_response_is_not_compressed():
+    app = CompressionMiddleware(stub_app(), min_size=len(BODY) + 1)
+    status, headers, app_iter = call(app)
+    assert 'Content-Encoding' not in headers
+    assert headers['Vary'] == 'Accept-Encoding'
+    assert b''.join(app_iter) == BODY
+
+
+def test_streaming_response_flushes_every_chunk():
+    chunks = [b'{"line": %d}\n' % n for n in range(5)]
+    app = CompressionMiddleware(stub_app(chunks=chunks))
+    status, headers, app_iter = call(app, 'gzip')
+    assert headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in headers
+    # 每个输出块单独解压就能得到对应的原始块，说明没有留在压缩器缓冲区里
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    pieces = list(app_iter)
+    assert [decompressor.decompress(piece) for piece in pieces[:-1]] == chunks
+    assert decompressor.decompress(pieces[-1]) == b''
+    assert decompressor.eof
+
+
+def test_streaming_response_flushes_every_chunk_with_brotli():
+    chunks = [b'{"line": %d}\n' % n for n in range(5)]
+    app = CompressionMiddleware(stub_app(chunks=chunks))
+    status, headers, app_iter = call(app, 'br')
+    assert headers['Content-Encoding'] == 'br'
+    decompressor = brotli.Decompressor()
+    pieces = list(app_iter)
+    assert [decompressor.process(piece) for piece in pieces[:-1]] == chunks
+    decompressor.process(pieces[-1])
+    assert decompressor.is_finished()
+
+
+def test_streaming_disabled_passes_through():
+    app = CompressionMiddleware(stub_app(chunks=[b'a', b'b']), streaming=False)
+    status, headers, app_iter = call(app)
+    assert 'Content-Encoding' not in headers
+    assert list(app_iter) == [b'a', b'b']
+
+
+@pytest.mark.parametrize('status, headers', [
+    ('200 OK', [('X-Accel-Redirect', '/_avatars/1.webp')]),
+    ('206 Partial Content', []),
+    ('304 Not Modified', []),
+    ('200 OK', [('Cache-Control', 'private, no-transform')]),
+    ('200 OK', [('Content-Encoding', 'gzip')]),
+])
+def test_skipped_responses_are_passed_through(status, headers):
+    app = CompressionMiddleware(stub_app(status, headers + [('ETag', '"abc123"')]))
+    result_status, result_headers, app_iter = call(app)
+    assert result_status == status
+    assert result_headers.get('Content-Encoding') == dict(headers).get('Content-Encoding')
+    assert result_headers['ETag'] == '"abc123"'
+    assert result_headers['Content-Length'] == str(len(BODY))
+    assert b''.join(app_iter) == BODY
+
+
+def test_head_request_is_passed_through():
+    app = CompressionMiddleware(stub_app())
+    status, headers, app_iter = call(app, method='HEAD')
+    assert 'Content-Encoding' not in headers
+    assert 'Vary' not in headers
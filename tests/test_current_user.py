@@ -0,0 +1,95 @@
+"""
+utils/current_user.py：身份缓存的失效与会话撤销在事务提交后才执行，回滚时丢弃
+用法: python -m pytest tests/test_current_user.py
+"""
+import os
+import sys
+import time
+
+# 添加项目路径（动态获取项目根目录）
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import pytest
+from flask import Flask
+
+import utils.current_user as current_user
+from models import db
+from models.code_execution import CodeExecution  # noqa: F401  迁移需要注册全部表
+from models.user import User
+from models.user_profile import UserProfile
+from utils.migrations import upgrade
+
+USER_ID = 20000001
+
+
+@pytest.fixture
+def app(monkeypatch):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    revoked = []
+    monkeypatch.setattr(current_user, 'revoke_user_sessions',
+                        lambda user_id, keep_current=False: revoked.append((user_id, keep_current)))
+    with app.app_context():
+        upgrade()
+        db.session.add(User(id=USER_ID, username='alice', email='alice@example.com', password_hash='x'))
+        db.session.commit()
+        app.revoked = revoked
+        yield app
+    current_user._identity_cache.clear()
+
+
+def cache_identity():
+    identity = current_user.UserIdentity(USER_ID, 'alice', 'alice@example.com', None)
+    current_user._identity_cache[USER_ID] = (time.monotonic() + 60, identity)
+
+
+def cached():
+    return USER_ID in current_user._identity_cache
+
+
+def test_update_invalidates_after_commit(app):
+    cache_identity()
+    db.session.get(User, USER_ID).username = 'alice2'
+    db.session.flush()
+    assert cached()  # 提交前其他请求仍应看到旧值
+    db.session.commit()
+    assert not cached()
+    assert app.revoked == []
+
+
+def test_rollback_discards_pending_changes(app):
+    cache_identity()
+    db.session.get(User, USER_ID).password_hash = 'y'
+    db.session.flush()
+    db.session.rollback()
+    db.session.commit()
+    assert cached()
+    assert app.revoked == []
+
+
+def test_password_change_revokes_other_sessions_after_commit(app):
+    db.session.get(User, USER_ID).password_hash = 'y'
+    db.session.flush()
+    assert app.revoked == []
+    db.session.commit()
+    assert app.revoked == [(USER_ID, True)]
+
+
+def test_profile_change_invalidates(app):
+    cache_identity()
+    db.session.add(UserProfile(user_id=USER_ID, avatar='a' * 40))
+    db.session.commit()
+    assert not cached()
+
+
+def test_delete_drops_identity_and_revokes_all_sessions(app):
+    cache_identity()
+    user = db.session.get(User, USER_ID)
+    user.password_hash = 'y'
+    db.session.flush()
+    db.session.delete(user)
+    db.session.commit()
+    assert not cached()
+    assert app.revoked == [(USER_ID, False)]
@@ -0,0 +1,64 @@
+"""
+utils/history_writer.py 的环形缓冲区：只保留最近 HISTORY_SIZE 条，覆盖槽位时记录拿到新的 id
+用法: python -m pytest tests/test_history_writer.py
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+# 添加项目路径（动态获取项目根目录）
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import pytest
+from flask import Flask
+
+from models import db
+from models.code_execution import CodeExecution
+from models.user import User  # noqa: F401  注册外键引用的表
+from models.user_profile import UserProfile  # noqa: F401
+from utils.history_writer import HISTORY_SIZE, write_history
+from utils.migrations import upgrade
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{tmp_path / "history.db"}'
+    db.init_app(app)
+    with app.app_context():
+        upgrade()
+        yield app
+
+
+def write(user_id, count, start=datetime(2024, 5, 1)):
+    records = [{'user_id': user_id, 'code': f'print({n})', 'record_type': 0,
+                'executed_at': start + timedelta(seconds=n)} for n in range(count)]
+    with db.engine.begin() as connection:
+        write_history(connection, records)
+
+
+def history(user_id):
+    return CodeExecution.query.filter_by(user_id=user_id).order_by(CodeExecution.executed_at).all()
+
+
+def test_ring_keeps_latest_records(app):
+    write(1, HISTORY_SIZE + 3)
+    write(2, 2)
+    rows = history(1)
+    assert [row.code for row in rows] == [f'print({n})' for n in range(3, HISTORY_SIZE + 3)]
+    assert sorted(row.slot for row in rows) == list(range(HISTORY_SIZE))
+    assert len(history(2)) == 2
+
+
+def test_overwritten_slot_gets_new_id(app):
+    write(1, HISTORY_SIZE)
+    old_ids = {row.id for row in history(1)}
+    oldest_id, oldest_slot = history(1)[0].id, history(1)[0].slot
+    write(1, 1, start=datetime(2024, 6, 1))
+    db.session.expire_all()
+    newest = history(1)[-1]
+    assert newest.slot == oldest_slot
+    assert newest.id not in old_ids
+    # 按旧 id 查询不会拿到覆盖后的代码
+    assert db.session.get(CodeExecution, oldest_id) is None
@@ -0,0 +1,109 @@
+"""
+utils/profiler.py 的令牌校验：非 ASCII 请求头不能让中间件抛出异常；未设置令牌时 init_app 不安装任何东西
+用法: python -m pytest tests/test_profiler.py
+"""
+import os
+import signal
+import sys
+import threading
+
+# 添加项目路径（动态获取项目根目录）
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import pytest
+from flask import Flask
+
+from utils.profiler import ProfilerError, ProfilingMiddleware, RequestProfiler
+
+
+def make_profiler(token='secret'):
+    profiler = RequestProfiler()
+    profiler.token = token
+    return profiler
+
+
+def hello_app(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [b'hello']
+
+
+def call(app, headers):
+    environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': '/login'}
+    environ.update(headers)
+    captured = []
+    body = b''.join(app(environ, lambda status, headers, exc_info=None: captured.append(status)))
+    return captured[0], body
+
+
+def test_non_ascii_header_is_rejected():
+    profiler = make_profiler()
+    # WSGI 服务器把请求头按 latin-1 解码，'sékret' 的 UTF-8 字节到这里变成 'sÃ©kret'
+    header = 'sékret'.encode('utf-8').decode('latin-1')
+    assert profiler.authorized(header, prefix='') is False
+    assert profiler.authorized('Bearer ' + header) is False
+    assert profiler.authorized('sékret', prefix='') is False
+
+
+def test_middleware_passes_through_non_ascii_x_profile():
+    app = ProfilingMiddleware(hello_app, make_profiler())
+    status, body = call(app, {'HTTP_X_PROFILE': 'sékret'.encode('utf-8').decode('latin-1')})
+    assert status == '200 OK'
+    assert body == b'hello'
+
+
+def test_non_ascii_token_matches_raw_header_bytes():
+    profiler = make_profiler('sékret')
+    assert profiler.authorized('sékret'.encode('utf-8').decode('latin-1'), prefix='') is True
+    assert profiler.authorized('secret', prefix='') is False
+
+
+def test_valid_token_profiles_request():
+    app = ProfilingMiddleware(hello_app, make_profiler())
+    status, body = call(app, {'HTTP_X_PROFILE': 'secret'})
+    assert status == '200 OK'
+    assert body.startswith(b'# GET /login -> 200 OK')
+
+
+@pytest.fixture
+def restore_sigusr2():
+    previous = signal.getsignal(signal.SIGUSR2)
+    yield
+    signal.signal(signal.SIGUSR2, previous)
+
+
+def make_app(tmp_path, token):
+    app = Flask(__name__)
+    app.config.update(PROFILER_TOKEN=token, PROFILER_DIR=str(tmp_path / 'profiles'), PROFILER_SIGNAL='SIGUSR2')
+    return app
+
+
+def test_init_app_without_token_installs_nothing(tmp_path, restore_sigusr2):
+    app = make_app(tmp_path, None)
+    wsgi_app = app.wsgi_app
+    profiler = RequestProfiler()
+    profiler.init_app(app)
+    assert not profiler.enabled
+    assert profiler.signum is None
+    assert app.wsgi_app == wsgi_app
+    assert not (tmp_path / 'profiles').exists()
+    assert signal.getsignal(signal.SIGUSR2) != profiler._on_signal
+
+
+def test_init_app_with_token_installs_signal(tmp_path, restore_sigusr2):
+    app = make_app(tmp_path, 'secret')
+    profiler = RequestProfiler()
+    profiler.init_app(app)
+    assert profiler.signum == signal.SIGUSR2
+    assert signal.getsignal(signal.SIGUSR2) == profiler._on_signal
+    assert isinstance(app.wsgi_app, ProfilingMiddleware)
+    assert (tmp_path / 'profiles').is_dir()
+    # fork 出的子进程继承处理函数，但不采样
+    profiler._owner_pid = os.getpid() + 1
+    profiler._on_signal(signal.SIGUSR2, None)
+    assert not any(thread.name == 'profiler-sampler' for thread in threading.enumerate())
+
+
+def test_sample_rejects_out_of_range_seconds():
+    with pytest.raises(ProfilerError):
+        make_profiler().sample(os.getpid(), seconds=0)
@@ -0,0 +1,95 @@
+"""
+热点查询的执行计划检查
+在按迁移脚本建出的空 SQLite 库上对 app.py 中的高频查询执行 EXPLAIN QUERY PLAN：
+任何一条退化为全表扫描（SCAN <table>），或列表查询需要临时 B-tree 排序时测试失败。
+用法: python -m pytest tests/test_query_plans.py
+"""
+import os
+import sys
+from datetime import datetime
+
+# 添加项目路径（动态获取项目根目录）
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import pytest
+from flask import Flask
+from sqlalchemy import desc, func, text
+
+from models import db
+from models.code_execution import CodeExecution
+from models.notes import Note
+from models.problem import Submission
+from models.progress import Progress
+from models.user import User  # noqa: F401  注册外键引用的表
+from models.user_profile import UserProfile  # noqa: F401
+from utils.migrations import upgrade
+from utils.pagination import encode_cursor, keyset_query
+
+SAMPLE_USER_ID = 10000000
+SAMPLE_PROBLEM_ID = 1
+SAMPLE_CURSOR = encode_cursor(datetime(2024, 5, 1, 12, 0, 0), 100)
+
+
+def hot_queries(user_id=SAMPLE_USER_ID, problem_id=SAMPLE_PROBLEM_ID):
+    """返回 {名称: (Query, 是否按 ORDER BY 取前几条)}，与 app.py 中对应接口的查询保持一致"""
+    executions = CodeExecution.query.filter_by(user_id=user_id, record_type=0)
+    submissions = Submission.query.filter_by(user_id=user_id)
+    notes = Note.query.filter_by(user_id=user_id)
+    return {
+        # /api/executions/history（首页与翻页）
+        'execution_history': (keyset_query(executions, CodeExecution.executed_at, CodeExecution.id, None, 10), True),
+        'execution_history_cursor': (keyset_query(executions, CodeExecution.executed_at, CodeExecution.id,
+                                                  SAMPLE_CURSOR, 10), True),
+        # /api/execute 环形缓冲区定位下一个槽位（utils/history_writer.py）
+        'execution_next_slot': (executions.with_entities(CodeExecution.slot)
+                                .order_by(desc(CodeExecution.executed_at), desc(CodeExecution.id)).limit(1), True),
+        # /api/oj/submissions（按用户、按用户+题目，首页与翻页）
+        'submissions_by_user': (keyset_query(submissions, Submission.submitted_at, Submission.id, None, 20), True),
+        'submissions_by_user_cursor': (keyset_query(submissions, Submission.submitted_at, Submission.id,
+                                                    SAMPLE_CURSOR, 20), True),
+        'submissions_by_problem': (keyset_query(submissions.filter_by(problem_id=problem_id),
+                                                Submission.submitted_at, Submission.id, None, 20), True),
+        'submissions_by_problem_cursor': (keyset_query(submissions.filter_by(problem_id=problem_id),
+                                                       Submission.submitted_at, Submission.id, SAMPLE_CURSOR, 20), True),
+        # /api/notes（游标分页与不分页的旧接口）
+        'notes_page': (keyset_query(notes, Note.updated_at, Note.note_id, None, 50), True),
+        'notes_page_cursor': (keyset_query(notes, Note.updated_at, Note.note_id, SAMPLE_CURSOR, 50), True),
+        'notes_list': (notes.order_by(Note.updated_at.desc()), True),
+        # /profile
+        'solved_problems': (db.session.query(Submission.problem_id)
+                            .filter_by(user_id=user_id, status='AC').distinct(), False),
+        'solved_submissions': (Submission.query.filter_by(user_id=user_id, status='AC'), False),
+        'latest_submission': (db.session.query(func.max(Submission.submitted_at)).filter_by(user_id=user_id), False),
+        'latest_note': (db.session.query(func.max(Note.updated_at)).filter_by(user_id=user_id), False),
+        'latest_progress': (db.session.query(func.max(Progress.last_updated)).filter_by(user_id=user_id), False),
+    }
+
+
+def explain(query):
+    """返回查询的 EXPLAIN QUERY PLAN 明细行"""
+    statement = query.statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+    rows = db.session.execute(text(f'EXPLAIN QUERY PLAN {statement}')).fetchall()
+    return [row[-1] for row in rows]
+
+
+@pytest.fixture(scope='module')
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        upgrade()
+        yield app
+
+
+def test_hot_queries_use_indexes(app):
+    failures = []
+    for name, (query, ordered) in hot_queries().items():
+        plan = explain(query)
+        # SCAN t 与 SCAN t USING INDEX 都是整表扫描
+        if any(detail.startswith('SCAN ') for detail in plan):
+            failures.append(f'{name}（全表扫描）: {" | ".join(plan)}')
+        elif ordered and 'USE TEMP B-TREE FOR ORDER BY' in plan:
+            failures.append(f'{name}（临时排序）: {" | ".join(plan)}')
+    assert not failures, '\n'.join(failures)
@@ -0,0 +1,51 @@
+"""
+utils/regex_session.py 的会话淘汰：每个用户的会话数与目录总大小都有上限
+用法: python -m pytest tests/test_regex_session.py
+"""
+import os
+import sys
+import time
+
+# 添加项目路径（动态获取项目根目录）
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import pytest
+
+from utils.regex_session import RegexSessionStore, SessionConflict
+
+
+def make_sessions(store, user_id, count, size=100):
+    sessions = []
+    for _ in range(count):
+        session = store.create(user_id, 'a' * size)
+        store.save(session)
+        # 修改时间决定淘汰顺序，逐个拉开（仍在 SESSION_TTL 之内）
+        mtime = time.time() - 100 + len(sessions)
+        os.utime(store._disk_path(user_id, session['id']), (mtime, mtime))
+        sessions.append(session)
+    return sessions
+
+
+def disk_sessions(directory):
+    return sorted(name.split('.')[1] for name in os.listdir(directory) if name.endswith('.json'))
+
+
+def test_sessions_per_user_are_capped(tmp_path):
+    store = RegexSessionStore(disk_dir=str(tmp_path), max_per_user=2)
+    sessions = make_sessions(store, 1, 4)
+    other = make_sessions(store, 2, 1)
+    # 每个用户只保留最近的 2 个，其他用户不受影响
+    assert disk_sessions(tmp_path) == sorted([sessions[2]['id'], sessions[3]['id'], other[0]['id']])
+    with pytest.raises(SessionConflict):
+        store.get(sessions[0]['id'], 1, 0)
+
+
+def test_total_disk_bytes_are_capped(tmp_path):
+    store = RegexSessionStore(disk_dir=str(tmp_path), max_per_user=100, max_disk_bytes=1500)
+    sessions = make_sessions(store, 1, 3, size=600)
+    latest = store.create(2, 'b' * 600)
+    store.save(latest)
+    assert latest['id'] in disk_sessions(tmp_path)
+    assert sum(os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path)) <= 1500
+    assert sessions[0]['id'] not in disk_sessions(tmp_path)
@@ -0,0 +1,56 @@
+"""
+utils/request_metrics.py：请求方法标签的归一化与 METRICS_TOKEN 校验
+用法: python -m pytest tests/test_request_metrics.py
+"""
+import os
+import sys
+
+# 添加项目路径（动态获取项目根目录）
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from utils.request_metrics import MetricsMiddleware, RequestMetrics
+
+
+def hello_app(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [b'hello']
+
+
+def request(app, method):
+    environ = {'REQUEST_METHOD': method, 'PATH_INFO': '/login'}
+    body = app(environ, lambda status, headers, exc_info=None: None)
+    list(body)
+    body.close()
+
+
+def test_unknown_methods_are_recorded_as_other():
+    metrics = RequestMetrics()
+    app = MetricsMiddleware(hello_app, metrics)
+    for method in ('GET', 'POST', 'PROPFIND', 'X"}\nfake_metric{a="1'):
+        request(app, method)
+    assert sorted(metrics._data) == ['unmatched|GET', 'unmatched|OTHER', 'unmatched|POST']
+    assert metrics._data['unmatched|OTHER']['status'] == {'200': 2}
+    # 旧版本写入的任意方法名在输出时同样归为 OTHER
+    metrics._data['unmatched|X"}\nY'] = metrics._data['unmatched|GET']
+    output = metrics.render()
+    assert 'fake_metric' not in output and 'Y"' not in output
+    assert output.count('http_requests_total{endpoint="unmatched",method="OTHER"') == 1
+    assert 'http_requests_total{endpoint="unmatched",method="OTHER",status="200"} 3' in output
+
+
+def test_token_is_compared_as_bytes():
+    metrics = RequestMetrics()
+    metrics.token = 'sékret'
+    # WSGI 服务器把请求头按 latin-1 解码
+    assert metrics.authorized('10.0.0.1', 'Bearer ' + 'sékret'.encode('utf-8').decode('latin-1')) is True
+    assert metrics.authorized('10.0.0.1', 'Bearer sékret') is False
+    assert metrics.authorized('127.0.0.1', 'Bearer secret') is False
+    assert metrics.authorized('127.0.0.1', None) is False
+
+
+def test_loopback_without_token():
+    metrics = RequestMetrics()
+    assert metrics.authorized('127.0.0.1', None) is True
+    assert metrics.authorized('10.0.0.1', None) is False
+    assert metrics.authorized('not-an-ip', None) is False
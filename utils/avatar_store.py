@@ -0,0 +1,302 @@
+"""
+头像存储
+上传的图片按内容的 SHA-1 命名（内容寻址），相同图片只存一份；
+后台线程把原图缩放裁剪为 32 / 128 / 256 的正方形并重新编码为 WebP（Pillow 不支持 WebP 时为优化过的 PNG），
+导航栏只需下载 32px 的版本。文件名由内容决定，变体用一年的 immutable 缓存。
+转换完成前（或未安装 Pillow 时）回退到原图，不设长期缓存。
+旧版本按 "用户ID_时间戳.扩展名" 保存的头像仍由 /avatars/<filename> 提供。
+部署在 nginx 后时设置 AVATAR_ACCEL_PREFIX（如 /_avatars/），应用只返回 X-Accel-Redirect 头，
+由 nginx 的 internal location 读取文件，gunicorn worker 不再传输文件内容。
+同一图片可能被多个用户共用：save() 与 delete() 在目录文件锁内执行，save() 遇到已有文件时更新其修改时间，
+delete() 不删除 DELETE_GRACE 秒内保存过的文件（其他用户可能刚上传同一图片、尚未提交引用），
+而是放入本进程的延迟删除队列，DELETE_GRACE 秒后在应用上下文中重新检查引用再删除（worker 先退出时文件保留）。
+转换失败或进程在转换中途退出时原图保留：启动时扫描目录，为还没有变体的原图重新排队；
+请求回退到原图时也会重新排队（失败后 CONVERT_RETRY_INTERVAL 秒内不重试）。
+"""
+import hashlib
+import io
+import mimetypes
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from flask import current_app, send_from_directory, url_for
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+
+try:
+    import fcntl
+except ImportError:  # Windows 开发环境：没有其他 worker，只用进程内的锁
+    fcntl = None
+
+AVATAR_SIZES = (32, 128, 256)
+MAX_IMAGE_PIXELS = 40_000_000       # 拒绝解压后过大的图片（解压炸弹）
+SOURCE_EXTENSIONS = ('png', 'jpg', 'jpeg', 'gif')
+VARIANT_MAX_AGE = 365 * 24 * 3600
+DELETE_GRACE = 60                   # 秒，最近保存过的文件不删除
+CONVERT_RETRY_INTERVAL = 300        # 秒，转换失败后再次尝试的间隔
+
+_CONTENT_KEY = re.compile(r'^[0-9a-f]{40}$')
+
+
+class AvatarError(ValueError):
+    """上传的文件不是可用的图片"""
+
+
+def is_content_key(avatar):
+    return bool(avatar) and bool(_CONTENT_KEY.match(avatar))
+
+
+def avatar_url(avatar, size=128):
+    """头像地址：内容寻址的头像取指定尺寸，旧版文件名直接返回原文件"""
+    if not avatar:
+        return None
+    if is_content_key(avatar):
+        return url_for('get_avatar_variant', key=avatar, size=size)
+    return url_for('get_avatar', filename=avatar)
+
+
+class AvatarStore:
+    def __init__(self, directory=None, workers=2):
+        self.directory = directory
+        self.app = None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='avatar')
+        self._pending = {}
+        self._failed = {}           # 内容键 -> 最近一次转换失败的时间
+        self._deferred = {}         # 内容键 -> in_use，等待延迟删除
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self.variant_format = None
+
+    def init_app(self, app):
+        self.app = app
+        self.directory = os.path.join(app.root_path, app.config['UPLOAD_FOLDER'])
+        os.makedirs(self.directory, exist_ok=True)
+        if Image is None:
+            print("⚠️ 未安装 Pillow，头像将按原图保存，不做缩放")
+        else:
+            self.variant_format = 'webp' if features.check('webp') else 'png'
+            self.convert_pending()
+
+    # ---------- 路径 ----------
+
+    def variant_name(self, key, size):
+        return f'{key}-{size}.{self.variant_format}' if self.variant_format else None
+
+    def source_name(self, key):
+        """已保存的原图文件名（转换完成后原图会被删除）"""
+        for ext in SOURCE_EXTENSIONS:
+            name = f'{key}.{ext}'
+            if os.path.exists(os.path.join(self.directory, name)):
+                return name
+        return None
+
+    def resolve(self, key, size):
+        """返回 (文件名, 是否为最终变体)；都不存在时返回 (None, False)"""
+        name = self.variant_name(key, size)
+        if name and os.path.exists(os.path.join(self.directory, name)):
+            return name, True
+        return self.source_name(key), False
+
+    def send(self, filename, max_age=None, immutable=False):
+        """发送头像文件；配置了 AVATAR_ACCEL_PREFIX 时交给 nginx 发送，响应头（含 Cache-Control）由 nginx 原样转发"""
+        prefix = current_app.config.get('AVATAR_ACCEL_PREFIX')
+        if prefix:
+            mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            response = current_app.response_class(mimetype=mimetype)
+            response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + filename
+            if max_age is not None:
+                response.cache_control.public = True
+                response.cache_control.max_age = max_age
+        else:
+            response = send_from_directory(self.directory, filename, max_age=max_age)
+        if immutable:
+            response.cache_control.immutable = True
+        elif max_age == 0:
+            response.cache_control.no_cache = True
+        return response
+
+    # ---------- 写入 ----------
+
+    @contextmanager
+    def _locked(self):
+        """save() 与 delete() 互斥（跨 worker 进程用 flock）"""
+        with self._file_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.directory, '.lock'), 'a') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _files(self, key):
+        names = [self.variant_name(key, size) for size in AVATAR_SIZES] + [self.source_name(key)]
+        return [os.path.join(self.directory, name) for name in names
+                if name and os.path.exists(os.path.join(self.directory, name))]
+
+    def _touch(self, key):
+        for path in self._files(key):
+            try:
+                os.utime(path)
+            except OSError:
+                pass  # 原图在后台转换完成后被删除
+
+    def _write(self, name, data):
+        # 先写临时文件再原子替换，读者不会看到写了一半的文件
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, os.path.join(self.directory, name))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _inspect(self, data, ext):
+        """确认是图片并返回保存原图用的扩展名；没有 Pillow 时只能相信扩展名"""
+        if Image is None:
+            return ext
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                if image.width * image.height > MAX_IMAGE_PIXELS:
+                    raise AvatarError('图片尺寸过大')
+                image_format = (image.format or '').lower()
+                image.verify()
+        except AvatarError:
+            raise
+        except Exception:
+            raise AvatarError('无法识别的图片文件')
+        image_format = 'jpg' if image_format == 'jpeg' else image_format
+        if image_format not in SOURCE_EXTENSIONS:
+            raise AvatarError('不支持的图片格式')
+        return image_format
+
+    def save(self, data, ext):
+        """保存上传的图片，返回内容键；缩放在后台线程进行"""
+        ext = self._inspect(data, ext)
+        key = hashlib.sha1(data).hexdigest()
+        with self._locked():
+            if all(self.resolve(key, size)[1] for size in AVATAR_SIZES):
+                self._touch(key)
+                return key  # 同样的图片已处理过
+            if self.source_name(key):
+                self._touch(key)
+            else:
+                self._write(f'{key}.{ext}', data)
+        self.convert(key)
+        return key
+
+    def convert(self, key):
+        """在后台线程中为 key 的原图生成变体；正在转换或最近失败过时跳过"""
+        if not self.variant_format:
+            return
+        with self._lock:
+            failed_at = self._failed.get(key)
+            if key in self._pending or (failed_at is not None and time.monotonic() - failed_at < CONVERT_RETRY_INTERVAL):
+                return
+            self._pending[key] = self._executor.submit(self._convert, key)
+
+    def convert_pending(self):
+        """为目录中还没有变体的原图重新排队（上次转换失败或进程中途退出），返回排队的数量"""
+        keys = set()
+        for name in os.listdir(self.directory):
+            key, _, ext = name.partition('.')
+            if ext in SOURCE_EXTENSIONS and is_content_key(key):
+                keys.add(key)
+        for key in keys:
+            self.convert(key)
+        return len(keys)
+
+    def _convert(self, key):
+        try:
+            source = self.source_name(key)
+            if not source:
+                return
+            with Image.open(os.path.join(self.directory, source)) as image:
+                image = ImageOps.exif_transpose(image)
+                image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+                # 居中裁剪为正方形，头像都以圆形/正方形显示
+                side = min(image.size)
+                image = ImageOps.fit(image, (side, side), method=Image.LANCZOS)
+                for size in AVATAR_SIZES:
+                    variant = image.resize((size, size), Image.LANCZOS) if side > size else image
+                    buffer = io.BytesIO()
+                    if self.variant_format == 'webp':
+                        variant.save(buffer, 'WEBP', quality=85, method=6)
+                    else:
+                        variant.save(buffer, 'PNG', optimize=True)
+                    self._write(self.variant_name(key, size), buffer.getvalue())
+            os.remove(os.path.join(self.directory, source))
+        except FileNotFoundError:
+            pass  # 另一个 worker 同时转换了这张图片，已删除原图
+        except Exception as e:
+            print(f"⚠️ 头像转换失败 {key}: {e}")
+            with self._lock:
+                self._failed[key] = time.monotonic()
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def wait(self, key, timeout=None):
+        """等待后台转换完成（脚本、测试使用）"""
+        with self._lock:
+            future = self._pending.get(key)
+        if future is not None:
+            future.result(timeout)
+
+    def delete(self, key, in_use=None):
+        """删除某个内容键的所有文件；in_use() 在锁内检查是否仍有用户引用，返回真值时不删除。
+        DELETE_GRACE 秒内保存过的文件放入延迟删除队列，返回是否已删除"""
+        with self._locked():
+            paths = self._files(key)
+            try:
+                recent = any(time.time() - os.path.getmtime(path) < DELETE_GRACE for path in paths)
+            except OSError:
+                recent = True  # 文件正被转换替换，稍后再试
+            if recent:
+                self._defer_delete(key, in_use)
+                return False
+            if in_use is not None and in_use():
+                return False
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            return True
+
+    def _defer_delete(self, key, in_use):
+        with self._lock:
+            queued = key in self._deferred
+            self._deferred[key] = in_use
+        if not queued:
+            timer = threading.Timer(DELETE_GRACE, self._run_deferred_delete, args=(key,))
+            timer.daemon = True
+            timer.start()
+
+    def _run_deferred_delete(self, key):
+        with self._lock:
+            in_use = self._deferred.pop(key, None)
+        try:
+            # in_use() 查询数据库，需要应用上下文
+            if self.app is not None:
+                with self.app.app_context():
+                    self.delete(key, in_use)
+            else:
+                self.delete(key, in_use)
+        except Exception as e:
+            print(f"⚠️ 延迟删除头像失败 {key}: {e}")
+
+
+avatar_store = AvatarStore()
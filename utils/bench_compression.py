@@ -0,0 +1,147 @@
+"""
+响应压缩基准测试
+按不同响应大小生成与 /api/execute（输出 + variables）、/api/oj/submissions（含代码）、/api/notes（笔记正文）
+结构相同的 JSON，统计 gzip / brotli 各级别压缩后的字节数与每个响应的 CPU 耗时，
+以及经过 utils/compression.py 中间件（整体压缩与逐块 flush 的流式压缩）时的额外开销，用于选择 COMPRESSION_MIN_SIZE 与压缩级别。
+用法: python utils/bench_compression.py [--sizes 256,1024,4096,16384,65536,262144,1048576] [--repeat 50]
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+# 添加项目路径（动态获取项目根目录）
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from utils.compression import CompressionMiddleware, brotli
+
+CODE_LINES = [
+    'def solve(nums):', '    result = []', '    for i, n in enumerate(nums):', '        if n % 2 == 0:',
+    '            result.append(n * i)', '    return sorted(result, reverse=True)', 'print(solve(list(range(10))))',
+    'import re', "pattern = re.compile(r'\\d+')", "text = input().strip()", 'print(len(pattern.findall(text)))',
+]
+NOTE_PHRASES = ['列表推导式', '字符串格式化', '字典遍历', '装饰器', '生成器', '异常处理', '正则表达式',
+                'list comprehension', 'f-string', 'with open', 'yield', 'lambda', '今天复习了之前的内容。']
+
+
+def _fill(size, make_item):
+    """生成条目直到序列化后的总长度达到 size"""
+    items, total = [], 0
+    while total < size:
+        item = make_item(len(items))
+        total += len(json.dumps(item, ensure_ascii=False)) + 2
+        items.append(item)
+    return items
+
+
+def execute_payload(size):
+    variables = dict(_fill(size, lambda i: (f'var_{i}', {
+        'type': random.choice(['int', 'list', 'str', 'dict']),
+        'value': repr([random.randint(0, 999) for _ in range(random.randint(1, 12))])})))
+    return {'success': True, 'output': '42\n', 'error': None, 'execution_time': 0.0123,
+            'variables': variables, 'timestamp': '2024-05-01 12:00:00'}
+
+
+def submissions_payload(size):
+    submissions = _fill(size, lambda i: {
+        'id': i + 1, 'problem_id': random.randint(1, 50),
+        'status': random.choice(['accepted', 'wrong_answer', 'runtime_error']),
+        'code': '\n'.join(random.choice(CODE_LINES) for _ in range(random.randint(5, 30))),
+        'submitted_at': '2024-05-01 12:00:00', 'execution_time': 0.02})
+    return {'success': True, 'submissions': submissions}
+
+
+def notes_payload(size):
+    notes = _fill(size, lambda i: {
+        'id': i + 1, 'title': random.choice(NOTE_PHRASES),
+        'content': ' '.join(random.choice(NOTE_PHRASES) for _ in range(random.randint(20, 120))),
+        'module_id': 'variables', 'updated_at': '2024-05-01 12:00:00'})
+    return {'success': True, 'notes': notes}
+
+
+PAYLOADS = {'execute': execute_payload, 'submissions': submissions_payload, 'notes': notes_payload}
+
+
+def encode(data):
+    # 与 Flask 的 jsonify 一致：不转义非 ASCII 字符
+    return (json.dumps(data, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def cpu_us(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.process_time_ns()
+        fn()
+        samples.append((time.process_time_ns() - start) / 1000)
+    return statistics.median(samples)
+
+
+def codecs():
+    result = [(f'gzip-{level}', lambda body, level=level: gzip.compress(body, compresslevel=level, mtime=0))
+              for level in (1, 6, 9)]
+    if brotli is not None:
+        result += [(f'br-{quality}', lambda body, quality=quality: brotli.compress(body, quality=quality))
+                   for quality in (1, 4, 11)]
+    return result
+
+
+def through_middleware(body, encoding, chunk_size=None):
+    """用一个只返回 body 的 WSGI 应用经过中间件；chunk_size 不为空时模拟没有 Content-Length 的流式响应"""
+    def wsgi_app(environ, start_response):
+        headers = [('Content-Type', 'application/json')]
+        if chunk_size is None:
+            headers.append(('Content-Length', str(len(body))))
+            start_response('200 OK', headers)
+            return [body]
+        start_response('200 OK', headers)
+        return [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+    middleware = CompressionMiddleware(wsgi_app, min_size=0)
+    environ = {'REQUEST_METHOD': 'GET', 'HTTP_ACCEPT_ENCODING': encoding}
+
+    def run():
+        return sum(len(chunk) for chunk in middleware(environ, lambda status, headers, exc_info=None: None))
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description='响应压缩基准测试')
+    parser.add_argument('--sizes', default='256,1024,4096,16384,65536,262144,1048576')
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--chunk', type=int, default=16384, help='流式模式下每块的字节数')
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(',')]
+    random.seed(0)
+
+    names = [name for name, _ in codecs()]
+    print("每格为 压缩后字节 / CPU 微秒（中位数）；brotli 未安装时只测 gzip")
+    for kind, make in PAYLOADS.items():
+        print(f"\n=== {kind} ===")
+        print(f"{'size':>9}" + ''.join(f"{name:>20}" for name in names))
+        for size in sizes:
+            body = encode(make(size))
+            repeat = max(3, args.repeat * 4096 // max(len(body), 4096))
+            cells = []
+            for _, compress in codecs():
+                compressed = compress(body)
+                cells.append(f"{len(compressed):>9,} / {cpu_us(lambda: compress(body), repeat):>7.0f}")
+            print(f"{len(body):>9,}" + ''.join(f"{cell:>20}" for cell in cells))
+
+    print(f"\n=== 经过中间件（gzip-6，notes）：整体压缩 vs 每 {args.chunk:,} 字节 flush 的流式压缩 ===")
+    print(f"{'size':>9}{'buffered':>22}{'stream':>22}")
+    for size in sizes:
+        body = encode(notes_payload(size))
+        repeat = max(3, args.repeat * 4096 // max(len(body), 4096))
+        buffered = through_middleware(body, 'gzip')
+        streamed = through_middleware(body, 'gzip', args.chunk)
+        print(f"{len(body):>9,}{buffered():>11,} / {cpu_us(buffered, repeat):>7.0f}"
+              f"{streamed():>11,} / {cpu_us(streamed, repeat):>7.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+SQLite 并发写入基准测试
+模拟 N 个 gunicorn worker 同时做学习进度心跳（/api/progress）和代码执行历史写入（/api/execute），
+分别在 default 与 production 配置下运行，对比吞吐量、延迟和锁冲突次数。
+用法: python utils/bench_db_profile.py [--workers 3] [--ops 300]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# 添加项目路径（动态获取项目根目录）
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from models import db
+import models.code_execution  # noqa: F401  注册模型到 metadata
+import models.notes  # noqa: F401
+import models.problem  # noqa: F401
+import models.progress  # noqa: F401
+import models.user  # noqa: F401
+import models.user_profile  # noqa: F401
+from utils.db_profile import apply_sqlite_profile
+from utils.history_writer import write_history
+from utils.migrations import upgrade
+
+MODULES = ['variables', 'strings', 'lists', 'tuples', 'flow_control', 'functions']
+USERS_PER_WORKER = 20
+
+
+def make_engine(path, profile):
+    # pysqlite 默认 timeout=5s，两种配置保持一致，差异只来自 PRAGMA
+    engine = create_engine(f'sqlite:///{path}', pool_size=1, max_overflow=0)
+    apply_sqlite_profile(engine, profile)
+    return engine
+
+
+def prepare_database(path, workers):
+    engine = make_engine(path, 'default')
+    upgrade(engine)
+    with engine.begin() as conn:
+        for uid in range(1, workers * USERS_PER_WORKER + 1):
+            conn.execute(text('INSERT INTO users (id, username, email, password_hash) '
+                              'VALUES (:id, :name, :email, :pw)'),
+                         {'id': uid, 'name': f'u{uid}', 'email': f'u{uid}@bench', 'pw': 'x'})
+    engine.dispose()
+
+
+def heartbeat(conn, user_id):
+    """与 _apply_progress 等价的 upsert"""
+    module_id = random.choice(MODULES)
+    now = datetime.now()
+    updated = conn.execute(text(
+        'UPDATE progress SET study_time = study_time + 0.17, browse_coverage = MAX(browse_coverage, :cov), '
+        'last_updated = :now WHERE user_id = :uid AND module_id = :mid'),
+        {'cov': random.random(), 'now': now, 'uid': user_id, 'mid': module_id}).rowcount
+    if not updated:
+        conn.execute(text(
+            'INSERT OR IGNORE INTO progress (user_id, module_id, browse_coverage, study_time, '
+            'quiz_completion, progress_value, last_updated) VALUES (:uid, :mid, 0, 0, 0, 0, :now)'),
+            {'uid': user_id, 'mid': module_id, 'now': now})
+
+
+def record_execution(conn, user_id):
+    """与 /api/execute 中历史记录写入等价：写入环形缓冲区"""
+    write_history(conn, [{'user_id': user_id, 'code': "print('hello')\n" * 10,
+                          'record_type': 0, 'executed_at': datetime.now()}])
+
+
+def worker(args):
+    path, profile, worker_id, ops = args
+    engine = make_engine(path, profile)
+    first_user = worker_id * USERS_PER_WORKER + 1
+    latencies = []
+    errors = 0
+    for i in range(ops):
+        user_id = random.randint(first_user, first_user + USERS_PER_WORKER - 1)
+        op = heartbeat if i % 2 == 0 else record_execution
+        start = time.perf_counter()
+        try:
+            with engine.begin() as conn:
+                op(conn, user_id)
+        except OperationalError:
+            # database is locked
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    engine.dispose()
+    return latencies, errors
+
+
+def run(profile, workers, ops):
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        prepare_database(path, workers)
+        start = time.perf_counter()
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.map(worker, [(path, profile, w, ops) for w in range(workers)])
+        elapsed = time.perf_counter() - start
+    finally:
+        for suffix in ('', '-wal', '-shm', '-journal'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    latencies = sorted(l for lats, _ in results for l in lats)
+    errors = sum(e for _, e in results)
+    return {
+        'profile': profile,
+        'ops_per_sec': len(latencies) / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        'max_ms': latencies[-1] * 1000,
+        'locked_errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite 并发写入基准测试')
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--ops', type=int, default=300, help='每个 worker 的写事务数')
+    args = parser.parse_args()
+
+    print(f"=== {args.workers} 个 worker，每个 {args.ops} 次写事务 ===")
+    print(f"{'profile':<12}{'ops/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'locked':>8}")
+    for profile in ('default', 'production'):
+        r = run(profile, args.workers, args.ops)
+        print(f"{r['profile']:<12}{r['ops_per_sec']:>10.1f}{r['p50_ms']:>10.2f}"
+              f"{r['p99_ms']:>10.2f}{r['max_ms']:>10.2f}{r['locked_errors']:>8}")
+
+
+if __name__ == '__main__':
+    main()
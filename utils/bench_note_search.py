@@ -0,0 +1,110 @@
+"""
+笔记检索基准测试
+生成 N 条笔记（默认 100k，分属若干用户），对比原先的 ILIKE 模糊匹配与 FTS5 全文检索的查询耗时。
+用法: python utils/bench_note_search.py [--notes 100000] [--users 10] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# 添加项目路径（动态获取项目根目录）
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from flask import Flask
+from sqlalchemy import text
+from models import db
+from models.notes import Note
+import models.code_execution  # noqa: F401  注册模型到 metadata
+import models.problem  # noqa: F401
+import models.progress  # noqa: F401
+import models.user  # noqa: F401
+import models.user_profile  # noqa: F401
+from utils.migrations import upgrade
+from utils.note_search import search_notes
+
+PHRASES = [
+    '列表推导式', '字符串格式化', '字典遍历', '元组解包', '异常处理', '正则表达式', '文件读写',
+    '函数参数', '默认参数', '可变参数', '闭包', '装饰器', '生成器', '迭代器', '条件语句', '循环嵌套',
+    'list comprehension', 'f-string', 'dict.items()', 'try except', 're.findall', 'with open',
+    'lambda', 'yield', 'range(10)', 'enumerate', 'zip', 'sorted(key=len)', 'set union',
+]
+FILLER = '今天学习了一些新的知识点，需要多加练习并复习之前的内容。'
+QUERIES = ['装饰器', 'list comprehension', '正则表达式 findall', 're.findall', '不存在的关键词xyz']
+
+
+def make_content():
+    words = random.sample(PHRASES, 4)
+    return f"{FILLER} {' '.join(words)} {FILLER * random.randint(1, 6)}"
+
+
+def populate(notes, users):
+    now = datetime.now()
+    rows = [
+        {'user_id': 1 + i % users, 'title': random.choice(PHRASES), 'content': make_content(),
+         'created_at': now - timedelta(minutes=i), 'updated_at': now - timedelta(minutes=i)}
+        for i in range(notes)
+    ]
+    db.session.execute(text('INSERT INTO users (id, username, email, password_hash) VALUES '
+                            + ', '.join(f"({u}, 'u{u}', 'u{u}@bench', 'x')" for u in range(1, users + 1))))
+    db.session.execute(Note.__table__.insert(), rows)
+    db.session.commit()
+
+
+def ilike_search(user_id, q):
+    """原 /api/notes 的实现：单个 ILIKE 条件，返回全部结果"""
+    like = f'%{q}%'
+    return (Note.query.filter_by(user_id=user_id)
+            .filter((Note.title.ilike(like)) | (Note.content.ilike(like)))
+            .order_by(Note.updated_at.desc()).all())
+
+
+def timeit(fn, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='笔记检索基准测试')
+    parser.add_argument('--notes', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(app)
+    try:
+        with app.app_context():
+            upgrade()
+            start = time.perf_counter()
+            populate(args.notes, args.users)
+            print(f"=== {args.notes} 条笔记 / {args.users} 个用户，写入耗时 {time.perf_counter() - start:.1f}s ===")
+            print(f"{'query':<24}{'ILIKE ms':>10}{'rows':>8}{'FTS ms':>10}{'total':>8}")
+            user_id = 1
+            for q in QUERIES:
+                # ILIKE 只支持整串匹配，多词查询时与 FTS 的 AND 语义不同，仅作耗时参考
+                ilike_ms, ilike_rows = timeit(lambda: ilike_search(user_id, q), args.repeat)
+                fts_ms, fts_result = timeit(lambda: search_notes(user_id, q), args.repeat)
+                print(f"{q:<24}{ilike_ms:>10.2f}{len(ilike_rows):>8}{fts_ms:>10.2f}{fts_result['total']:>8}")
+    finally:
+        for suffix in ('', '-wal', '-shm', '-journal'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+静态资源构建
+把 static/js、static/css 下的源文件（含从模板中抽出的页面脚本 static/js/pages/*.js）压缩后
+写入 static/dist/，文件名带内容指纹（main.3f2a9c81d0.js），并预压缩出 .gz 与 .br，
+nginx 开启 gzip_static / brotli_static 后直接发送预压缩文件。
+最后写出 static/dist/manifest.json（源路径 -> 构建产物路径），供模板中的 asset_url() 使用（见 utils/static_assets.py）。
+JS / CSS 分别用 rjsmin / rcssmin 压缩（见 requirements.txt）。
+用法: python utils/build_assets.py [--check]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+
+import brotli
+import rcssmin
+import rjsmin
+
+# 添加项目路径（动态获取项目根目录）
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from utils.static_assets import DIST_DIR, MANIFEST_NAME
+
+STATIC_DIR = os.path.join(project_root, 'static')
+SOURCE_DIRS = ('js', 'css')
+EXTENSIONS = ('.js', '.css')
+COMPRESS_MIN_SIZE = 1024  # 太小的文件压缩收益不抵额外请求头
+
+
+def minify(path, source):
+    if path.endswith('.js'):
+        return rjsmin.jsmin(source)
+    return rcssmin.cssmin(source)
+
+
+def iter_sources():
+    for folder in SOURCE_DIRS:
+        for root, dirs, files in os.walk(os.path.join(STATIC_DIR, folder)):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(EXTENSIONS):
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, STATIC_DIR).replace(os.sep, '/'), path
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def build(check=False):
+    dist_root = os.path.join(STATIC_DIR, DIST_DIR)
+    manifest = {}
+    written = set()
+    total_source = total_min = total_gz = total_br = 0
+
+    for rel_path, path in iter_sources():
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        minified = minify(rel_path, source).encode('utf-8')
+        digest = hashlib.sha256(minified).hexdigest()[:10]
+        stem, ext = os.path.splitext(rel_path)
+        built = f'{DIST_DIR}/{stem}.{digest}{ext}'
+        manifest[rel_path] = built
+
+        output = os.path.join(STATIC_DIR, built)
+        outputs = {output: minified}
+        gz_size = br_size = len(minified)
+        if len(minified) >= COMPRESS_MIN_SIZE:
+            # mtime=0 使相同内容的 .gz 字节完全一致
+            compressed = gzip.compress(minified, compresslevel=9, mtime=0)
+            outputs[output + '.gz'] = compressed
+            gz_size = len(compressed)
+            compressed = brotli.compress(minified, quality=11)
+            outputs[output + '.br'] = compressed
+            br_size = len(compressed)
+        if not check:
+            for out_path, data in outputs.items():
+                if not os.path.exists(out_path):
+                    _write(out_path, data)
+        written.update(outputs)
+
+        total_source += len(source.encode('utf-8'))
+        total_min += len(minified)
+        total_gz += gz_size
+        total_br += br_size
+        print(f"  {rel_path:40s} {len(source.encode('utf-8')):>8,} -> {len(minified):>8,}  gzip {gz_size:>7,}"
+              f"  br {br_size:>7,}")
+
+    if check:
+        print("✅ 检查完成（未写入文件）")
+        return manifest
+
+    # 删除旧版本的构建产物
+    for root, dirs, files in os.walk(dist_root):
+        for name in files:
+            path = os.path.join(root, name)
+            if path not in written and name != MANIFEST_NAME:
+                os.remove(path)
+
+    _write(os.path.join(dist_root, MANIFEST_NAME),
+           json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    print(f"✅ 已构建 {len(manifest)} 个文件: {total_source:,} -> {total_min:,} 字节，gzip {total_gz:,}，brotli {total_br:,}")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='压缩静态资源并生成带指纹的文件与清单')
+    parser.add_argument('--check', action='store_true', help='只压缩并输出体积，不写入文件')
+    args = parser.parse_args()
+    build(check=args.check)
+
+
+if __name__ == '__main__':
+    main()
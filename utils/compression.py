@@ -0,0 +1,245 @@
+"""
+响应压缩（WSGI 中间件）
+按请求的 Accept-Encoding 选择 brotli 或 gzip（brotli 包见 requirements.txt，未安装时只用 gzip）压缩响应体，只压缩：
+- Content-Type 在白名单内（JSON、HTML、文本、JS/CSS 等，图片和已压缩的格式不再压缩）
+- 带 Content-Length 且不小于 COMPRESSION_MIN_SIZE 的普通响应：整体压缩后重新设置 Content-Length
+- 没有 Content-Length 的流式响应（如 /api/regex/test?stream=true 的 NDJSON）：逐块压缩并 flush，
+  客户端仍能按块及时收到数据（COMPRESSION_STREAMING=0 时流式响应不压缩）
+已有 Content-Encoding、Cache-Control: no-transform、X-Accel-Redirect（由 nginx 发送文件）、HEAD、206/304 等响应原样返回。
+压缩后的响应带 Vary: Accept-Encoding，强 ETag 改为弱 ETag（压缩后字节不同，但 If-None-Match 仍能匹配）。
+
+nginx 已对代理的响应开启 gzip 时设置 COMPRESS_RESPONSES=0，避免重复消耗 CPU；
+各响应大小下的压缩率与 CPU 耗时见 utils/bench_compression.py。
+    COMPRESS_RESPONSES=1          # 总开关
+    COMPRESSION_MIN_SIZE=1024     # 字节，小于此大小的响应不压缩
+    COMPRESSION_GZIP_LEVEL=6
+    COMPRESSION_BROTLI_QUALITY=4  # 动态响应用较低的质量，11 只适合构建时预压缩
+    COMPRESSION_STREAMING=1
+"""
+import re
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = frozenset({
+    'text/html', 'text/plain', 'text/css', 'text/csv', 'text/xml', 'text/javascript', 'text/markdown',
+    'text/event-stream', 'application/json', 'application/x-ndjson', 'application/javascript',
+    'application/xml', 'application/manifest+json', 'image/svg+xml',
+})
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_GZIP_LEVEL = 6
+DEFAULT_BROTLI_QUALITY = 4
+
+_SKIP_STATUS = (204, 206, 304)
+_CODING = re.compile(r'^\s*([A-Za-z0-9*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$')
+
+
+def choose_encoding(accept_encoding, brotli_available=brotli is not None):
+    """按 Accept-Encoding 的 q 值选择 'br' / 'gzip'，都不接受时返回 None；q 相同时优先 br"""
+    weights = {}
+    for part in (accept_encoding or '').split(','):
+        match = _CODING.match(part)
+        if not match:
+            continue
+        try:
+            weights[match.group(1).lower()] = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+    best, best_q = None, 0.0
+    for coding in (('br', 'gzip') if brotli_available else ('gzip',)):
+        q = weights.get(coding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class _Compressor:
+    """gzip / brotli 的统一接口：compress(块) 返回可以立即发送的压缩数据，finish() 返回结尾"""
+
+    def __init__(self, encoding, gzip_level, brotli_quality):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._gz = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data, flush=False):
+        if self.encoding == 'br':
+            out = self._br.process(data)
+            return out + self._br.flush() if flush else out
+        out = self._gz.compress(data)
+        return out + self._gz.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self):
+        return self._br.finish() if self.encoding == 'br' else self._gz.flush()
+
+
+class CompressionMiddleware:
+    def __init__(self, wsgi_app, min_size=DEFAULT_MIN_SIZE, gzip_level=DEFAULT_GZIP_LEVEL,
+                 brotli_quality=DEFAULT_BROTLI_QUALITY, streaming=True, types=COMPRESSIBLE_TYPES):
+        self.wsgi_app = wsgi_app
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.streaming = streaming
+        self.types = types
+
+    def __call__(self, environ, start_response):
+        encoding = choose_encoding(environ.get('HTTP_ACCEPT_ENCODING'))
+        if encoding is None or environ.get('REQUEST_METHOD') == 'HEAD':
+            return self.wsgi_app(environ, start_response)
+
+        captured = []
+
+        def capture(status, headers, exc_info=None):
+            if exc_info is not None and captured:
+                # 响应头已经发出后出错，交给服务器处理
+                raise exc_info[1].with_traceback(exc_info[2])
+            captured[:] = [status, headers, exc_info]
+            return _no_write
+
+        app_iter = self.wsgi_app(environ, capture)
+        if not captured:
+            # Flask 在返回前调用 start_response；其他应用可能推迟到第一次迭代
+            app_iter = _Prefetched(app_iter)
+        status, headers, exc_info = captured
+        mode = self._mode(status, headers)
+
+        if mode is None:
+            if self._vary_needed(headers):
+                headers = _add_vary(headers)
+            start_response(status, headers, exc_info)
+            return app_iter
+
+        compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+        headers = _compressed_headers(headers, encoding)
+        if mode == 'buffered':
+            try:
+                body = compressor.compress(b''.join(app_iter)) + compressor.finish()
+            finally:
+                if hasattr(app_iter, 'close'):
+                    app_iter.close()
+            headers.append(('Content-Length', str(len(body))))
+            start_response(status, headers, exc_info)
+            return [body]
+
+        start_response(status, headers, exc_info)
+        return _StreamingBody(app_iter, compressor)
+
+    def _mode(self, status, headers):
+        """'buffered'（整体压缩）、'stream'（逐块压缩）或 None（不压缩）"""
+        try:
+            code = int(status.split(' ', 1)[0])
+        except ValueError:
+            return None
+        if code < 200 or code in _SKIP_STATUS:
+            return None
+        values = {}
+        for name, value in headers:
+            values.setdefault(name.lower(), value)
+        if 'content-encoding' in values or 'x-accel-redirect' in values:
+            return None
+        if 'no-transform' in values.get('cache-control', '').lower():
+            return None
+        if values.get('content-type', '').split(';', 1)[0].strip().lower() not in self.types:
+            return None
+        length = values.get('content-length')
+        if length is None:
+            return 'stream' if self.streaming else None
+        try:
+            return 'buffered' if int(length) >= self.min_size else None
+        except ValueError:
+            return None
+
+    def _vary_needed(self, headers):
+        """可压缩类型即使这次没有压缩，也要告诉缓存响应随 Accept-Encoding 变化"""
+        for name, value in headers:
+            if name.lower() == 'content-type':
+                return value.split(';', 1)[0].strip().lower() in self.types
+        return False
+
+
+def _no_write(data):
+    raise RuntimeError('压缩中间件不支持 WSGI write()，请返回可迭代的响应体')
+
+
+def _add_vary(headers):
+    headers = list(headers)
+    for i, (name, value) in enumerate(headers):
+        if name.lower() == 'vary':
+            if 'accept-encoding' not in value.lower() and value.strip() != '*':
+                headers[i] = (name, f'{value}, Accept-Encoding')
+            return headers
+    headers.append(('Vary', 'Accept-Encoding'))
+    return headers
+
+
+def _compressed_headers(headers, encoding):
+    result = []
+    for name, value in _add_vary(headers):
+        lower = name.lower()
+        if lower in ('content-length', 'content-md5', 'accept-ranges'):
+            continue
+        if lower == 'etag' and not value.startswith('W/'):
+            value = 'W/' + value
+        result.append((name, value))
+    result.append(('Content-Encoding', encoding))
+    return result
+
+
+class _Prefetched:
+    """先取出第一块，确保应用已经调用 start_response"""
+
+    def __init__(self, app_iter):
+        self._app_iter = app_iter
+        self._iterator = iter(app_iter)
+        self._first = next(self._iterator, b'')
+
+    def __iter__(self):
+        yield self._first
+        yield from self._iterator
+
+    def close(self):
+        if hasattr(self._app_iter, 'close'):
+            self._app_iter.close()
+
+
+class _StreamingBody:
+    """逐块压缩，每块都 flush，流式接口的每一批数据都能及时到达客户端"""
+
+    def __init__(self, app_iter, compressor):
+        self._app_iter = app_iter
+        self._compressor = compressor
+
+    def __iter__(self):
+        for chunk in self._app_iter:
+            if chunk:
+                yield self._compressor.compress(chunk, flush=True)
+        yield self._compressor.finish()
+
+    def close(self):
+        if hasattr(self._app_iter, 'close'):
+            self._app_iter.close()
+
+
+class ResponseCompression:
+    def __init__(self):
+        self.enabled = False
+
+    def init_app(self, app):
+        self.enabled = bool(app.config.get('COMPRESS_RESPONSES'))
+        if not self.enabled:
+            return
+        app.wsgi_app = CompressionMiddleware(
+            app.wsgi_app,
+            min_size=app.config.get('COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE),
+            gzip_level=app.config.get('COMPRESSION_GZIP_LEVEL', DEFAULT_GZIP_LEVEL),
+            brotli_quality=app.config.get('COMPRESSION_BROTLI_QUALITY', DEFAULT_BROTLI_QUALITY),
+            streaming=app.config.get('COMPRESSION_STREAMING', True),
+        )
+
+
+response_compression = ResponseCompression()
@@ -0,0 +1,129 @@
+"""
+学习内容注册表
+utils/module_content.py 中各模块的数据结构不统一（topics / categories / examples 为列表或字典 / *_examples），
+这里在启动时统一整理一次：
+- modules:  module_id -> 模块信息（合并 MODULE_NAVIGATION 中的图标、难度）
+- topics:   "module_id.topic_id" -> 知识点（含 example_ids）
+- examples: 示例 ID -> 扁平的示例记录，ID 形如 "lists.basic_operations.0"、"tuples.basic_tuple"、"strings.3"
+所有查找都是字典访问；各模块的示例接口响应在首次请求时序列化并缓存（见 utils/http_cache.py）。
+version 为内容的哈希，用作页面片段缓存等的缓存键。
+"""
+import hashlib
+import json
+
+from utils.http_cache import CachedJson
+
+
+class ContentRegistry:
+    """规范化后的学习内容，只读"""
+
+    def __init__(self, all_modules, navigation):
+        self.raw = all_modules
+        self.modules = {}
+        self.topics = {}
+        self.categories = {}
+        self.examples = {}
+        self.navigation = list(navigation)
+        self._module_example_ids = {}
+        self._payloads = {}
+        self._build(all_modules, navigation)
+        raw = json.dumps([all_modules, self.navigation], sort_keys=True, ensure_ascii=False)
+        self.version = hashlib.sha1(raw.encode('utf-8')).hexdigest()[:12]
+
+    def _build(self, all_modules, navigation):
+        nav_by_id = {m['id']: m for m in navigation}
+        for module_id, module_data in all_modules.items():
+            info = nav_by_id.get(module_id, {})
+            self.modules[module_id] = {
+                'id': module_id,
+                'title': info.get('title') or module_data.get('title', module_id),
+                'description': info.get('description') or module_data.get('description', ''),
+                'icon': info.get('icon', ''),
+                'difficulty': info.get('difficulty', ''),
+            }
+            example_ids = self._module_example_ids[module_id] = []
+
+            for topic_id, topic in (module_data.get('topics') or {}).items():
+                ids = [self._add_example(f'{module_id}.{topic_id}.{i}', module_id, example, topic_id=topic_id)
+                       for i, example in enumerate(topic.get('examples') or [])]
+                self.topics[f'{module_id}.{topic_id}'] = {
+                    'id': f'{module_id}.{topic_id}',
+                    'module_id': module_id,
+                    'topic_id': topic_id,
+                    'title': topic.get('title', topic_id),
+                    'description': topic.get('description', ''),
+                    'example_ids': ids,
+                }
+                example_ids.extend(ids)
+
+            for category_id, title in (module_data.get('categories') or {}).items():
+                self.categories[f'{module_id}.{category_id}'] = {
+                    'id': f'{module_id}.{category_id}',
+                    'module_id': module_id,
+                    'category_id': category_id,
+                    'title': title,
+                }
+
+            # examples 以及 exception_examples 等 *_examples 分组：列表按序号、字典按键生成 ID
+            for group, examples in module_data.items():
+                if group != 'examples' and not group.endswith('_examples'):
+                    continue
+                prefix = module_id if group == 'examples' else f'{module_id}.{group}'
+                items = examples.items() if isinstance(examples, dict) else enumerate(examples or [])
+                for key, example in items:
+                    example_ids.append(self._add_example(
+                        f'{prefix}.{key}', module_id, example,
+                        group=None if group == 'examples' else group, key=key))
+
+    def _add_example(self, example_id, module_id, example, topic_id=None, group=None, key=None):
+        self.examples[example_id] = {
+            'id': example_id,
+            'module_id': module_id,
+            'topic_id': topic_id,
+            'group': group,
+            'key': key if isinstance(key, str) else None,
+            'category': example.get('category'),
+            'title': example.get('title') or (key if isinstance(key, str) else ''),
+            'description': example.get('description', ''),
+            'code': example.get('code', ''),
+        }
+        return example_id
+
+    # ---------- 查找 ----------
+
+    def get_module(self, module_id):
+        """原始模块数据（模板渲染使用）"""
+        return self.raw.get(module_id)
+
+    def get_module_info(self, module_id):
+        return self.modules.get(module_id)
+
+    def get_topic(self, module_id, topic_id):
+        return self.topics.get(f'{module_id}.{topic_id}')
+
+    def get_example(self, example_id):
+        return self.examples.get(example_id)
+
+    def module_examples(self, module_id):
+        """模块下所有示例的扁平记录"""
+        return [self.examples[i] for i in self._module_example_ids.get(module_id, [])]
+
+    def legacy_examples(self, module_id):
+        """/api/module/<id>/examples 的历史响应结构：按知识点分组的字典，或模块原始的 examples"""
+        module_data = self.raw[module_id]
+        if module_data.get('topics'):
+            return {topic_id: topic.get('examples', []) for topic_id, topic in module_data['topics'].items()}
+        groups = {k: v for k, v in module_data.items() if k.endswith('_examples')}
+        if groups:
+            return groups
+        return module_data.get('examples', [])
+
+    # ---------- 预序列化响应 ----------
+
+    def payload(self, name, module_id, build):
+        """按 (name, module_id) 缓存序列化后的响应体"""
+        key = (name, module_id)
+        cached = self._payloads.get(key)
+        if cached is None:
+            cached = self._payloads[key] = CachedJson(build())
+        return cached
@@ -0,0 +1,137 @@
+"""
+当前登录用户的加载与缓存
+- load_current_user(): 每个请求最多查询一次 users（JOIN 加载 user_profiles），结果保存在 flask.g
+- get_user_identity(): 跨请求的用户身份（用户名、邮箱、头像）TTL 缓存，供每个页面都会渲染的导航栏使用
+User / UserProfile 插入、更新、删除时通过 SQLAlchemy 事件自动失效；修改密码或删除用户时撤销服务端会话。
+flush 时只把受影响的用户 ID 记在 session.info 中，提交成功后（after_commit）才清除缓存、撤销会话，
+回滚时丢弃：否则提交前其他请求可能把旧数据重新放回缓存，回滚的修改也会误撤销会话。
+缓存按进程保存，其他 gunicorn worker 中的副本最多在 IDENTITY_TTL 秒后过期。
+"""
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from flask import g, session
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, configure_mappers, joinedload, object_session
+
+from models import db
+from models.user import User
+from models.user_profile import UserProfile
+from utils.server_session import revoke_user_sessions
+
+# User.profile 是 UserProfile 上定义的 backref，映射配置完成后才存在；
+# worker 处理的第一个请求就调用 load_current_user() 时还没有执行过查询，需先完成配置
+configure_mappers()
+
+IDENTITY_TTL = 60  # 秒
+IDENTITY_CACHE_SIZE = 1024
+
+UserIdentity = namedtuple('UserIdentity', ['id', 'username', 'email', 'avatar'])
+
+_identity_cache = OrderedDict()
+_identity_lock = threading.Lock()
+_MISSING = object()
+
+# session.info 中待提交的变更：{用户ID: 撤销会话的方式}，None 只清除缓存，'others' 保留当前会话，'all' 全部撤销
+_PENDING_KEY = 'current_user.pending'
+_REVOKE_ORDER = (None, 'others', 'all')
+
+
+def _query_user(user_id):
+    return db.session.get(User, user_id, options=[joinedload(User.profile)])
+
+
+def load_current_user():
+    """返回当前请求的 User（profile 已加载），未登录或用户不存在时返回 None"""
+    user = g.get('_current_user', _MISSING)
+    if user is _MISSING:
+        user_id = session.get('user_id')
+        user = _query_user(user_id) if user_id else None
+        g._current_user = user
+    return user
+
+
+def get_user_identity(user_id):
+    """返回用户身份快照，优先使用 TTL 缓存"""
+    now = time.monotonic()
+    with _identity_lock:
+        entry = _identity_cache.get(user_id)
+    if entry and entry[0] > now:
+        return entry[1]
+
+    user = load_current_user() if session.get('user_id') == user_id else _query_user(user_id)
+    if not user:
+        invalidate_user_identity(user_id)
+        return None
+
+    identity = UserIdentity(user.id, user.username, user.email, user.profile.avatar if user.profile else None)
+    with _identity_lock:
+        _identity_cache[user_id] = (now + IDENTITY_TTL, identity)
+        _identity_cache.move_to_end(user_id)
+        while len(_identity_cache) > IDENTITY_CACHE_SIZE:
+            _identity_cache.popitem(last=False)
+    return identity
+
+
+def current_user_id():
+    """返回已确认存在的当前用户 ID，未登录或用户已不存在时返回 None。
+    服务端会话中的身份快照直接可信（修改密码、删除用户时会话会被撤销），不查询 users 表；
+    cookie 会话则通过身份缓存确认用户仍然存在。"""
+    user_id = session.get('user_id')
+    if not user_id:
+        return None
+    if getattr(session, 'server_side', False) and session.get('identity', {}).get('id') == user_id:
+        return user_id
+    identity = get_user_identity(user_id)
+    return identity.id if identity else None
+
+
+def invalidate_user_identity(user_id):
+    """用户名或头像变更后清除缓存"""
+    with _identity_lock:
+        _identity_cache.pop(user_id, None)
+
+
+def _mark_changed(target, user_id, revoke=None):
+    """记下本次事务中变更的用户，提交后处理"""
+    db_session = object_session(target)
+    if db_session is None or user_id is None:
+        return
+    pending = db_session.info.setdefault(_PENDING_KEY, {})
+    if _REVOKE_ORDER.index(revoke) >= _REVOKE_ORDER.index(pending.get(user_id)):
+        pending[user_id] = revoke
+
+
+@event.listens_for(User, 'after_update')
+def _on_user_changed(mapper, connection, target):
+    # 修改密码后撤销该用户在其他设备上的会话
+    changed = inspect(target).attrs.password_hash.history.has_changes()
+    _mark_changed(target, target.id, 'others' if changed else None)
+
+
+@event.listens_for(User, 'after_delete')
+def _on_user_deleted(mapper, connection, target):
+    _mark_changed(target, target.id, 'all')
+
+
+@event.listens_for(UserProfile, 'after_insert')
+@event.listens_for(UserProfile, 'after_update')
+@event.listens_for(UserProfile, 'after_delete')
+def _on_profile_changed(mapper, connection, target):
+    _mark_changed(target, target.user_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _on_commit(db_session):
+    for user_id, revoke in db_session.info.pop(_PENDING_KEY, {}).items():
+        invalidate_user_identity(user_id)
+        if revoke:
+            revoke_user_sessions(user_id, keep_current=(revoke == 'others'))
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _on_rollback(db_session, previous_transaction):
+    # 只回滚到保存点时外层事务的变更仍可能提交
+    if not previous_transaction.nested:
+        db_session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,96 @@
+"""
+模板片段缓存
+模块详情页正文（templates/partials/module_body.html）只依赖 module_id 和学习内容版本，
+渲染结果缓存在进程内 LRU 中，导航栏头像等与用户相关的部分仍按请求渲染。
+设置 FRAGMENT_CACHE_DIR 后同时写入磁盘，多个 gunicorn worker 共享，重启后也无需重新渲染。
+缓存键包含模板文件的修改时间，修改模板后自动失效。
+    FRAGMENT_CACHE_SIZE=64                      # 进程内最多缓存的片段数，0 表示关闭
+    FRAGMENT_CACHE_DIR=instance/fragment_cache  # 可选，磁盘缓存目录
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from flask import current_app, render_template
+from markupsafe import Markup
+
+
+class FragmentCache:
+    """已渲染 HTML 片段的两级缓存：进程内 LRU + 可选的磁盘目录"""
+
+    def __init__(self, maxsize=64, disk_dir=None):
+        self.maxsize = maxsize
+        self.disk_dir = disk_dir
+        self._fragments = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.maxsize = int(app.config.get('FRAGMENT_CACHE_SIZE', self.maxsize))
+        self.disk_dir = app.config.get('FRAGMENT_CACHE_DIR') or None
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def _full_key(self, template_name, key):
+        template = current_app.jinja_env.get_template(template_name)
+        mtime = os.stat(template.filename).st_mtime_ns if template.filename else 0
+        raw = repr((template_name, mtime, key)).encode('utf-8')
+        return hashlib.sha1(raw).hexdigest()
+
+    def _disk_path(self, full_key):
+        return os.path.join(self.disk_dir, f'{full_key}.html')
+
+    def _read_disk(self, full_key):
+        try:
+            with open(self._disk_path(full_key), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, full_key, html):
+        # 先写临时文件再原子替换，其他 worker 不会读到写了一半的文件
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(html)
+            os.replace(tmp_path, self._disk_path(full_key))
+        except OSError as e:
+            print(f"⚠️ 片段缓存写入失败: {e}")
+
+    def render(self, template_name, key, **context):
+        """渲染（或取缓存的）片段。key 需包含所有影响输出的参数，context 不得包含用户相关数据"""
+        if self.maxsize <= 0:
+            return Markup(render_template(template_name, **context))
+
+        full_key = self._full_key(template_name, key)
+        with self._lock:
+            html = self._fragments.get(full_key)
+            if html is not None:
+                self._fragments.move_to_end(full_key)
+                self.hits += 1
+                return Markup(html)
+
+        html = self._read_disk(full_key) if self.disk_dir else None
+        if html is None:
+            self.misses += 1
+            html = render_template(template_name, **context)
+            if self.disk_dir:
+                self._write_disk(full_key, html)
+        else:
+            self.hits += 1
+
+        with self._lock:
+            self._fragments[full_key] = html
+            while len(self._fragments) > self.maxsize:
+                self._fragments.popitem(last=False)
+        return Markup(html)
+
+    def clear(self):
+        with self._lock:
+            self._fragments.clear()
+
+
+fragment_cache = FragmentCache()
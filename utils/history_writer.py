@@ -0,0 +1,117 @@
+"""
+代码执行历史的异步写入
+每个用户每种类型的历史记录是一个固定大小（HISTORY_SIZE）的环形缓冲区：
+新记录写入 (最新记录的 slot + 1) % HISTORY_SIZE，槽位已被占用时由 INSERT OR REPLACE 删除最旧的一条再插入，
+一条语句完成，不再需要 COUNT + 逐条删除。覆盖后的记录拿到新的 id，按 id 引用旧记录的页面
+（如 /api/executions/<id>）得到 404，而不是另一段代码。
+写入通过后台线程批量提交（write-behind），/api/execute 的响应不再等待数据库提交。
+队列在每个 worker 进程内，读取前的 flush() 只能写出本进程的积压：请求落到另一个 worker 时，
+最多有 flush_interval 秒内刚提交的记录还看不到。
+"""
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import bindparam, text
+from models import db
+
+HISTORY_SIZE = 10
+
+RING_INSERT_SQL = text(f'''
+INSERT OR REPLACE INTO code_executions (user_id, code, record_type, executed_at, slot)
+VALUES (
+    :user_id, :code, :record_type, :executed_at,
+    COALESCE((
+        SELECT (slot + 1) % {HISTORY_SIZE} FROM code_executions
+        WHERE user_id = :user_id AND record_type = :record_type
+        ORDER BY executed_at DESC, id DESC LIMIT 1
+    ), 0)
+)
+''').bindparams(
+    # 按 DateTime 类型绑定，与 ORM 写入（及游标分页比较）的格式一致，而不是 sqlite3 已弃用的默认适配器
+    bindparam('executed_at', type_=db.DateTime),
+)
+
+
+def write_history(connection, records):
+    """在给定连接上写入一批历史记录"""
+    for record in records:
+        connection.execute(RING_INSERT_SQL, record)
+
+
+class HistoryWriter:
+    """按 worker 进程启动的后台批量写入线程"""
+
+    def __init__(self, flush_interval=0.2, batch_size=100, max_pending=1000):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.app = None
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        # 取出与写入在同一把锁内完成，保证批次按入队顺序提交（环形槽位依赖时间顺序）
+        self._write_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        atexit.register(self.flush)
+
+    def _ensure_thread(self):
+        # gunicorn 在 fork 之后才处理请求，线程需在 worker 内首次使用时启动
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='history-writer', daemon=True)
+                self._thread.start()
+
+    def submit(self, user_id, code, record_type=0):
+        """加入写入队列；队列已满时先在当前线程写出积压记录，保证记录不丢失"""
+        record = {
+            'user_id': user_id,
+            'code': code,
+            'record_type': record_type,
+            'executed_at': datetime.now(),
+        }
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.flush()
+            self.queue.put(record)
+        self._ensure_thread()
+
+    def _drain(self):
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self):
+        """立即写入本进程队列中所有待写记录（读取或清空历史前调用，同一 worker 内读到自己的写入）"""
+        if self.app is None:
+            return
+        with self._write_lock:
+            while True:
+                batch = self._drain()
+                if not batch:
+                    return
+                with self.app.app_context():
+                    try:
+                        with db.engine.begin() as connection:
+                            write_history(connection, batch)
+                    except Exception as e:
+                        print(f"⚠️ 保存执行历史失败: {str(e)}")
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            if not self.queue.empty():
+                self.flush()
+
+
+history_writer = HistoryWriter()
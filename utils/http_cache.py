@@ -0,0 +1,86 @@
+"""
+预序列化的 JSON 响应
+内容不变的数据（模块示例、OJ 题目等）只序列化一次，保存编码后的字节与强 ETag，
+请求带 If-None-Match 且 ETag 一致时直接返回 304。
+响应带 Cache-Control（STATIC_JSON_MAX_AGE，默认 300 秒）：有效期内浏览器/nginx 直接使用缓存，
+过期后凭 ETag 重新验证。内容来自文件（Data/）时用 VersionedJsonCache 按文件版本重建。
+"""
+import hashlib
+import os
+import threading
+
+from flask import current_app, request
+
+
+class CachedJson:
+    """一份 JSON 数据的编码缓存，首次使用时用应用的 JSON provider 序列化"""
+
+    def __init__(self, data, status=200):
+        self.data = data
+        self.status = status
+        self._body = None
+        self._etag = None
+        self._lock = threading.Lock()
+
+    def _encode(self):
+        with self._lock:
+            if self._body is None:
+                body = (current_app.json.dumps(self.data) + '\n').encode('utf-8')
+                self._etag = hashlib.sha1(body).hexdigest()
+                self._body = body
+
+    @property
+    def body(self):
+        if self._body is None:
+            self._encode()
+        return self._body
+
+    @property
+    def etag(self):
+        if self._etag is None:
+            self._encode()
+        return self._etag
+
+    def response(self):
+        """返回带 ETag 与 Cache-Control 的响应；客户端缓存仍有效时为 304"""
+        response = current_app.response_class(self.body, status=self.status, mimetype='application/json')
+        response.set_etag(self.etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config.get('STATIC_JSON_MAX_AGE', 300)
+        return response.make_conditional(request)
+
+
+def directory_version(path, prefix='', suffix=''):
+    """目录中匹配文件的 (文件名, 修改时间, 大小) 元组，任一文件增删改都会改变版本"""
+    try:
+        with os.scandir(path) as entries:
+            return tuple(sorted(
+                (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+                for entry in entries
+                if entry.name.startswith(prefix) and entry.name.endswith(suffix) and entry.is_file()
+            ))
+    except FileNotFoundError:
+        return ()
+
+
+class VersionedJsonCache:
+    """按内容版本缓存 CachedJson：version() 的返回值变化时重新构建"""
+
+    def __init__(self, version):
+        self.version = version
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        """build() 返回 None 表示数据不存在（不缓存）"""
+        version = self.version()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        data = build()
+        if data is None:
+            return None
+        cached = CachedJson(data)
+        with self._lock:
+            self._entries[key] = (version, cached)
+        return cached
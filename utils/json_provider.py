@@ -0,0 +1,105 @@
+"""
+JSON 序列化
+替换 Flask 默认的 JSON provider（jsonify、CachedJson 等都经过它）：安装了 orjson 时用 orjson 编码，
+否则回退到标准库 json，两者的输出格式一致：
+- set / frozenset / tuple 输出为数组，datetime 输出为 'YYYY-MM-DD HH:MM:SS'，date 为 'YYYY-MM-DD'，
+  模型的 to_dict() 与 /api/execute 的 variables 直接返回原始对象，不再预先转换
+- 用户代码中的函数、类、自定义对象输出为 '<function 名称>' / '<类名 object>' 占位字符串，
+  bytes、complex、range、生成器和其他迭代器同样输出为 '<类型名 object>'
+- 非 ASCII 字符不转义，键按插入顺序输出（variables 按定义顺序显示）
+orjson 不支持的值（超过 64 位的整数等）自动改用标准库编码。请求体的解析仍使用标准库。
+整体编码仍失败时（如自引用的列表），由调用方用 replace_unserializable() 只替换出错的值后重新编码。
+    JSON_ENCODER=auto   # auto（有 orjson 时使用）/ orjson / stdlib
+"""
+import json
+from collections.abc import Iterator
+from datetime import date, datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+def to_json_value(obj):
+    """编码器遇到不能直接表示的对象时调用，返回可编码的值"""
+    if isinstance(obj, datetime):
+        return obj.strftime(DATETIME_FORMAT)
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if callable(obj):
+        return f"<function {getattr(obj, '__name__', 'unknown')}>"
+    try:
+        # Flask 默认支持的 Decimal / UUID / dataclass / __html__
+        return DefaultJSONProvider.default(obj)
+    except TypeError:
+        pass
+    if hasattr(obj, '__dict__') or isinstance(obj, (bytes, bytearray, complex, range, Iterator)):
+        return f"<{type(obj).__name__} object>"
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def replace_unserializable(values, dumps):
+    """逐个试编码 values（dict）中的值，无法编码的改为 '<类型名 object>'；只在整体编码失败后调用"""
+    result = {}
+    for name, value in values.items():
+        try:
+            dumps(value)
+            result[name] = value
+        except (TypeError, ValueError, RecursionError):
+            result[name] = f"<{type(value).__name__} object>"
+    return result
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    ensure_ascii = False
+    sort_keys = False
+    default = staticmethod(to_json_value)
+
+    def __init__(self, app, use_orjson=None):
+        super().__init__(app)
+        self.use_orjson = orjson is not None if use_orjson is None else use_orjson
+
+    def _dumps_bytes(self, obj, indent=False):
+        """返回 UTF-8 字节；只有 orjson 能处理时走快速路径"""
+        if self.use_orjson:
+            try:
+                return orjson.dumps(obj, default=to_json_value,
+                                    option=_ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0))
+            except TypeError:
+                pass  # 超过 64 位的整数、无法转换的键等，交给标准库（仍失败则照常抛出 TypeError）
+        if indent:
+            return super().dumps(obj, indent=2).encode('utf-8')
+        return super().dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if kwargs or not self.use_orjson:
+            return super().dumps(obj, **kwargs)
+        return self._dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """按 JSON_ENCODER 配置安装 provider"""
+    encoder = app.config.get('JSON_ENCODER', 'auto')
+    if encoder == 'orjson' and orjson is None:
+        print("⚠️ JSON_ENCODER=orjson 但未安装 orjson，使用标准库 json")
+    app.json_provider_class = FastJSONProvider
+    app.json = FastJSONProvider(app, use_orjson=orjson is not None and encoder != 'stdlib')
+    return app.json
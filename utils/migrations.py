@@ -0,0 +1,166 @@
+"""
+数据库迁移脚本
+按版本号顺序执行迁移，已执行的版本记录在 schema_migrations 表中，可重复运行。
+应用启动时只检查版本，不再做建表等结构变更；部署时先运行本脚本再重启 gunicorn。
+用法:
+    python utils/migrations.py            # 升级到最新版本
+    python utils/migrations.py --status   # 查看当前版本
+"""
+import os
+import sys
+from datetime import datetime
+
+# 添加项目路径（动态获取项目根目录）
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from sqlalchemy import inspect, text
+from models import db
+from utils.history_writer import HISTORY_SIZE
+from utils.note_search import NOTES_FTS_DDL, NOTES_FTS_REBUILD
+
+VERSION_TABLE = 'schema_migrations'
+
+
+# ======================== 迁移定义 ========================
+# 每个迁移函数接收一个处于事务中的 connection，必须可重复执行（幂等）。
+
+def create_base_tables(connection):
+    """创建所有模型对应的表（已存在的表会跳过）"""
+    db.metadata.create_all(bind=connection, checkfirst=True)
+
+
+def _create_indexes(connection, names):
+    """按名称补建模型 __table_args__ 中声明、但数据库中尚不存在的索引"""
+    for table in db.metadata.sorted_tables:
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            if index.name in names:
+                index.create(bind=connection, checkfirst=True)
+
+
+def create_hot_query_indexes(connection):
+    """热点查询的复合索引"""
+    _create_indexes(connection, {
+        'ix_code_executions_user_type_time',
+        'ix_submissions_user_problem_time',
+        'ix_notes_user_updated',
+    })
+
+
+def add_execution_history_slots(connection):
+    """执行历史改为环形缓冲区：增加 slot 列，每个用户每种类型只保留最近 10 条并按时间编号"""
+    columns = {c['name'] for c in inspect(connection).get_columns('code_executions')}
+    if 'slot' not in columns:
+        connection.execute(text('ALTER TABLE code_executions ADD COLUMN slot INTEGER'))
+
+    rows = connection.execute(text(
+        'SELECT id, user_id, record_type FROM code_executions '
+        'ORDER BY user_id, record_type, executed_at DESC, id DESC'
+    )).fetchall()
+    groups = {}
+    for row in rows:
+        groups.setdefault((row.user_id, row.record_type), []).append(row.id)
+
+    for ids in groups.values():
+        keep, stale = ids[:HISTORY_SIZE], ids[HISTORY_SIZE:]
+        for record_id in stale:
+            connection.execute(text('DELETE FROM code_executions WHERE id = :id'), {'id': record_id})
+        # 最旧的一条为 0 号槽位，下一次写入的槽位紧跟最新一条
+        for slot, record_id in enumerate(reversed(keep)):
+            connection.execute(text('UPDATE code_executions SET slot = :slot WHERE id = :id'),
+                               {'slot': slot, 'id': record_id})
+
+    _create_indexes(connection, {'uix_code_executions_user_type_slot'})
+
+
+def create_notes_fts(connection):
+    """笔记全文检索：FTS5 外部内容表 + 同步触发器，并用现有笔记重建索引（仅 SQLite）"""
+    if connection.dialect.name != 'sqlite':
+        return
+    for statement in NOTES_FTS_DDL:
+        connection.execute(text(statement))
+    connection.execute(text(NOTES_FTS_REBUILD))
+
+
+def replace_submission_status_index(connection):
+    """(user_id, status) 索引换成 (user_id, submitted_at)：按用户列出提交记录时不再需要临时排序"""
+    connection.execute(text('DROP INDEX IF EXISTS ix_submissions_user_status'))
+    _create_indexes(connection, {'ix_submissions_user_time'})
+
+
+# (版本号, 说明, 迁移函数)，版本号只增不改
+MIGRATIONS = [
+    (1, '创建基础表', create_base_tables),
+    (2, '热点查询复合索引', create_hot_query_indexes),
+    (3, '执行历史环形缓冲区', add_execution_history_slots),
+    (4, '笔记全文检索索引', create_notes_fts),
+    (5, '提交记录按用户+时间索引', replace_submission_status_index),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# ======================== 版本管理 ========================
+
+def _ensure_version_table(connection):
+    connection.execute(text(
+        f'CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ('
+        'version INTEGER PRIMARY KEY, '
+        'description VARCHAR(200), '
+        'applied_at DATETIME NOT NULL)'
+    ))
+
+
+def get_schema_version(connection):
+    """返回数据库当前的结构版本，未做过迁移的数据库返回 0"""
+    if not inspect(connection).has_table(VERSION_TABLE):
+        return 0
+    version = connection.execute(text(f'SELECT MAX(version) FROM {VERSION_TABLE}')).scalar()
+    return version or 0
+
+
+def upgrade(engine=None):
+    """执行所有未执行的迁移，返回本次执行的 (版本号, 说明) 列表（需在应用上下文中调用）"""
+    engine = engine or db.engine
+    applied = []
+    with engine.begin() as connection:
+        _ensure_version_table(connection)
+        current = get_schema_version(connection)
+
+    for version, description, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        # 每个版本单独一个事务，失败时不会留下半个版本
+        with engine.begin() as connection:
+            migrate(connection)
+            connection.execute(
+                text(f'INSERT INTO {VERSION_TABLE} (version, description, applied_at) '
+                     'VALUES (:version, :description, :applied_at)'),
+                {'version': version, 'description': description, 'applied_at': datetime.now()}
+            )
+        applied.append((version, description))
+    return applied
+
+
+def check_schema(engine=None):
+    """启动时检查结构版本，返回 (是否最新, 当前版本)"""
+    engine = engine or db.engine
+    with engine.connect() as connection:
+        current = get_schema_version(connection)
+    return current >= LATEST_VERSION, current
+
+
+if __name__ == '__main__':
+    from app import app
+
+    with app.app_context():
+        if len(sys.argv) > 1 and sys.argv[1] == '--status':
+            _, current = check_schema()
+            print(f"当前结构版本: {current}，最新版本: {LATEST_VERSION}")
+            sys.exit(0)
+
+        applied = upgrade()
+        for version, description in applied:
+            print(f"✅ 已执行迁移 {version}: {description}")
+        if not applied:
+            print(f"数据库已是最新版本 ({LATEST_VERSION})")
@@ -0,0 +1,187 @@
+"""
+笔记全文检索（SQLite FTS5）
+notes_fts 是 notes 表的外部内容索引，由触发器保持同步（见 utils/migrations.py 迁移 4）。
+使用 trigram 分词器：文本按字符 3-gram 切分，中文无需分词词典，大小写不敏感。
+少于 3 个字符的检索词（例如常见的两字中文词）无法使用 trigram 索引，改为在命中结果/该用户的笔记内 LIKE 过滤。
+"""
+import re
+
+from sqlalchemy import and_, or_, text
+from sqlalchemy.orm import undefer
+
+from models import db
+from models.notes import Note
+
+FTS_TABLE = 'notes_fts'
+MIN_TRIGRAM_TERM = 3
+MAX_TERMS = 10
+SNIPPET_WIDTH = 80
+TITLE_WEIGHT = 10.0
+CONTENT_WEIGHT = 1.0
+
+# 迁移中执行的建表与触发器语句（幂等）
+NOTES_FTS_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, content, content='notes', content_rowid='note_id', tokenize='trigram')",
+    f"""CREATE TRIGGER IF NOT EXISTS notes_fts_ai AFTER INSERT ON notes BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, title, content) VALUES (new.note_id, new.title, new.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS notes_fts_ad AFTER DELETE ON notes BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, content)
+        VALUES ('delete', old.note_id, old.title, old.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS notes_fts_au AFTER UPDATE OF title, content ON notes BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, content)
+        VALUES ('delete', old.note_id, old.title, old.content);
+        INSERT INTO {FTS_TABLE} (rowid, title, content) VALUES (new.note_id, new.title, new.content);
+    END""",
+]
+NOTES_FTS_REBUILD = f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')"
+
+_fts_ready = False
+
+
+def fts_available():
+    """当前数据库是否已建立 notes_fts（非 SQLite 或未迁移时回退到 LIKE）"""
+    global _fts_ready
+    if not _fts_ready and db.engine.dialect.name == 'sqlite':
+        _fts_ready = db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': FTS_TABLE}
+        ).first() is not None
+    return _fts_ready
+
+
+def split_terms(q):
+    """按空白切分检索词，去重并限制数量"""
+    terms = []
+    for term in q.split():
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_TERMS]
+
+
+def _fts_match_expr(terms):
+    # 每个词作为短语，隐式 AND
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def _like_pattern(term):
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def find_highlights(value, terms):
+    """返回 value 中所有检索词出现位置 [[start, end], ...]（已合并重叠区间），按码点计数，前端需按码点切分"""
+    if not value:
+        return []
+    spans = []
+    for term in terms:
+        spans.extend(m.span() for m in re.finditer(re.escape(term), value, re.IGNORECASE))
+    spans.sort()
+    merged = []
+    for start, end in spans:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def make_snippet(value, terms, width=SNIPPET_WIDTH):
+    """截取第一个命中位置附近的片段，返回 (片段, 片段内的高亮区间)"""
+    value = value or ''
+    highlights = find_highlights(value, terms)
+    start = max(0, highlights[0][0] - width // 4) if highlights else 0
+    end = min(len(value), start + width)
+    prefix = '…' if start > 0 else ''
+    suffix = '…' if end < len(value) else ''
+    snippet = prefix + value[start:end].replace('\n', ' ') + suffix
+    offset = len(prefix) - start
+    snippet_highlights = [
+        [max(s, start) + offset, min(e, end) + offset]
+        for s, e in highlights if s < end and e > start
+    ]
+    return snippet, snippet_highlights
+
+
+def _short_term_filters(terms):
+    return [
+        or_(Note.title.ilike(_like_pattern(term), escape='\\'),
+            Note.content.ilike(_like_pattern(term), escape='\\'))
+        for term in terms
+    ]
+
+
+def _fts_search(user_id, long_terms, short_terms, limit, offset):
+    """FTS 检索，返回 ([(note_id, score)], total)。
+    CROSS JOIN 强制以 notes_fts 为外层循环：先取 MATCH 结果再按用户过滤，
+    否则 SQLite 会对该用户的每条笔记单独执行一次 MATCH。"""
+    params = {'match': _fts_match_expr(long_terms), 'user_id': user_id, 'limit': limit, 'offset': offset}
+    conditions = ''
+    for i, term in enumerate(short_terms):
+        params[f'term{i}'] = _like_pattern(term)
+        conditions += (f" AND (notes.title LIKE :term{i} ESCAPE '\\'"
+                       f" OR notes.content LIKE :term{i} ESCAPE '\\')")
+    # bm25() 不能与窗口函数出现在同一层查询中，先在子查询里算出得分
+    sql = text(
+        f'SELECT note_id, score, COUNT(*) OVER () AS total FROM ('
+        f'SELECT notes.note_id AS note_id, bm25({FTS_TABLE}, {TITLE_WEIGHT}, {CONTENT_WEIGHT}) AS score '
+        f'FROM {FTS_TABLE} CROSS JOIN notes ON notes.note_id = {FTS_TABLE}.rowid '
+        f'WHERE {FTS_TABLE} MATCH :match AND notes.user_id = :user_id{conditions}'
+        f') ORDER BY score LIMIT :limit OFFSET :offset'
+    )
+    rows = db.session.execute(sql, params).fetchall()
+    if rows:
+        return [(row[0], -row[1]) for row in rows], rows[0][2]
+    if offset:
+        # 页码超出范围时单独统计总数
+        count_sql = text(
+            f'SELECT COUNT(*) FROM {FTS_TABLE} CROSS JOIN notes ON notes.note_id = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH :match AND notes.user_id = :user_id{conditions}'
+        )
+        return [], db.session.execute(count_sql, params).scalar()
+    return [], 0
+
+
+def search_notes(user_id, q, page=1, per_page=20):
+    """检索用户笔记，按相关度排序并分页，每条结果附带片段与高亮位置"""
+    terms = split_terms(q)
+    page = max(page, 1)
+    per_page = min(max(per_page, 1), 100)
+    long_terms = [t for t in terms if len(t) >= MIN_TRIGRAM_TERM]
+    short_terms = [t for t in terms if len(t) < MIN_TRIGRAM_TERM]
+
+    if long_terms and fts_available():
+        # bm25 越小越相关（取负数作为 score），标题权重更高
+        rows, total = _fts_search(user_id, long_terms, short_terms, per_page, (page - 1) * per_page)
+        scores = dict(rows)
+    else:
+        base = (db.session.query(Note.note_id)
+                .filter(Note.user_id == user_id)
+                .filter(and_(*_short_term_filters(terms))))
+        total = base.count()
+        rows = base.order_by(Note.updated_at.desc()).limit(per_page).offset((page - 1) * per_page).all()
+        scores = {row[0]: None for row in rows}
+
+    notes = {}
+    if scores:
+        query = Note.query.filter(Note.note_id.in_(list(scores))).options(undefer(Note.content))
+        notes = {n.note_id: n for n in query.all()}
+    results = []
+    for note_id, note_score in scores.items():
+        note = notes.get(note_id)
+        if not note:
+            continue
+        item = note.to_dict()
+        item['score'] = note_score
+        item['title_highlights'] = find_highlights(note.title, terms)
+        item['snippet'], item['highlights'] = make_snippet(note.content, terms)
+        results.append(item)
+
+    return {
+        'notes': results,
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'has_more': page * per_page < total,
+    }
@@ -0,0 +1,74 @@
+"""
+列表接口的游标分页与字段投影
+- 游标（keyset）分页：按 (时间, id) 倒序，下一页条件为 (时间, id) < 上一页最后一条，
+  不使用 OFFSET，翻页代价与页码无关，翻页期间插入新记录也不会重复/漏项。
+- fields=a,b,c：列表只查询、只返回需要的列，大字段（笔记正文、提交代码）由详情接口按需加载。
+"""
+import base64
+from datetime import datetime
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import load_only
+
+
+class PaginationError(ValueError):
+    """游标或参数不合法"""
+
+
+def encode_cursor(timestamp, row_id):
+    raw = f"{timestamp.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        timestamp, row_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise PaginationError('无效的分页游标') from e
+
+
+def parse_limit(value, default, maximum):
+    if value is None:
+        return default
+    return min(max(value, 1), maximum)
+
+
+def parse_fields(value, allowed, default):
+    """解析 fields 参数，返回字段元组；未提供时返回 default，包含未知字段时报错"""
+    if not value:
+        return tuple(default)
+    fields = []
+    for name in value.split(','):
+        name = name.strip()
+        if not name or name in fields:
+            continue
+        if name not in allowed:
+            raise PaginationError(f'不支持的字段: {name}')
+        fields.append(name)
+    return tuple(fields) or tuple(default)
+
+
+def load_fields(model, fields, *required):
+    """只查询 fields 涉及的列，required 为分页等额外需要的列（主键总会加载）"""
+    attrs = [getattr(model, name) for name in fields if name in model.COLUMN_FIELDS]
+    return load_only(*attrs, *required)
+
+
+def keyset_query(query, time_col, id_col, cursor=None, limit=20):
+    """按 (time_col, id_col) 倒序、从游标之后取 limit + 1 条的查询（多取一条用于判断是否还有下一页）"""
+    if cursor:
+        timestamp, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(time_col, id_col) < tuple_(timestamp, row_id))
+    return query.order_by(time_col.desc(), id_col.desc()).limit(limit + 1)
+
+
+def keyset_page(query, time_col, id_col, cursor=None, limit=20):
+    """按 (time_col, id_col) 倒序取一页，返回 (rows, next_cursor)；没有下一页时 next_cursor 为 None"""
+    rows = keyset_query(query, time_col, id_col, cursor, limit).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, time_col.key), getattr(last, id_col.key))
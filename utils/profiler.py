@@ -0,0 +1,300 @@
+"""
+按需性能剖析
+1. 采样剖析：后台线程按固定间隔遍历 sys._current_frames()，统计各线程的调用栈，
+   输出折叠栈格式（每行 "线程;外层;...;内层 次数"），可直接交给 flamegraph.pl / speedscope / inferno 生成火焰图。
+   - 给某个 worker 发送 PROFILER_SIGNAL（默认 SIGUSR2，即 kill -USR2 <worker pid>）：该 worker 采样 PROFILER_SIGNAL_SECONDS 秒，
+     结果写入 PROFILER_DIR/<pid>-<时间>.folded。CPU 被占满的 sync worker 无法接收新请求，但信号处理函数仍会在字节码之间执行。
+     不用 SIGPROF（与 setitimer(ITIMER_PROF) 冲突）；USR2 对 gunicorn master 是热升级，只能发给 worker。
+     fork 出的子进程（如 utils/regex_runner.py 的正则进程）继承了处理函数，收到信号时直接忽略。
+   - GET /debug/profile/sample?pid=<pid>&seconds=5：由处理该请求的 worker 给目标 worker 发信号并等待结果。
+     pid 必填：采样只能看到其他线程，gunicorn sync worker 中处理请求的线程就是唯一的工作线程，采样自身几乎得到空结果。
+     GET /debug/profile/workers 列出各 worker 的 CPU 占用，用于找到目标。
+2. 单请求剖析：请求带 X-Profile: <PROFILER_TOKEN> 头时，用 cProfile 包裹整个请求（含响应体的生成），
+   返回按累计耗时排序的前 N 个函数（text/plain）代替原响应；X-Profile-Sort: tottime 按自身耗时排序，X-Profile-Top 指定 N。
+只在设置了 PROFILER_TOKEN 时启用：未设置时不创建 PROFILER_DIR、不安装信号处理函数、HTTP 接口返回 404；
+HTTP 接口需带 Authorization: Bearer <token>，nginx 只允许本机访问 /debug/。
+    PROFILER_TOKEN=
+    PROFILER_DIR=instance/profiles
+    PROFILER_SIGNAL=SIGUSR2         # 留空则不安装信号处理函数
+    PROFILER_SIGNAL_SECONDS=10
+    PROFILER_MAX_SECONDS=20         # HTTP 采样的上限，需小于 gunicorn 的 worker 超时（默认 30 秒）
+"""
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import secrets
+import signal
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+import psutil
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_INTERVAL = 0.005     # 秒，采样间隔
+TOP_FUNCTIONS = 30
+SORT_KEYS = ('cumulative', 'tottime', 'calls')
+
+# 后台线程空闲等待时的栈顶函数，默认不计入结果
+_IDLE_FRAMES = {
+    ('threading.py', 'wait'),
+    ('queue.py', 'get'),
+    ('thread.py', '_worker'),           # concurrent.futures 线程池等待任务
+    ('selectors.py', 'select'),
+}
+
+
+class ProfilerError(Exception):
+    """采样请求无效或目标 worker 没有按时返回结果"""
+
+
+def _frame_label(code, labels):
+    label = labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        if filename.startswith(project_root + os.sep):
+            filename = os.path.relpath(filename, project_root)
+        else:
+            filename = os.path.basename(filename)
+        label = labels[code] = f'{code.co_name} ({filename}:{code.co_firstlineno})'.replace(';', ':')
+    return label
+
+
+def sample_stacks(seconds, interval=DEFAULT_INTERVAL, include_idle=False):
+    """阻塞 seconds 秒，每隔 interval 秒记录一次其他线程的调用栈，返回 (Counter{折叠栈: 次数}, 采样次数)"""
+    me = threading.get_ident()
+    labels = {}
+    counts = Counter()
+    samples = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        frames = sys._current_frames()
+        for ident, frame in frames.items():
+            if ident == me:
+                continue
+            code = frame.f_code
+            if not include_idle and (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code, labels))
+                frame = frame.f_back
+            stack.append(names.get(ident, f'thread-{ident}').replace(';', ':').replace(' ', '_'))
+            counts[';'.join(reversed(stack))] += 1
+        del frames, frame
+        samples += 1
+        time.sleep(interval)
+    return counts, samples
+
+
+def format_collapsed(counts):
+    return ''.join(f'{stack} {count}\n' for stack, count in counts.most_common())
+
+
+def _write_atomic(path, text):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class RequestProfiler:
+    def __init__(self):
+        self.token = None
+        self.directory = None
+        self.signum = None
+        self._owner_pid = None
+        self.signal_seconds = 10.0
+        self.max_seconds = 20.0
+        self._sampling = threading.Lock()
+
+    def init_app(self, app):
+        self.token = app.config.get('PROFILER_TOKEN') or None
+        self.directory = app.config.get('PROFILER_DIR')
+        self.signal_seconds = float(app.config.get('PROFILER_SIGNAL_SECONDS', 10))
+        self.max_seconds = float(app.config.get('PROFILER_MAX_SECONDS', 20))
+        if not self.token:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        signal_name = app.config.get('PROFILER_SIGNAL')
+        if signal_name:
+            try:
+                self.signum = getattr(signal, signal_name)
+                signal.signal(self.signum, self._on_signal)
+                # 每个 gunicorn worker 导入应用时各自安装（不使用 --preload）
+                self._owner_pid = os.getpid()
+            except (AttributeError, ValueError) as e:
+                # 平台不支持该信号，或不在主线程中导入应用
+                self.signum = None
+                print(f"⚠️ 无法安装采样剖析信号 {signal_name}: {e}")
+        app.wsgi_app = ProfilingMiddleware(app.wsgi_app, self)
+
+    @property
+    def enabled(self):
+        return self.token is not None
+
+    def authorized(self, header_value, prefix='Bearer '):
+        if not self.token or not header_value or not header_value.startswith(prefix):
+            return False
+        # WSGI 的请求头是按 latin-1 解码的 str，可能含非 ASCII 字符，而 compare_digest 只接受 ASCII 字符串，
+        # 还原为原始字节后再比较（任何人都能发送 X-Profile 头，这里不能抛异常）
+        return hmac.compare_digest(header_value[len(prefix):].encode('latin-1', 'replace'), self.token.encode('utf-8'))
+
+    # ---------- 信号触发的采样 ----------
+
+    def _request_path(self, pid):
+        return os.path.join(self.directory, f'request-{pid}.json')
+
+    def _on_signal(self, signum, frame):
+        """在主线程中执行：读取采样参数（HTTP 触发时写入），在后台线程中采样"""
+        if os.getpid() != self._owner_pid:
+            return  # fork 出的子进程继承了处理函数，不采样
+        options = {}
+        try:
+            with open(self._request_path(os.getpid()), 'r', encoding='utf-8') as f:
+                options = json.load(f)
+            os.remove(self._request_path(os.getpid()))
+        except (OSError, ValueError):
+            pass
+        seconds = float(options.get('seconds', self.signal_seconds))
+        interval = float(options.get('interval', DEFAULT_INTERVAL))
+        output = options.get('output') or os.path.join(
+            self.directory, f"{os.getpid()}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.folded")
+        threading.Thread(target=self._sample_to_file, args=(seconds, interval, output),
+                         name='profiler-sampler', daemon=True).start()
+
+    def _sample_to_file(self, seconds, interval, output):
+        if not self._sampling.acquire(blocking=False):
+            print("⚠️ 上一次采样尚未结束，忽略本次请求", file=sys.__stderr__)
+            return
+        try:
+            counts, samples = sample_stacks(seconds, interval)
+            _write_atomic(output, format_collapsed(counts))
+            # 采样期间代码执行接口可能替换了 sys.stdout，写到原始 stderr 避免混入用户输出
+            print(f"📊 worker {os.getpid()} 采样 {seconds:g} 秒（{samples} 次），结果写入 {output}", file=sys.__stderr__)
+        finally:
+            self._sampling.release()
+
+    # ---------- HTTP 接口 ----------
+
+    def list_workers(self):
+        """与当前进程同一父进程、同一命令行的进程（gunicorn 的各个 worker）及其 CPU 占用"""
+        workers = [psutil.Process()]
+        try:
+            me = workers[0]
+            workers += [p for p in psutil.Process(me.ppid()).children()
+                        if p.pid != me.pid and p.cmdline() == me.cmdline()]
+        except psutil.Error:
+            pass
+        for process in workers:
+            process.cpu_percent(None)
+        time.sleep(0.5)
+        result = []
+        for process in workers:
+            try:
+                result.append({'pid': process.pid, 'cpu_percent': process.cpu_percent(None),
+                               'rss_mb': round(process.memory_info().rss / 1024 / 1024, 1),
+                               'current': process.pid == os.getpid()})
+            except psutil.Error:
+                continue
+        return sorted(result, key=lambda w: -w['cpu_percent'])
+
+    def _is_worker(self, pid):
+        if pid == os.getpid():
+            return True
+        try:
+            process, me = psutil.Process(pid), psutil.Process()
+            return process.ppid() == me.ppid() and process.cmdline() == me.cmdline()
+        except psutil.Error:
+            return False
+
+    def sample(self, pid, seconds=5.0, interval=DEFAULT_INTERVAL):
+        """采样 pid 并返回 (折叠栈文本, 采样次数)；pid 为其他 worker 时经信号触发，采样次数未知时为 None。
+        pid 为当前进程时只能采到本进程的其他线程（后台线程、多线程服务器中的其他请求），
+        gunicorn sync worker 中几乎为空"""
+        if not 0 < seconds <= self.max_seconds:
+            raise ProfilerError(f'seconds 需在 0 ~ {self.max_seconds:g} 之间')
+        if not 0.001 <= interval <= 1:
+            raise ProfilerError('interval 需在 1 ~ 1000 毫秒之间')
+        if pid == os.getpid():
+            if not self._sampling.acquire(blocking=False):
+                raise ProfilerError('当前 worker 正在采样')
+            try:
+                counts, samples = sample_stacks(seconds, interval)
+            finally:
+                self._sampling.release()
+            return format_collapsed(counts), samples
+
+        if self.signum is None:
+            raise ProfilerError('未安装采样信号（PROFILER_SIGNAL）')
+        if not self._is_worker(pid):
+            raise ProfilerError(f'{pid} 不是本应用的 worker')
+        output = os.path.join(self.directory, f'{pid}-{secrets.token_hex(4)}.folded')
+        _write_atomic(self._request_path(pid), json.dumps({'seconds': seconds, 'interval': interval, 'output': output}))
+        os.kill(pid, self.signum)
+        deadline = time.monotonic() + seconds + 5
+        while time.monotonic() < deadline:
+            if os.path.exists(output):
+                with open(output, 'r', encoding='utf-8') as f:
+                    text = f.read()
+                os.remove(output)
+                return text, None
+            time.sleep(0.2)
+        raise ProfilerError('目标 worker 未在时限内返回采样结果（可能正在执行不释放 GIL 的 C 代码）')
+
+
+class ProfilingMiddleware:
+    """带 X-Profile: <token> 的请求用 cProfile 执行，返回函数耗时排行代替原响应"""
+
+    def __init__(self, wsgi_app, profiler):
+        self.wsgi_app = wsgi_app
+        self.profiler = profiler
+
+    def __call__(self, environ, start_response):
+        if not self.profiler.authorized(environ.get('HTTP_X_PROFILE'), prefix=''):
+            return self.wsgi_app(environ, start_response)
+        sort = environ.get('HTTP_X_PROFILE_SORT', 'cumulative')
+        sort = sort if sort in SORT_KEYS else 'cumulative'
+        try:
+            top = max(1, min(int(environ.get('HTTP_X_PROFILE_TOP', TOP_FUNCTIONS)), 500))
+        except ValueError:
+            top = TOP_FUNCTIONS
+        captured = {}
+
+        def capture(status, headers, exc_info=None):
+            captured['status'] = status
+            return lambda data: None
+
+        def run():
+            app_iter = self.wsgi_app(environ, capture)
+            try:
+                return sum(len(chunk) for chunk in app_iter)
+            finally:
+                if hasattr(app_iter, 'close'):
+                    app_iter.close()
+
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        size = profile.runcall(run)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        stream = io.StringIO()
+        stream.write(f"# {environ.get('REQUEST_METHOD')} {environ.get('PATH_INFO')} -> {captured.get('status')}，"
+                     f"{size} 字节，{elapsed:.1f} ms（含剖析开销）\n")
+        pstats.Stats(profile, stream=stream).strip_dirs().sort_stats(sort).print_stats(top)
+        body = stream.getvalue().encode('utf-8')
+        start_response('200 OK', [('Content-Type', 'text/plain; charset=utf-8'),
+                                  ('Content-Length', str(len(body))),
+                                  ('Cache-Control', 'no-store')])
+        return [body]
+
+
+request_profiler = RequestProfiler()
@@ -0,0 +1,392 @@
+"""
+正则表达式测试的执行器（/api/regex/test）
+- 编译缓存：按 (pattern, flags) 的 LRU，正则工具每次编辑都会请求，相同模式不再重复编译
+- 超时保护：匹配在常驻的子进程中执行，超过 REGEX_TIMEOUT 秒直接终止该进程并换新的，
+  (a+)+$ 之类灾难性回溯的模式不会卡死 gunicorn worker（re 模块执行期间不释放 GIL，线程无法中断）
+- 静态检查：执行前检查嵌套量词，提示用户可能出现灾难性回溯
+- 结果上限：findall / finditer 惰性迭代，只返回前 limit 项与总数（过多时为估算值），
+  finditer 可用紧凑编码（starts / ends 平行数组）；也可以 NDJSON 分批流式输出
+    REGEX_TIMEOUT=1.0   # 单次匹配的超时时间（秒）
+    REGEX_WORKERS=2     # 每个应用进程最多常驻的匹配子进程数
+"""
+import multiprocessing
+import queue
+import re
+import threading
+from functools import lru_cache
+from itertools import islice
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+REGEX_CACHE_SIZE = 256
+RESULT_LIMIT = 1000         # findall / finditer / split 默认返回的最大项数
+MAX_RESULT_LIMIT = 10000    # 请求可指定的上限
+COUNT_LIMIT = 100000        # 超出 limit 后继续计数的上限，再往后按匹配密度估算总数
+STREAM_LIMIT = 200000       # NDJSON 流式输出的最大匹配数
+STREAM_BATCH_SIZE = 500
+DEFAULT_TIMEOUT = 1.0
+DEFAULT_WORKERS = 2
+
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+
+NESTED_QUANTIFIER_WARNING = '检测到嵌套量词（如 (a+)+），在不匹配的长文本上可能出现灾难性回溯，建议改写或使用占有量词 (?:a+)++'
+
+
+class RegexTimeout(Exception):
+    """匹配超时，子进程已被终止"""
+
+
+def parse_flags(flags):
+    """'IGNORECASE|MULTILINE' -> re 标志位，未知的名称忽略"""
+    flag_value = 0
+    for flag in (flags or '').split('|'):
+        flag = flag.strip()
+        value = getattr(re, flag, None) if flag else None
+        if isinstance(value, re.RegexFlag):
+            flag_value |= value
+    return flag_value
+
+
+@lru_cache(maxsize=REGEX_CACHE_SIZE)
+def compile_pattern(pattern, flags=0):
+    """带 LRU 缓存的 re.compile，语法错误抛出 re.error"""
+    return re.compile(pattern, flags)
+
+
+def _is_repeat(op, av):
+    # {0,1} 即 ? 不会引起指数回溯，只关注可重复多次的量词
+    return op in _REPEATS and (av[1] == sre_constants.MAXREPEAT or av[1] > 1)
+
+
+def _children(op, av):
+    """解析树节点的子模式"""
+    if op in _REPEATS:
+        return [av[2]]
+    if op == sre_constants.SUBPATTERN:
+        return [av[-1]]
+    if op == sre_constants.BRANCH:
+        return list(av[1])
+    if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        return [av[1]]
+    if op == sre_constants.GROUPREF_EXISTS:
+        return [p for p in av[1:] if p is not None]
+    # 占有量词、原子组（Python 3.11+）不会回溯，不再深入
+    return []
+
+
+def _contains_variable_repeat(subpattern):
+    # a{2} 这类固定次数的重复只有一种匹配方式，不会与外层量词形成歧义
+    for op, av in subpattern:
+        if (op in _REPEATS and av[0] != av[1]) or any(_contains_variable_repeat(p) for p in _children(op, av)):
+            return True
+    return False
+
+
+def _has_nested_quantifier(subpattern):
+    for op, av in subpattern:
+        if _is_repeat(op, av) and _contains_variable_repeat(av[2]):
+            return True
+        if any(_has_nested_quantifier(p) for p in _children(op, av)):
+            return True
+    return False
+
+
+# 原子组、占有量词（Python 3.11+）
+_ATOMIC_GROUP = getattr(sre_constants, 'ATOMIC_GROUP', None)
+_POSSESSIVE_REPEAT = getattr(sre_constants, 'POSSESSIVE_REPEAT', None)
+# 这些类别包含换行符（分类名取自解析树，编译时才换成 UNI_* 版本）
+_NEWLINE_CATEGORIES = {sre_constants.CATEGORY_SPACE, sre_constants.CATEGORY_NOT_DIGIT,
+                       sre_constants.CATEGORY_NOT_WORD, sre_constants.CATEGORY_LINEBREAK}
+# 非 MULTILINE 的 ^ $ 以及 \A \Z 取决于整段文本的首尾
+_STRING_ANCHORS = {sre_constants.AT_BEGINNING_STRING, sre_constants.AT_END_STRING}
+_LINE_ANCHORS = {sre_constants.AT_BEGINNING, sre_constants.AT_END}
+_NEWLINE = ord('\n')
+
+
+def _set_has_newline(items):
+    negate = False
+    found = False
+    for op, av in items:
+        if op == sre_constants.NEGATE:
+            negate = True
+        elif op == sre_constants.LITERAL:
+            found = found or av == _NEWLINE
+        elif op == sre_constants.RANGE:
+            found = found or av[0] <= _NEWLINE <= av[1]
+        elif op == sre_constants.CATEGORY:
+            found = found or av in _NEWLINE_CATEGORIES
+    return found != negate
+
+
+def _crosses_lines(subpattern, flags):
+    for op, av in subpattern:
+        if op == sre_constants.LITERAL and av == _NEWLINE:
+            return True
+        if op == sre_constants.NOT_LITERAL and av != _NEWLINE:
+            return True
+        if op == sre_constants.ANY and flags & sre_constants.SRE_FLAG_DOTALL:
+            return True
+        if op == sre_constants.IN and _set_has_newline(av):
+            return True
+        if op == sre_constants.AT and (av in _STRING_ANCHORS or
+                                       (av in _LINE_ANCHORS and not flags & sre_constants.SRE_FLAG_MULTILINE)):
+            return True
+        if op == sre_constants.SUBPATTERN:
+            group, add_flags, del_flags, p = av
+            if _crosses_lines(p, (flags | add_flags) & ~del_flags):
+                return True
+        elif op == _ATOMIC_GROUP:
+            if _crosses_lines(av, flags):
+                return True
+        elif op == _POSSESSIVE_REPEAT:
+            if _crosses_lines(av[2], flags):
+                return True
+        elif any(_crosses_lines(p, flags) for p in _children(op, av)):
+            return True
+    return False
+
+
+@lru_cache(maxsize=REGEX_CACHE_SIZE)
+def is_line_local(pattern, flags=0):
+    """模式的每个匹配是否都局限在一行之内（不会匹配换行符，也不依赖整段文本的首尾）。
+    满足时修改某几行只会影响这几行的匹配结果，可以只对这几行重新匹配"""
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except Exception:
+        return False
+    return not _crosses_lines(parsed, parsed.state.flags)
+
+
+@lru_cache(maxsize=REGEX_CACHE_SIZE)
+def check_pattern(pattern, flags=0):
+    """静态检查，返回提示信息列表；模式本身有语法错误时返回空列表（由编译报错）"""
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except Exception:
+        return ()
+    warnings = []
+    if _has_nested_quantifier(parsed):
+        warnings.append(NESTED_QUANTIFIER_WARNING)
+    return tuple(warnings)
+
+
+def _findall_item(match, group_count):
+    """与 re.findall 的返回值一致：无分组取整体，一个分组取该组，多个分组取元组"""
+    if group_count == 0:
+        return match.group()
+    if group_count == 1:
+        return match.group(1) or ''
+    return tuple(g or '' for g in match.groups())
+
+
+def _capped_matches(compiled_pattern, test_string, limit):
+    """惰性迭代 finditer：保留前 limit 个匹配，之后只计数。
+    返回 (matches, total, total_exact)；计数超过 COUNT_LIMIT 时按已扫描位置的匹配密度外推总数"""
+    iterator = compiled_pattern.finditer(test_string)
+    matches = list(islice(iterator, limit))
+    counted = len(matches)
+    if counted < limit:
+        return matches, counted, True
+    for match in iterator:
+        counted += 1
+        if counted >= COUNT_LIMIT:
+            return matches, int(counted * len(test_string) / max(match.end(), 1)), False
+    return matches, counted, True
+
+
+def _compact_spans(matches, group_count):
+    """紧凑编码：起止位置为两个平行数组，匹配文本由客户端按位置从测试字符串截取"""
+    result = {
+        'starts': [m.start() for m in matches],
+        'ends': [m.end() for m in matches],
+    }
+    if group_count:
+        result['groups'] = [m.groups() for m in matches]
+    return result
+
+
+def run_regex(pattern, flags, function_name, test_string, replacement='X', limit=RESULT_LIMIT, compact=False):
+    """执行一次正则操作，返回结果字典（与 /api/regex/test 的响应字段一致）。
+    findall / finditer / split 最多返回 limit 项，并附带 total、total_exact、truncated"""
+    compiled_pattern = compile_pattern(pattern, flags)
+    result = {}
+    if function_name == 're.match':
+        match = compiled_pattern.match(test_string)
+        result['result'] = match.group() if match else None
+        result['groups'] = match.groups() if match else []
+        result['span'] = match.span() if match else None
+    elif function_name == 're.search':
+        match = compiled_pattern.search(test_string)
+        result['result'] = match.group() if match else None
+        result['groups'] = match.groups() if match else []
+        result['span'] = match.span() if match else None
+    elif function_name in ('re.findall', 're.finditer'):
+        matches, total, exact = _capped_matches(compiled_pattern, test_string, limit)
+        group_count = compiled_pattern.groups
+        if function_name == 're.findall':
+            result['result'] = [_findall_item(m, group_count) for m in matches]
+        elif compact:
+            result['result'] = _compact_spans(matches, group_count)
+        else:
+            result['result'] = [{'match': m.group(), 'span': m.span(), 'groups': m.groups()} for m in matches]
+        result['total'] = total
+        result['total_exact'] = exact
+        result['truncated'] = total > len(matches)
+    elif function_name == 're.split':
+        # maxsplit=limit 时最后一段是未分割的剩余部分
+        parts = compiled_pattern.split(test_string, maxsplit=limit)
+        result['result'] = parts
+        result['truncated'] = len(parts) > limit and compiled_pattern.search(parts[-1]) is not None
+    elif function_name == 're.sub':
+        result['result'] = compiled_pattern.sub(replacement, test_string)
+    return result
+
+
+def stream_regex(pattern, flags, function_name, test_string, limit=STREAM_LIMIT):
+    """findall / finditer 的分批结果（NDJSON 的每一行），最后一行为 {'done': True, 'total', 'truncated'}"""
+    compiled_pattern = compile_pattern(pattern, flags)
+    group_count = compiled_pattern.groups
+    iterator = compiled_pattern.finditer(test_string)
+    total = 0
+    while total < limit:
+        batch = list(islice(iterator, min(STREAM_BATCH_SIZE, limit - total)))
+        if not batch:
+            break
+        total += len(batch)
+        if function_name == 're.findall':
+            yield {'result': [_findall_item(m, group_count) for m in batch]}
+        else:
+            yield _compact_spans(batch, group_count)
+    truncated = total >= limit and next(iterator, None) is not None
+    yield {'done': True, 'total': total, 'truncated': truncated}
+
+
+def _worker_main(conn):
+    """子进程主循环：接收 (mode, args)，回传 ('ok', result)、若干 ('chunk', data) + ('end', None)，或 ('error', message)"""
+    while True:
+        try:
+            mode, args = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        try:
+            if mode == 'stream':
+                for chunk in stream_regex(*args):
+                    conn.send(('chunk', chunk))
+                conn.send(('end', None))
+            else:
+                conn.send(('ok', run_regex(*args)))
+        except Exception as e:
+            conn.send(('error', str(e)))
+
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def send(self, task):
+        self.conn.send(task)
+
+    def recv(self, timeout):
+        if not self.conn.poll(timeout):
+            raise RegexTimeout()
+        return self.conn.recv()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class RegexRunner:
+    """常驻匹配子进程池：空闲进程复用，超时的进程被终止后按需重建"""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, workers=DEFAULT_WORKERS):
+        self.timeout = timeout
+        self.workers = workers
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        # fork 启动最快，子进程只执行 re，不触碰父进程的数据库连接等资源
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+
+    def init_app(self, app):
+        self.timeout = float(app.config.get('REGEX_TIMEOUT', self.timeout))
+        self.workers = int(app.config.get('REGEX_WORKERS', self.workers))
+
+    def _acquire(self):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                if self._created < self.workers:
+                    self._created += 1
+                    try:
+                        return _Worker(self._context)
+                    except Exception:
+                        self._created -= 1
+                        raise
+            # 进程都在忙：等待归还；忙碌的进程也可能因超时被终止，所以定期重新检查名额
+            try:
+                return self._idle.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    def _discard(self, worker):
+        worker.kill()
+        with self._lock:
+            self._created -= 1
+
+    def run(self, pattern, flags, function_name, test_string, replacement='X', limit=RESULT_LIMIT, compact=False):
+        """在子进程中执行，超时抛出 RegexTimeout，执行出错抛出 RuntimeError"""
+        worker = self._acquire()
+        try:
+            worker.send(('run', (pattern, flags, function_name, test_string, replacement, limit, compact)))
+            status, payload = worker.recv(self.timeout)
+        except RegexTimeout:
+            self._discard(worker)
+            raise
+        except (OSError, EOFError) as e:
+            # 子进程意外退出（如被 OOM 杀掉），换一个新的
+            self._discard(worker)
+            raise RuntimeError(f'匹配进程异常退出: {e}')
+        self._idle.put(worker)
+        if status == 'error':
+            raise RuntimeError(payload)
+        return payload
+
+    def stream(self, pattern, flags, function_name, test_string, limit=STREAM_LIMIT):
+        """逐批产出 stream_regex 的结果；每一批都需在 timeout 内到达，否则抛出 RegexTimeout。
+        调用方中途停止迭代（客户端断开）时终止子进程，避免它阻塞在写满的管道上"""
+        worker = self._acquire()
+        finished = False
+        try:
+            worker.send(('stream', (pattern, flags, function_name, test_string, limit)))
+            while True:
+                status, payload = worker.recv(self.timeout)
+                if status == 'chunk':
+                    yield payload
+                    continue
+                finished = True
+                if status == 'error':
+                    raise RuntimeError(payload)
+                return
+        except (OSError, EOFError) as e:
+            raise RuntimeError(f'匹配进程异常退出: {e}')
+        finally:
+            if finished:
+                self._idle.put(worker)
+            else:
+                self._discard(worker)
+
+
+regex_runner = RegexRunner()
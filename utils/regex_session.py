@@ -0,0 +1,250 @@
+"""
+正则工具的实时匹配会话（/api/regex/session）
+客户端第一次发送全文，之后只发送相对于服务端缓冲区的修改（edits），服务端在缓冲区上重放修改：
+- 模式不跨行时（见 regex_runner.is_line_local），只对修改所在的几行重新匹配，其余匹配位置平移即可
+- 模式跨行、修改了模式/标志、或匹配数超过上限时，对全文重新匹配
+会话先存进程内 LRU，再写入 REGEX_SESSION_DIR（文件名为 <用户ID>.<会话ID>.json），多个 gunicorn worker 共享同一个缓冲区。
+每次更新版本号加一，客户端带上所基于的版本，不一致（或会话已过期、已被淘汰）时返回 409，由客户端重新发送全文。
+每个文件最大约 MAX_SESSION_TEXT，写入后按修改时间淘汰：每个用户只保留最近 REGEX_SESSION_MAX_PER_USER 个会话，
+目录总大小超过 REGEX_SESSION_MAX_BYTES 时从最旧的会话开始删除。
+    REGEX_SESSION_DIR=instance/regex_sessions   # 会话文件目录，留空则只保存在进程内
+    REGEX_SESSION_MAX_PER_USER=4
+    REGEX_SESSION_MAX_BYTES=268435456           # 256MB
+"""
+import json
+import os
+import re
+import secrets
+import tempfile
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+from utils.regex_runner import MAX_RESULT_LIMIT, is_line_local
+
+SESSION_CACHE_SIZE = 64
+SESSION_TTL = 3600                   # 秒，超过未更新的会话被清理
+MAX_SESSION_TEXT = 2 * 1024 * 1024   # 缓冲区最大字符数，与 MAX_CONTENT_LENGTH 一致
+SESSION_MATCH_LIMIT = MAX_RESULT_LIMIT
+MAX_SESSIONS_PER_USER = 4
+MAX_DISK_BYTES = 256 * 1024 * 1024
+
+_SESSION_ID = re.compile(r'^[A-Za-z0-9_-]{16,64}$')
+
+
+class SessionConflict(Exception):
+    """会话不存在、不属于当前用户或版本不一致，客户端需重新发送全文"""
+
+
+class RegexSessionStore:
+    """会话的两级存储：进程内 LRU + 可选的磁盘目录"""
+
+    def __init__(self, maxsize=SESSION_CACHE_SIZE, disk_dir=None,
+                 max_per_user=MAX_SESSIONS_PER_USER, max_disk_bytes=MAX_DISK_BYTES):
+        self.maxsize = maxsize
+        self.disk_dir = disk_dir
+        self.max_per_user = max_per_user
+        self.max_disk_bytes = max_disk_bytes
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.disk_dir = app.config.get('REGEX_SESSION_DIR') or None
+        self.max_per_user = app.config.get('REGEX_SESSION_MAX_PER_USER', MAX_SESSIONS_PER_USER)
+        self.max_disk_bytes = app.config.get('REGEX_SESSION_MAX_BYTES', MAX_DISK_BYTES)
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def _disk_path(self, user_id, session_id):
+        return os.path.join(self.disk_dir, f'{user_id}.{session_id}.json')
+
+    def create(self, user_id, text):
+        return {
+            'id': secrets.token_urlsafe(16),
+            'user_id': user_id,
+            'version': 0,
+            'text': text,
+            'pattern': None,
+            'flags': 0,
+            'starts': [],
+            'ends': [],
+            'groups': None,
+            'truncated': False,
+            'updated_at': time.time(),
+        }
+
+    def get(self, session_id, user_id, version):
+        if not isinstance(session_id, str) or not _SESSION_ID.match(session_id):
+            raise SessionConflict()
+        with self._lock:
+            session = self._sessions.get(session_id)
+        # 内存中的副本可能已被其他 worker 更新过，版本不一致时以磁盘为准
+        if (session is None or session['version'] != version) and self.disk_dir:
+            try:
+                with open(self._disk_path(user_id, session_id), 'r', encoding='utf-8') as f:
+                    session = json.load(f)
+            except (OSError, ValueError):
+                session = None
+        if session is None or session['version'] != version or session['user_id'] != user_id:
+            raise SessionConflict()
+        return session
+
+    def save(self, session):
+        session['updated_at'] = time.time()
+        with self._lock:
+            self._sessions[session['id']] = session
+            self._sessions.move_to_end(session['id'])
+            while len(self._sessions) > self.maxsize:
+                self._sessions.popitem(last=False)
+        if self.disk_dir:
+            # 先写临时文件再原子替换，其他 worker 不会读到写了一半的文件
+            try:
+                fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix='.tmp')
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(session, f, ensure_ascii=False)
+                os.replace(tmp_path, self._disk_path(session['user_id'], session['id']))
+            except OSError as e:
+                print(f"⚠️ 正则会话写入失败: {e}")
+        self._prune(keep=session['id'])
+
+    def _prune(self, keep=None):
+        """删除过期会话，并按修改时间淘汰超出每用户数量或目录总大小上限的会话（keep 为刚写入的会话）"""
+        expire_before = time.time() - SESSION_TTL
+        evicted = set()
+        with self._lock:
+            for session_id in [k for k, v in self._sessions.items() if v['updated_at'] < expire_before]:
+                del self._sessions[session_id]
+        if self.disk_dir:
+            files = []   # (修改时间, 大小, 用户ID, 会话ID, 路径)
+            try:
+                with os.scandir(self.disk_dir) as entries:
+                    for entry in entries:
+                        parts = entry.name.split('.')
+                        stat = entry.stat()
+                        if len(parts) != 3 or parts[2] != 'json':
+                            # 残留的临时文件与旧版文件名的会话只按过期时间清理
+                            if stat.st_mtime < expire_before:
+                                os.remove(entry.path)
+                            continue
+                        files.append((stat.st_mtime, stat.st_size, parts[0], parts[1], entry.path))
+            except OSError:
+                files = []
+            files.sort(reverse=True)
+            per_user = {}
+            total = 0
+            for mtime, size, user_id, session_id, path in files:
+                per_user[user_id] = per_user.get(user_id, 0) + 1
+                total += size
+                if session_id != keep and (mtime < expire_before or per_user[user_id] > self.max_per_user
+                                           or total > self.max_disk_bytes):
+                    evicted.add(session_id)
+                    total -= size
+                    per_user[user_id] -= 1
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+        # 磁盘上被淘汰的会话在进程内也不再保留，之后的更新返回 409
+        with self._lock:
+            for session_id in evicted:
+                self._sessions.pop(session_id, None)
+
+
+regex_sessions = RegexSessionStore()
+
+
+def validate_edits(edits, text_length):
+    """edits 为 [{start, end, text}]，按顺序应用，每个位置都相对于前一个修改之后的文本"""
+    if not isinstance(edits, list):
+        raise ValueError('edits 必须是数组')
+    length = text_length
+    for edit in edits:
+        if not isinstance(edit, dict):
+            raise ValueError('edit 格式错误')
+        start, end, text = edit.get('start'), edit.get('end'), edit.get('text', '')
+        if not (isinstance(start, int) and isinstance(end, int) and isinstance(text, str)
+                and 0 <= start <= end <= length):
+            raise ValueError('edit 位置超出文本范围')
+        length += len(text) - (end - start)
+        if length > MAX_SESSION_TEXT:
+            raise ValueError('测试字符串过长')
+
+
+def _run(runner, session, text):
+    result = runner.run(session['pattern'], session['flags'], 're.finditer', text,
+                        limit=SESSION_MATCH_LIMIT, compact=True)
+    return result['result'], result['truncated']
+
+
+def _full_match(runner, session):
+    spans, truncated = _run(runner, session, session['text'])
+    session['starts'] = spans['starts']
+    session['ends'] = spans['ends']
+    session['groups'] = spans.get('groups')
+    session['truncated'] = truncated
+
+
+def _apply_edit(runner, session, edit, incremental):
+    """应用一处修改；incremental 时只对修改所在的行重新匹配，并平移其后的匹配位置"""
+    old_text = session['text']
+    start, end, inserted = edit['start'], edit['end'], edit.get('text', '')
+    text = session['text'] = old_text[:start] + inserted + old_text[end:]
+    if not incremental:
+        return
+    delta = len(inserted) - (end - start)
+
+    # 受影响的行：新文本中从 start 所在行的行首到插入内容末尾所在行的行尾
+    line_start = text.rfind('\n', 0, start) + 1
+    line_end = text.find('\n', start + len(inserted))
+    if line_end == -1:
+        line_end = len(text)
+
+    # 旧匹配中落在这些行内的（行尾的空匹配也算在内）被替换
+    starts = session['starts']
+    i = bisect_left(starts, line_start)
+    j = bisect_right(starts, line_end - delta)
+
+    spans, truncated = _run(runner, session, text[line_start:line_end])
+    session['starts'] = starts[:i] + [s + line_start for s in spans['starts']] + [s + delta for s in starts[j:]]
+    session['ends'] = (session['ends'][:i] + [e + line_start for e in spans['ends']]
+                       + [e + delta for e in session['ends'][j:]])
+    if session['groups'] is not None:
+        session['groups'] = session['groups'][:i] + spans.get('groups', []) + session['groups'][j:]
+    if truncated or len(session['starts']) > SESSION_MATCH_LIMIT:
+        session['truncated'] = True
+
+
+def update_session(runner, session, edits, pattern, flags):
+    """重放修改并更新匹配结果，返回是否为增量匹配。runner 超时（RegexTimeout）时文本已更新、匹配结果被清空"""
+    same_pattern = session['pattern'] == pattern and session['flags'] == flags
+    incremental = same_pattern and not session['truncated'] and is_line_local(pattern, flags)
+    session['version'] += 1
+    if not incremental:
+        for edit in edits:
+            _apply_edit(runner, session, edit, False)
+        if same_pattern and not edits:
+            return False
+    session['pattern'] = pattern
+    session['flags'] = flags
+    try:
+        if incremental:
+            for k, edit in enumerate(edits):
+                try:
+                    _apply_edit(runner, session, edit, True)
+                except Exception:
+                    # 文本必须与客户端保持一致，剩余的修改照常应用
+                    for rest in edits[k + 1:]:
+                        _apply_edit(runner, session, rest, False)
+                    raise
+            if session['truncated']:
+                _full_match(runner, session)
+        else:
+            _full_match(runner, session)
+    except Exception:
+        # 匹配结果已不可信，下次更新时重新全文匹配
+        session['pattern'] = None
+        session['starts'], session['ends'], session['groups'] = [], [], None
+        session['truncated'] = False
+        raise
+    return incremental
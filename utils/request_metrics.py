@@ -0,0 +1,379 @@
+"""
+请求级性能指标（WSGI 中间件 + /metrics）
+每个请求记录：端点的耗时直方图、响应体字节数直方图、本次请求执行的 SQL 条数与耗时（SQLAlchemy 事件），
+按 (Flask 端点, 方法) 聚合；未匹配路由的请求统一记为 endpoint="unmatched"，标准方法以外的请求方法记为 method="OTHER"，
+不会因为随机路径或任意方法名产生大量序列。
+耗时从收到请求到响应体发送完毕（含流式响应），在压缩中间件外层统计，字节数为实际发送的（压缩后）大小。
+
+直方图采用 HDR 风格的对数线性分桶：每个 2 的幂区间再等分为若干子桶，各量级的相对误差相同。
+
+多个 gunicorn worker 的汇总：每个 worker 在内存中累加，每隔 METRICS_FLUSH_INTERVAL 秒（请求结束时检查）
+把自己的累计值原子写入 METRICS_DIR/worker-<pid>.json；/metrics 读取全部文件相加后输出 Prometheus 文本格式。
+已退出的 worker 的文件合并进 archive.json，计数器不会因 worker 重启而回退。
+访问控制：部署在 nginx 后时，真正的限制是 nginx 的 location = /metrics（allow 127.0.0.1; deny all）。
+应用内的检查只是第二道防线：未设置 METRICS_TOKEN 时只接受回环地址，但经代理的请求 REMOTE_ADDR 都是 127.0.0.1，
+只有设置 TRUSTED_PROXIES=1（app.py 用 ProxyFix 按 X-Forwarded-For 还原客户端地址）时这项检查才有意义。
+直接对外监听（如 Dockerfile 中的 0.0.0.0:5000）时设置 METRICS_TOKEN，凭 Authorization: Bearer <token> 访问。
+    METRICS_ENABLED=1
+    METRICS_DIR=instance/metrics       # 留空则只统计当前进程
+    METRICS_FLUSH_INTERVAL=5           # 秒
+    METRICS_TOKEN=
+"""
+import atexit
+import hmac
+import ipaddress
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+
+from flask import request, request_started
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    import fcntl
+except ImportError:  # Windows 开发环境：没有其他 worker，不需要文件锁
+    fcntl = None
+
+
+def hdr_bounds(lowest, highest, sub_buckets):
+    """从 lowest 到不小于 highest 的桶上界：每个 2 的幂区间等分为 sub_buckets 份"""
+    bounds = [lowest]
+    base = lowest
+    while bounds[-1] < highest:
+        bounds.extend(base * (1 + i / sub_buckets) for i in range(1, sub_buckets + 1))
+        base *= 2
+    return bounds
+
+
+LATENCY_BOUNDS = hdr_bounds(0.001, 30.0, 4)        # 秒，1ms ~ 32s，每档约 19%
+SIZE_BOUNDS = hdr_bounds(128, 16 * 1024 * 1024, 1)  # 字节，128B ~ 16MB
+SQL_COUNT_BOUNDS = [0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100]
+
+ENDPOINT_KEY = 'request_metrics.endpoint'
+# 请求方法由客户端任意填写，其余方法统一记为 OTHER
+STANDARD_METHODS = frozenset({'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'})
+ARCHIVE_NAME = 'archive.json'
+
+_local = threading.local()
+
+
+def _new_series():
+    return {
+        'status': {},
+        'latency': [0] * (len(LATENCY_BOUNDS) + 1), 'latency_sum': 0.0,
+        'size': [0] * (len(SIZE_BOUNDS) + 1), 'size_sum': 0,
+        'sql': [0] * (len(SQL_COUNT_BOUNDS) + 1), 'sql_queries': 0, 'sql_seconds': 0.0,
+    }
+
+
+def merge_series(total, series):
+    for status, count in series['status'].items():
+        total['status'][status] = total['status'].get(status, 0) + count
+    for name in ('latency', 'size', 'sql'):
+        total[name] = [a + b for a, b in zip(total[name], series[name])]
+    for name in ('latency_sum', 'size_sum', 'sql_queries', 'sql_seconds'):
+        total[name] += series[name]
+
+
+def merge_into(total, data):
+    for key, series in data.items():
+        if key not in total:
+            total[key] = _new_series()
+        merge_series(total[key], series)
+    return total
+
+
+# ---------- SQL 统计 ----------
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_local, 'sql', None) is not None:
+        conn.info['request_metrics_start'] = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    sql = getattr(_local, 'sql', None)
+    start = conn.info.pop('request_metrics_start', None)
+    if sql is not None and start is not None:
+        sql[0] += 1
+        sql[1] += time.perf_counter() - start
+
+
+# ---------- 汇总与存储 ----------
+
+class RequestMetrics:
+    def __init__(self):
+        self.enabled = False
+        self.directory = None
+        self.flush_interval = 5.0
+        self.token = None
+        self._data = {}
+        self._pid = os.getpid()
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = bool(app.config.get('METRICS_ENABLED'))
+        if not self.enabled:
+            return
+        self.directory = app.config.get('METRICS_DIR') or None
+        self.flush_interval = float(app.config.get('METRICS_FLUSH_INTERVAL', 5))
+        self.token = app.config.get('METRICS_TOKEN') or None
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            atexit.register(self.flush)  # worker 正常退出时写入最后一段计数
+        request_started.connect(_tag_endpoint, app)
+        app.wsgi_app = MetricsMiddleware(app.wsgi_app, self)
+
+    def authorized(self, remote_addr, authorization):
+        """设置了 METRICS_TOKEN 时校验令牌，否则只允许回环地址"""
+        if self.token:
+            prefix = 'Bearer '
+            if not authorization or not authorization.startswith(prefix):
+                return False
+            # 与 utils/profiler.py 相同：请求头按 latin-1 还原为原始字节后再做常量时间比较
+            return hmac.compare_digest(authorization[len(prefix):].encode('latin-1', 'replace'),
+                                       self.token.encode('utf-8'))
+        try:
+            return ipaddress.ip_address(remote_addr or '').is_loopback
+        except ValueError:
+            return False
+
+    def record(self, endpoint, method, status, duration, size, sql_queries, sql_seconds):
+        with self._lock:
+            if os.getpid() != self._pid:
+                # fork 出的子进程不继承父进程的计数
+                self._pid = os.getpid()
+                self._data = {}
+            key = f'{endpoint}|{method}'
+            status = str(status)  # 与写入 JSON 后读回的键一致
+            series = self._data.get(key)
+            if series is None:
+                series = self._data[key] = _new_series()
+            series['status'][status] = series['status'].get(status, 0) + 1
+            series['latency'][bisect_left(LATENCY_BOUNDS, duration)] += 1
+            series['latency_sum'] += duration
+            series['size'][bisect_left(SIZE_BOUNDS, size)] += 1
+            series['size_sum'] += size
+            series['sql'][bisect_left(SQL_COUNT_BOUNDS, sql_queries)] += 1
+            series['sql_queries'] += sql_queries
+            series['sql_seconds'] += sql_seconds
+        if self.directory and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def _worker_path(self, pid):
+        return os.path.join(self.directory, f'worker-{pid}.json')
+
+    def flush(self):
+        """把本进程的累计值写入自己的文件（整体替换，其他进程不会读到写了一半的内容）"""
+        self._last_flush = time.monotonic()
+        with self._lock:
+            payload = json.dumps(self._data)
+            pid = self._pid
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, self._worker_path(pid))
+        except OSError as e:
+            print(f"⚠️ 性能指标写入失败: {e}")
+
+    def collect(self):
+        """所有 worker（含已退出的）的累计值之和"""
+        if not self.directory:
+            with self._lock:
+                return merge_into({}, self._data)
+        self.flush()
+        with _DirectoryLock(self.directory):
+            self._archive_dead_workers()
+            total = {}
+            for name in os.listdir(self.directory):
+                if name == ARCHIVE_NAME or (name.startswith('worker-') and name.endswith('.json')):
+                    merge_into(total, _read_json(os.path.join(self.directory, name)))
+        return total
+
+    def _archive_dead_workers(self):
+        archive_path = os.path.join(self.directory, ARCHIVE_NAME)
+        dead = []
+        for name in os.listdir(self.directory):
+            if name.startswith('worker-') and name.endswith('.json'):
+                try:
+                    pid = int(name[len('worker-'):-len('.json')])
+                except ValueError:
+                    continue
+                if not _pid_alive(pid):
+                    dead.append(os.path.join(self.directory, name))
+        if not dead:
+            return
+        archive = _read_json(archive_path)
+        for path in dead:
+            merge_into(archive, _read_json(path))
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(archive, f)
+        os.replace(tmp_path, archive_path)
+        for path in dead:
+            os.remove(path)
+
+    def render(self):
+        """Prometheus 文本格式"""
+        data = {}
+        for key, series in self.collect().items():
+            # 旧版本可能记录了任意方法名，合并进 OTHER，避免输出重复的标签组合
+            endpoint, method = key.rsplit('|', 1)
+            merge_into(data, {f'{endpoint}|{_method_label(method)}': series})
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        def histogram(name, field, bounds, total_field, labels):
+            for key, series in sorted(data.items()):
+                label = labels(key)
+                cumulative = 0
+                for bound, count in zip(bounds, series[field]):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{label},le="{bound:g}"}} {cumulative}')
+                count = sum(series[field])
+                lines.append(f'{name}_bucket{{{label},le="+Inf"}} {count}')
+                lines.append(f'{name}_sum{{{label}}} {series[total_field]}')
+                lines.append(f'{name}_count{{{label}}} {count}')
+
+        def endpoint_labels(key):
+            endpoint, method = key.rsplit('|', 1)
+            return f'endpoint="{_escape(endpoint)}",method="{_escape(method)}"'
+
+        header('http_requests_total', 'counter', 'Requests by endpoint, method and status code.')
+        for key, series in sorted(data.items()):
+            for status, count in sorted(series['status'].items()):
+                lines.append(f'http_requests_total{{{endpoint_labels(key)},status="{status}"}} {count}')
+
+        header('http_request_duration_seconds', 'histogram', 'Time from request start until the body was sent.')
+        histogram('http_request_duration_seconds', 'latency', LATENCY_BOUNDS, 'latency_sum', endpoint_labels)
+
+        header('http_response_size_bytes', 'histogram', 'Response body bytes sent (after compression).')
+        histogram('http_response_size_bytes', 'size', SIZE_BOUNDS, 'size_sum', endpoint_labels)
+
+        header('http_request_sql_queries', 'histogram', 'SQL statements executed per request.')
+        histogram('http_request_sql_queries', 'sql', SQL_COUNT_BOUNDS, 'sql_queries', endpoint_labels)
+
+        header('http_request_sql_seconds_total', 'counter', 'Time spent executing SQL statements.')
+        for key, series in sorted(data.items()):
+            lines.append(f'http_request_sql_seconds_total{{{endpoint_labels(key)}}} {series["sql_seconds"]}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _method_label(method):
+    return method if method in STANDARD_METHODS else 'OTHER'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class _DirectoryLock:
+    """合并已退出 worker 的文件时加锁，避免两个 worker 同时合并导致重复计数"""
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, '.lock')
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._file = open(self.path, 'a')
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+
+
+def _tag_endpoint(sender, **extra):
+    """路由匹配后记下端点名，中间件在响应结束时读取"""
+    request.environ[ENDPOINT_KEY] = request.endpoint or 'unmatched'
+
+
+# ---------- WSGI 中间件 ----------
+
+class MetricsMiddleware:
+    def __init__(self, wsgi_app, metrics):
+        self.wsgi_app = wsgi_app
+        self.metrics = metrics
+
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO') == '/metrics':
+            return self.wsgi_app(environ, start_response)
+        start = time.perf_counter()
+        state = {'status': 500}
+        _local.sql = sql = [0, 0.0]
+
+        def capture(status, headers, exc_info=None):
+            state['status'] = int(status.split(' ', 1)[0])
+            return start_response(status, headers, exc_info)
+
+        try:
+            app_iter = self.wsgi_app(environ, capture)
+        except Exception:
+            self._finish(environ, state, start, 0, sql)
+            raise
+        return _MeasuredBody(app_iter, lambda size: self._finish(environ, state, start, size, sql))
+
+    def _finish(self, environ, state, start, size, sql):
+        _local.sql = None
+        method = _method_label(environ.get('REQUEST_METHOD', 'GET'))
+        self.metrics.record(environ.get(ENDPOINT_KEY, 'unmatched'), method,
+                            state['status'], time.perf_counter() - start, size, sql[0], sql[1])
+
+
+class _MeasuredBody:
+    """统计发送的字节数，响应关闭（发送完毕或客户端断开）时记录"""
+
+    def __init__(self, app_iter, on_close):
+        self._app_iter = app_iter
+        self._on_close = on_close
+        self._size = 0
+        self._closed = False
+
+    def __iter__(self):
+        for chunk in self._app_iter:
+            self._size += len(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            if hasattr(self._app_iter, 'close'):
+                self._app_iter.close()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._on_close(self._size)
+
+
+request_metrics = RequestMetrics()
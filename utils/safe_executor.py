@@ -197,22 +197,6 @@ class SafeCodeExecutor:
 
         return True, "代码安全"
 
-    def convert_for_json(self, obj):
-        """转换对象为JSON可序列化的格式"""
-        if isinstance(obj, set):
-            return list(obj)
-        elif callable(obj):
-            return f"<function {getattr(obj, '__name__', 'unknown')}>"
-        elif isinstance(obj, (list, tuple)):
-            return [self.convert_for_json(item) for item in obj]
-        elif isinstance(obj, dict):
-            return {key: self.convert_for_json(value) for key, value in obj.items()}
-        elif hasattr(obj, '__dict__'):
-            # 处理自定义对象
-            return f"<{type(obj).__name__} object>"
-        else:
-            return obj
-
     def execute_code(self, code: str, inputs: list = None) -> Dict[str, Any]:
         """安全执行Python代码"""
         # 安全检查
@@ -269,9 +253,9 @@ class SafeCodeExecutor:
             output = stdout_capture.getvalue()
             error_output = stderr_capture.getvalue()
 
-            # 过滤用户定义的变量
+            # 过滤用户定义的变量；set / tuple / 函数等由 JSON provider 在序列化时处理（utils/json_provider.py）
             user_variables = {
-                k: self.convert_for_json(v)
+                k: v
                 for k, v in safe_globals.items()
                 if not k.startswith('__') and k not in self.safe_builtins and k not in self.allowed_modules
             }
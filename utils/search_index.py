@@ -0,0 +1,288 @@
+"""
+站内搜索倒排索引
+启动时从学习内容注册表（utils/content_registry.py）构建一次，查询只做倒排表求交与打分，不再逐条扫描全部内容。
+- 分词：中文按字符 1-gram + 2-gram 切分（无需分词词典），英文/代码按单词（标识符）切分并转小写
+- 排序：标题 > 描述 > 代码，词频取对数饱和，并乘以 idf
+- 覆盖：模块、知识点（topics / categories）、示例代码（包括嵌套在 topics 下的示例）、OJ 题目
+另有 TitleSuggester：标题的前缀检索（边输入边提示），基于有序数组 + bisect。
+"""
+import heapq
+import json
+import math
+import os
+import re
+from bisect import bisect_left
+from collections import defaultdict
+
+FIELD_WEIGHTS = {'title': 8.0, 'description': 3.0, 'code': 1.0}
+# 同分时的类型顺序：模块 > 知识点 > 示例
+TYPE_ORDER = {'module': 0, 'topic': 1, 'example': 2, 'problem': 3, 'note': 4}
+MAX_PREFIX_EXPANSIONS = 50
+SUGGEST_SCAN_LIMIT = 200
+
+_CJK_RUN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+')
+_WORD = re.compile(r'[a-z0-9_]+')
+
+
+def tokenize(text):
+    """切分为索引词：中文 1-gram/2-gram，英文与代码按单词"""
+    text = (text or '').lower()
+    tokens = _WORD.findall(text)
+    for run in _CJK_RUN.findall(text):
+        tokens.extend(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def query_tokens(term):
+    """查询词的切分：中文连续片段取 2-gram（单字取 1-gram），英文取单词"""
+    term = term.lower()
+    tokens = _WORD.findall(term)
+    for run in _CJK_RUN.findall(term):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+class InvertedIndex:
+    """倒排索引：token -> {doc_id: 该词对文档的打分贡献}"""
+
+    def __init__(self, field_weights=FIELD_WEIGHTS):
+        self.field_weights = field_weights
+        self.docs = {}
+        self._text = {}
+        self._term_freqs = {}
+        self._postings = defaultdict(dict)
+        self._vocabulary = None
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, doc_id, doc, fields):
+        """添加文档。doc 为返回给调用方的数据，fields 为 {字段名: 文本}"""
+        if doc_id in self.docs:
+            self.remove(doc_id)
+        term_freqs = defaultdict(float)
+        for field, value in fields.items():
+            weight = self.field_weights.get(field, 1.0)
+            counts = defaultdict(int)
+            for token in tokenize(value):
+                counts[token] += 1
+            for token, count in counts.items():
+                term_freqs[token] += weight * (1 + math.log(count))
+        self.docs[doc_id] = doc
+        self._text[doc_id] = '\n'.join(v for v in fields.values() if v).lower()
+        self._term_freqs[doc_id] = term_freqs
+        for token in term_freqs:
+            self._postings[token][doc_id] = term_freqs[token]
+        self._vocabulary = None
+
+    def remove(self, doc_id):
+        if doc_id not in self.docs:
+            return
+        for token in self._term_freqs.pop(doc_id):
+            posting = self._postings[token]
+            posting.pop(doc_id, None)
+            if not posting:
+                del self._postings[token]
+        del self.docs[doc_id]
+        del self._text[doc_id]
+        self._vocabulary = None
+
+    def _idf(self, token):
+        return math.log(1 + len(self.docs) / (1 + len(self._postings.get(token, ()))))
+
+    def _prefix_postings(self, prefix):
+        """最后一个英文词按前缀匹配（边输入边搜索时词尚未输入完整）"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        merged = {}
+        start = bisect_left(self._vocabulary, prefix)
+        for token in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not token.startswith(prefix):
+                break
+            idf = self._idf(token)
+            for doc_id, tf in self._postings[token].items():
+                merged[doc_id] = max(merged.get(doc_id, 0.0), tf * idf)
+        return merged
+
+    def matches(self, q):
+        """所有检索词都需出现（AND），返回 {doc_id: score}"""
+        terms = q.lower().split()
+        if not terms:
+            return {}
+        token_postings = []
+        for i, term in enumerate(terms):
+            tokens = query_tokens(term)
+            last = i == len(terms) - 1
+            for j, token in enumerate(tokens):
+                if last and j == len(tokens) - 1 and _WORD.fullmatch(token):
+                    token_postings.append(self._prefix_postings(token))
+                else:
+                    idf = self._idf(token)
+                    token_postings.append({d: tf * idf for d, tf in self._postings.get(token, {}).items()})
+        if not token_postings:
+            # 检索词只有符号（如 "**"）时无法走索引，逐条确认（内容量很小）
+            scores = dict.fromkeys(self.docs, 0.0)
+        else:
+            # 从最短的倒排表开始求交
+            token_postings.sort(key=len)
+            scores = dict(token_postings[0])
+            for posting in token_postings[1:]:
+                if not scores:
+                    break
+                scores = {d: s + posting[d] for d, s in scores.items() if d in posting}
+
+        # 2-gram 求交可能命中不连续的字，再用原文确认每个检索词都出现（子串匹配也涵盖了前缀）
+        return {doc_id: score for doc_id, score in scores.items()
+                if all(term in self._text[doc_id] for term in terms)}
+
+    def rank_key(self, doc_id, score):
+        """排序键：得分高者在前，同分按类型（模块 > 知识点 > 示例）"""
+        return score, -TYPE_ORDER.get(self.docs[doc_id].get('type'), 9)
+
+    def search(self, q, limit=None):
+        """返回 [(score, doc_id)]，按得分降序；指定 limit 时用堆只取前 limit 个"""
+        scores = self.matches(q)
+        if limit is not None:
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: self.rank_key(*item))
+        else:
+            top = sorted(scores.items(), key=lambda item: self.rank_key(*item), reverse=True)
+        return [(score, doc_id) for doc_id, score in top]
+
+
+class TitleSuggester:
+    """标题联想：把每个标题从每个词/汉字起始处截出的后缀放进有序数组，查询时 bisect 定位前缀区间。
+    这样 "列表" 也能匹配 "Python列表和列表生成式"，而不只是匹配标题开头。"""
+
+    def __init__(self):
+        self._keys = []
+        self._entries = []
+
+    def build(self, docs):
+        """docs 为 [(doc_id, doc)]，doc 需包含 name、title、type"""
+        seen = set()
+        pairs = []
+        for doc_id, doc in docs:
+            name = (doc.get('name') or '').strip()
+            if not name:
+                continue
+            entry = (name, doc_id, doc)
+            lowered = name.lower()
+            for start in self._suffix_starts(lowered):
+                key = (lowered[start:], start, TYPE_ORDER.get(doc.get('type'), 9), len(name), doc_id)
+                if key not in seen:
+                    seen.add(key)
+                    pairs.append((key, entry))
+        pairs.sort(key=lambda p: p[0])
+        self._keys = [p[0][0] for p in pairs]
+        self._entries = [(p[0], p[1]) for p in pairs]
+        return self
+
+    @staticmethod
+    def _suffix_starts(text):
+        starts = [0]
+        for i in range(1, len(text)):
+            ch, prev = text[i], text[i - 1]
+            if _CJK_RUN.match(ch) or (ch.isalnum() and not prev.isalnum()):
+                starts.append(i)
+        return starts
+
+    def suggest(self, prefix, limit=10):
+        """返回 [(name, doc_id, doc)]：标题开头匹配优先，其次按类型与标题长度"""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        lo = bisect_left(self._keys, prefix)
+        candidates = {}
+        for key, entry in self._entries[lo:lo + SUGGEST_SCAN_LIMIT]:
+            if not key[0].startswith(prefix):
+                break
+            doc_id = entry[1]
+            rank = (key[1] > 0, key[2], key[3], key[0])
+            if doc_id not in candidates or rank < candidates[doc_id][0]:
+                candidates[doc_id] = (rank, entry)
+        return [entry for _, entry in heapq.nsmallest(limit, candidates.values(), key=lambda c: c[0])]
+
+
+def build_content_index(registry):
+    """从学习内容注册表（utils/content_registry.py）构建倒排索引"""
+    index = InvertedIndex()
+
+    for module in registry.modules.values():
+        index.add(f"module:{module['id']}", {
+            'type': 'module',
+            'name': module['title'],
+            'title': module['title'],
+            'description': module['description'],
+            'module_id': module['id'],
+            'anchor': None,
+            'icon': module['icon'],
+        }, {'title': module['title'], 'description': module['description']})
+
+    for topic in registry.topics.values():
+        module_title = registry.modules[topic['module_id']]['title']
+        index.add(f"topic:{topic['id']}", {
+            'type': 'topic',
+            'name': topic['title'],
+            'title': f"{topic['title']} - {module_title}",
+            'description': topic['description'],
+            'module_id': topic['module_id'],
+            'anchor': f"topic-{topic['topic_id']}",
+            'icon': '📘',
+        }, {'title': topic['title'], 'description': topic['description']})
+
+    for category in registry.categories.values():
+        module_title = registry.modules[category['module_id']]['title']
+        index.add(f"category:{category['id']}", {
+            'type': 'topic',
+            'name': category['title'],
+            'title': f"{category['title']} - {module_title}",
+            'description': '',
+            'module_id': category['module_id'],
+            'anchor': None,
+            'icon': '📘',
+        }, {'title': category['title']})
+
+    for example in registry.examples.values():
+        module_title = registry.modules[example['module_id']]['title']
+        name = example['title'] or '示例'
+        index.add(f"example:{example['id']}", {
+            'type': 'example',
+            'name': name,
+            'title': f'{name} - {module_title}',
+            'description': example['description'],
+            'module_id': example['module_id'],
+            'example_id': example['id'],
+            'anchor': f"topic-{example['topic_id']}" if example['topic_id'] else None,
+            'icon': '💡',
+        }, {'title': example['title'], 'description': example['description'], 'code': example['code']})
+    return index
+
+
+def build_problem_index(data_dir='./Data'):
+    """从 Data/problem_*.json 构建 OJ 题目索引"""
+    index = InvertedIndex()
+    if not os.path.isdir(data_dir):
+        return index
+    for filename in sorted(os.listdir(data_dir)):
+        if not (filename.startswith('problem_') and filename.endswith('.json')):
+            continue
+        try:
+            with open(os.path.join(data_dir, filename), 'r', encoding='utf-8') as f:
+                problem = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+        problem_id = str(problem.get('id') or filename[len('problem_'):-len('.json')])
+        index.add(f'problem:{problem_id}', {
+            'type': 'problem',
+            'name': problem.get('title', ''),
+            'title': problem.get('title', ''),
+            'description': problem.get('description', ''),
+            'problem_id': problem_id,
+            'icon': '🧩',
+        }, {'title': problem.get('title', ''), 'description': problem.get('description', ''),
+            'code': problem.get('function_name', '')})
+    return index
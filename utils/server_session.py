@@ -0,0 +1,180 @@
+"""
+服务端会话存储
+默认的 Flask 会话是签名 cookie，无法在登出或修改密码后让其他设备上的会话失效，
+接口只能每次回查 users 表确认用户仍然存在。
+启用 SESSION_BACKEND=sqlite 后，cookie 中只保存随机令牌，会话数据（含登录时的身份快照）
+保存在本机的 SQLite 文件中，多个 gunicorn worker 共享；把 SESSION_DB_PATH 指向 /dev/shm
+即为基于共享内存的存储。
+    SESSION_BACKEND=sqlite                 # cookie（默认）/ sqlite
+    SESSION_DB_PATH=instance/sessions.db   # 会话库路径
+"""
+import json
+import os
+import random
+import secrets
+import sqlite3
+import threading
+import time
+
+from flask import current_app, has_app_context, has_request_context, session as flask_session
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    """服务端会话对象，cookie 中只有 token"""
+
+    server_side = True
+
+    def __init__(self, initial=None, token=None, expires_at=None):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.token = token
+        self.expires_at = expires_at
+        self.is_new = token is None
+        self.modified = False
+        self.stale_token = None
+
+    def regenerate(self):
+        """登录时更换令牌，防止会话固定攻击"""
+        if self.token:
+            self.stale_token = self.token
+        self.token = None
+        self.is_new = True
+
+
+class SqliteSessionStore:
+    """会话表的读写，每个线程一个连接"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS sessions ('
+            'token TEXT PRIMARY KEY, user_id INTEGER, data TEXT NOT NULL, expires_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_sessions_user ON sessions (user_id)')
+        conn.commit()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            # gunicorn fork 之后不能复用父进程的连接
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def load(self, token):
+        row = self._connect().execute(
+            'SELECT data, expires_at FROM sessions WHERE token = ? AND expires_at > ?',
+            (token, time.time())
+        ).fetchone()
+        if not row:
+            return None, None
+        return json.loads(row[0]), row[1]
+
+    def save(self, token, user_id, data, expires_at):
+        self._connect().execute(
+            'INSERT INTO sessions (token, user_id, data, expires_at) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT (token) DO UPDATE SET user_id = excluded.user_id, '
+            'data = excluded.data, expires_at = excluded.expires_at',
+            (token, user_id, json.dumps(data, ensure_ascii=False), expires_at)
+        )
+
+    def delete(self, token):
+        self._connect().execute('DELETE FROM sessions WHERE token = ?', (token,))
+
+    def delete_user(self, user_id, keep_token=None):
+        """撤销用户的所有会话（可保留当前会话）"""
+        self._connect().execute(
+            'DELETE FROM sessions WHERE user_id = ? AND token IS NOT ?', (user_id, keep_token)
+        )
+
+    def purge_expired(self):
+        self._connect().execute('DELETE FROM sessions WHERE expires_at <= ?', (time.time(),))
+
+
+class SqliteSessionInterface(SessionInterface):
+    """基于 SqliteSessionStore 的 Flask 会话接口"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def open_session(self, app, request):
+        token = request.cookies.get(self.get_cookie_name(app))
+        if token:
+            data, expires_at = self.store.load(token)
+            if data is not None:
+                return ServerSession(data, token=token, expires_at=expires_at)
+        return ServerSession()
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.stale_token:
+            self.store.delete(session.stale_token)
+
+        if not session:
+            # 会话被清空（登出）：删除服务端记录和 cookie
+            if session.token or session.stale_token:
+                if session.token:
+                    self.store.delete(session.token)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        now = time.time()
+        # 没有修改且剩余有效期超过一半时不写库
+        needs_refresh = session.expires_at is None or session.expires_at - now < lifetime / 2
+        if not (session.modified or session.is_new or needs_refresh):
+            return
+
+        token = session.token or secrets.token_urlsafe(32)
+        expires_at = now + lifetime
+        self.store.save(token, session.get('user_id'), dict(session), expires_at)
+        if random.random() < 0.01:
+            self.store.purge_expired()
+
+        response.set_cookie(
+            name, token,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+
+def revoke_user_sessions(user_id, keep_current=False):
+    """撤销用户在所有设备上的会话（修改密码、删除用户时调用），cookie 模式下无法撤销，返回 False"""
+    if not has_app_context():
+        return False
+    interface = current_app.session_interface
+    if not isinstance(interface, SqliteSessionInterface):
+        return False
+    keep_token = None
+    if keep_current and has_request_context() and flask_session.get('user_id') == user_id:
+        keep_token = getattr(flask_session, 'token', None)
+    interface.store.delete_user(user_id, keep_token)
+    return True
+
+
+def init_session_backend(app):
+    """按 SESSION_BACKEND 配置安装会话接口，返回会话存储（cookie 模式返回 None）"""
+    backend = app.config.get('SESSION_BACKEND', 'cookie')
+    if backend != 'sqlite':
+        return None
+    path = app.config.get('SESSION_DB_PATH') or os.path.join(app.instance_path, 'sessions.db')
+    store = SqliteSessionStore(path)
+    app.session_interface = SqliteSessionInterface(store)
+    return store
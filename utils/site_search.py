@@ -0,0 +1,177 @@
+"""
+统一站内搜索（/api/search）
+进程内的一个检索入口，按来源分片：
+- content: 模块、知识点、示例代码（静态内容，启动时构建）
+- problems: OJ 题目（Data/problem_*.json，启动时构建）
+- notes: 每个用户一个分片，首次检索时从数据库构建，之后随笔记的增删改在提交后增量更新
+各分片分别求出命中文档，再用堆取全局前 k 个，不对全部结果排序。
+笔记分片记录 (笔记数, 最后更新时间) 签名，检索前与数据库比对（走 ix_notes_user_updated 索引），
+其他 gunicorn worker 或批量 SQL 修改了笔记时自动重建。
+"""
+import heapq
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session, object_session
+
+from models import db
+from models.notes import Note
+from utils.search_index import InvertedIndex
+
+SOURCE_TYPES = {
+    'content': frozenset({'module', 'topic', 'example'}),
+    'problems': frozenset({'problem'}),
+    'notes': frozenset({'note'}),
+}
+ALL_TYPES = frozenset().union(*SOURCE_TYPES.values())
+NOTE_SHARD_CACHE_SIZE = 256
+NOTE_DESCRIPTION_LENGTH = 120
+
+_PENDING_KEY = '_site_search_note_changes'
+
+
+def _note_doc(note_id, title, content, updated_at):
+    content = content or ''
+    return {
+        'type': 'note',
+        'title': title or content[:30].replace('\n', ' '),
+        'description': content[:NOTE_DESCRIPTION_LENGTH],
+        'note_id': note_id,
+        'icon': '📝',
+        'updated_at': updated_at.isoformat() if updated_at else None,
+    }
+
+
+def _add_note(index, note_id, title, content, updated_at):
+    index.add(f'note:{note_id}', _note_doc(note_id, title, content, updated_at),
+              {'title': title or '', 'description': content or ''})
+
+
+class NoteShards:
+    """按用户缓存的笔记索引分片（LRU）"""
+
+    def __init__(self, size=NOTE_SHARD_CACHE_SIZE):
+        self.size = size
+        self._shards = OrderedDict()  # user_id -> InvertedIndex
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _db_signature(user_id):
+        count, last_updated = db.session.query(
+            func.count(Note.note_id), func.max(Note.updated_at)
+        ).filter(Note.user_id == user_id).one()
+        return count, last_updated.isoformat() if last_updated else None
+
+    @staticmethod
+    def _shard_signature(index):
+        return len(index), max((doc['updated_at'] for doc in index.docs.values()), default=None)
+
+    def _build(self, user_id):
+        index = InvertedIndex()
+        rows = (db.session.query(Note.note_id, Note.title, Note.content, Note.updated_at)
+                .filter(Note.user_id == user_id).all())
+        for row in rows:
+            _add_note(index, *row)
+        return index
+
+    def matches(self, user_id, q):
+        """返回 [(score, doc)]"""
+        signature = self._db_signature(user_id)
+        with self._lock:
+            index = self._shards.get(user_id)
+            if index is not None and self._shard_signature(index) != signature:
+                index = None
+        if index is None:
+            index = self._build(user_id)
+        with self._lock:
+            self._shards[user_id] = index
+            self._shards.move_to_end(user_id)
+            while len(self._shards) > self.size:
+                self._shards.popitem(last=False)
+            return [(index.rank_key(doc_id, score), index.docs[doc_id])
+                    for doc_id, score in index.matches(q).items()]
+
+    def apply(self, changes):
+        """事务提交后应用笔记变更；只更新已缓存的分片"""
+        with self._lock:
+            for op, user_id, note_id, title, content, updated_at in changes:
+                index = self._shards.get(user_id)
+                if index is None:
+                    continue
+                if op == 'delete':
+                    index.remove(f'note:{note_id}')
+                elif content is None:
+                    # 正文未加载（只改了标题），下次检索时重建该分片
+                    del self._shards[user_id]
+                else:
+                    _add_note(index, note_id, title, content, updated_at)
+
+    def clear(self):
+        with self._lock:
+            self._shards.clear()
+
+
+note_shards = NoteShards()
+
+
+class SiteSearch:
+    """跨来源检索：静态分片 + 当前用户的笔记分片"""
+
+    def __init__(self, content_index, problem_index, notes=note_shards):
+        self.static_shards = [('content', content_index), ('problems', problem_index)]
+        self.notes = notes
+
+    def search(self, q, user_id=None, types=None, limit=20):
+        """返回 (前 limit 个结果 [doc + score], 命中总数)；types 为类型过滤集合"""
+        types = ALL_TYPES & set(types) if types else ALL_TYPES
+        candidates = []
+        for source, index in self.static_shards:
+            if not types & SOURCE_TYPES[source]:
+                continue
+            for doc_id, score in index.matches(q).items():
+                doc = index.docs[doc_id]
+                if doc['type'] in types:
+                    candidates.append((index.rank_key(doc_id, score), doc))
+        if user_id and 'note' in types:
+            candidates.extend(self.notes.matches(user_id, q))
+
+        top = heapq.nlargest(limit, candidates, key=lambda c: c[0])
+        return [dict(doc, score=round(key[0], 4)) for key, doc in top], len(candidates)
+
+
+def _record_note_change(op, target):
+    session = object_session(target)
+    if session is None:
+        return
+    content = None if 'content' in inspect(target).unloaded else target.content
+    session.info.setdefault(_PENDING_KEY, []).append(
+        (op, target.user_id, target.note_id, target.title, content, target.updated_at)
+    )
+
+
+@event.listens_for(Note, 'after_insert')
+def _on_note_inserted(mapper, connection, target):
+    _record_note_change('upsert', target)
+
+
+@event.listens_for(Note, 'after_update')
+def _on_note_updated(mapper, connection, target):
+    _record_note_change('upsert', target)
+
+
+@event.listens_for(Note, 'after_delete')
+def _on_note_deleted(mapper, connection, target):
+    _record_note_change('delete', target)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_note_changes(session):
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes:
+        note_shards.apply(changes)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_note_changes(session):
+    session.info.pop(_PENDING_KEY, None)
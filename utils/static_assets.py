@@ -0,0 +1,117 @@
+"""
+静态资源地址
+url_for('static', filename=...) 自动附加内容哈希参数 ?v=<hash>，文件内容变化时地址随之变化，
+所以带 v 的地址可以永久缓存（nginx 见 deployment/nginx_app.conf；直接由 Flask 提供时由 after_request 设置）。
+哈希按文件修改时间缓存，只在文件变化后重新计算。
+
+JS / CSS 由 utils/build_assets.py 压缩并生成带指纹的文件（static/dist/），模板中用 asset_url('js/main.js')：
+USE_ASSET_MANIFEST=1 时按 static/dist/manifest.json 返回指纹文件地址，否则（开发环境）返回源文件地址。
+"""
+import hashlib
+import json
+import os
+import threading
+
+from flask import request, url_for
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+class StaticVersions:
+    """静态文件的内容哈希，按 (路径, 修改时间) 缓存"""
+
+    def __init__(self):
+        self.static_folder = None
+        self._hashes = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.static_folder = app.static_folder
+        app.url_defaults(self._add_version)
+        app.after_request(self._cache_versioned)
+
+    def version(self, filename):
+        path = os.path.join(self.static_folder, filename)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        cached = self._hashes.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()[:12]
+        with self._lock:
+            self._hashes[path] = (mtime, digest)
+        return digest
+
+    def _add_version(self, endpoint, values):
+        if endpoint != 'static' or 'v' in values or not values.get('filename'):
+            return
+        if values['filename'].startswith(DIST_DIR + '/'):
+            return  # 构建产物的文件名已带指纹
+        digest = self.version(values['filename'])
+        if digest:
+            values['v'] = digest
+
+    @staticmethod
+    def _cache_versioned(response):
+        if request.endpoint != 'static' or response.status_code not in (200, 304):
+            return response
+        filename = (request.view_args or {}).get('filename', '')
+        if request.args.get('v') or filename.startswith(DIST_DIR + '/'):
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+            response.cache_control.no_cache = None
+        return response
+
+
+static_versions = StaticVersions()
+
+
+class AssetManifest:
+    """构建清单：源文件路径 -> 带指纹的构建产物路径，清单文件更新后自动重新加载"""
+
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self._mtime = None
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = bool(app.config.get('USE_ASSET_MANIFEST'))
+        self.path = os.path.join(app.static_folder, DIST_DIR, MANIFEST_NAME)
+        if self.enabled and not os.path.exists(self.path):
+            print(f"⚠️ 未找到静态资源清单 {self.path}，请先运行 python utils/build_assets.py；暂时使用源文件")
+        app.add_template_global(self.url, 'asset_url')
+
+    def _load(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return {}
+        if mtime != self._mtime:
+            with self._lock:
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        self._entries = json.load(f)
+                except (OSError, ValueError):
+                    self._entries = {}
+                self._mtime = mtime
+        return self._entries
+
+    def url(self, filename):
+        """模板中的 asset_url(filename)"""
+        if self.enabled:
+            built = self._load().get(filename)
+            if built:
+                return url_for('static', filename=built)
+        return url_for('static', filename=filename)
+
+
+asset_manifest = AssetManifest()